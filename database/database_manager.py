@@ -2,7 +2,13 @@
 Database manager for stock prediction ML project
 Handles database connections, schema creation, and basic operations
 """
+import functools
 import sqlite3
+import json
+import sys
+import threading
+from contextlib import contextmanager
+import numpy as np
 import pandas as pd
 import logging
 from pathlib import Path
@@ -10,49 +16,120 @@ from pathlib import Path
 from datetime import datetime, date
 import yaml
 
+# The shared helpers live in src/; add it so callers that only put database/
+# on the path (or import database.database_manager) still find them
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from feature_cache import read_cached
+from frame_dtypes import INDICATOR_DTYPE, SIGNAL_DTYPE, compact_frame
+from indicator_registry import indicator_columns, lag_columns, technical_indicators_ddl
+from outcomes import OUTCOME_COLUMNS, TRAILING_ROWS
+from signal_events import (
+    RUN_COLUMNS, events_to_runs, events_to_signals, replace_events, runs_to_events, signal_columns,
+    signals_to_events, wide_layout,
+)
+
 logger = logging.getLogger(__name__)
 
-TECHNICAL_INDICATOR_COLUMNS = [
-    "symbol_id", "date",
-    "rsi_7", "rsi_14", "rsi_30", "rsi_50",
-    "sma_5", "sma_10", "sma_20", "sma_50", "sma_100", "sma_200",
-    "ema_5", "ema_10", "ema_20", "ema_50", "ema_100", "ema_200",
-    "macd_6_13_5", "macd_signal_6_13_5", "macd_hist_6_13_5",
-    "macd_12_26_9", "macd_signal_12_26_9", "macd_hist_12_26_9",
-    "macd_19_39_9", "macd_signal_19_39_9", "macd_hist_19_39_9",
-    "bb_upper_10", "bb_middle_10", "bb_lower_10",
-    "bb_upper_14", "bb_middle_14", "bb_lower_14",
-    "bb_upper_20", "bb_middle_20", "bb_lower_20",
-    "bb_upper_50", "bb_middle_50", "bb_lower_50",
-    "stoch_k_7_3", "stoch_d_7_3",
-    "stoch_k_10_3", "stoch_d_10_3",
-    "stoch_k_14_3", "stoch_d_14_3",
-    "stoch_k_21_3", "stoch_d_21_3",
-    "stoch_k_30_3", "stoch_d_30_3",
-    "cci_10", "cci_14", "cci_20", "cci_40",
-    "atr_7", "atr_14", "atr_21", "atr_30",
-    "obv_10", "obv_20", "obv_50",
-    "ichimoku_conv_9", "ichimoku_base_26", "ichimoku_spanb_52",
-    "ichimoku_conv_7", "ichimoku_base_22",
-    "ichimoku_conv_12", "ichimoku_base_33",
-    "donchian_high_10", "donchian_low_10",
-    "donchian_high_20", "donchian_low_20",
-    "donchian_high_50", "donchian_low_50",
-    "adx_7", "adx_14", "adx_21", "adx_30",
-    "psar_001_02", "psar_002_02", "psar_004_02",
-    "close_lag_1", "close_lag_2", "close_lag_3", "close_lag_5", "close_lag_10", "close_lag_20",
-    "high_lag_1", "high_lag_2", "high_lag_3", "high_lag_5", "high_lag_10", "high_lag_20",
-    "low_lag_1", "low_lag_2", "low_lag_3", "low_lag_5", "low_lag_10", "low_lag_20",
-    "open_lag_1", "open_lag_2", "open_lag_3", "open_lag_5", "open_lag_10", "open_lag_20",
-    "volume_lag_1", "volume_lag_2", "volume_lag_3", "volume_lag_5", "volume_lag_10", "volume_lag_20"
-]
+# Indicator columns come from the registry in config.yaml (src/indicator_registry.py)
+TECHNICAL_INDICATOR_COLUMNS = ["symbol_id", "date"] + indicator_columns(stored=True)
+# Lag columns are not stored; they are computed from stock_prices when read
+LAG_COLUMNS = lag_columns()
+LAG_SOURCE_COLUMNS = {
+    'open': 'open_price', 'high': 'high_price', 'low': 'low_price', 'close': 'close_price', 'volume': 'volume',
+}
+# Tables joined by get_feature_matrix, with their aliases; stock_prices is the driving table
+FEATURE_TABLES = {
+    'stock_prices': 'sp', 'technical_indicators': 'ti', 'technical_trade_signals': 'ts',
+    'outcomes': 'o', 'calendar': 'c',
+}
+# Feature matrix names of the stock_prices columns, as get_all_stock_prices returns them
+FEATURE_PRICE_COLUMNS = {**LAG_SOURCE_COLUMNS, 'adj_close': 'adj_close'}
+# Frame columns each stock_prices column is read from, in order of preference
+PRICE_SOURCE_COLUMNS = {
+    'open_price': ('Open', 'open'),
+    'high_price': ('High', 'high'),
+    'low_price': ('Low', 'low'),
+    'close_price': ('Close', 'close'),
+    'adj_close': ('Adj Close', 'adj_close', 'Close', 'close'),
+    'volume': ('Volume', 'volume'),
+}
+# pipeline_state watermark of each table and the upstream watermark it catches up to
+PIPELINE_STAGES = {
+    'stock_prices': ('last_price_date', None),
+    'technical_indicators': ('last_indicator_date', 'last_price_date'),
+    'technical_trade_signals': ('last_signal_date', 'last_indicator_date'),
+    'outcomes': ('last_outcome_date', 'last_price_date'),
+}
+# pipeline_state column holding when each table was last written for a symbol
+PIPELINE_WRITTEN_AT = {
+    'stock_prices': 'price_written_at',
+    'technical_indicators': 'indicator_written_at',
+    'technical_trade_signals': 'signal_written_at',
+    'outcomes': 'outcome_written_at',
+}
+# Write times to the millisecond, so caches keyed on them see back-to-back writes
+UPDATED_AT = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+# Connection tuning for concurrent mode; journal_mode is set once, by the writer
+CONCURRENT_PRAGMAS = {
+    'synchronous': 'NORMAL',  # WAL stays consistent; only the last commits can be lost on power failure
+    'cache_size': -65536,     # 64 MiB page cache per connection
+    'mmap_size': 1 << 30,     # map up to 1 GiB of the file instead of copying pages through read()
+    'temp_store': 'MEMORY',
+    'busy_timeout': 30_000,   # ms to wait for the writer's lock instead of failing at once
+}
+# Rows per chunk when compact readers downcast while reading
+COMPACT_CHUNK_ROWS = 5_000
+
+def _symbol_filter(column: str, symbol_ids) -> tuple:
+    """Build an optional "column IN (...)" SQL condition and its parameters."""
+    if symbol_ids is None:
+        return "", []
+    symbol_ids = [int(s) for s in symbol_ids]
+    return f" AND {column} IN ({', '.join('?' * len(symbol_ids))})", symbol_ids
+
+def _lag_expressions(lags) -> list:
+    """LAG() window expressions over stock_prices for {column}_lag_{n} names."""
+    expressions = []
+    for name in lags:
+        column, _, periods = name.rpartition('_lag_')
+        if column not in LAG_SOURCE_COLUMNS or not periods.isdigit() or int(periods) < 1:
+            raise ValueError(f"Not a lag column: {name}")
+        expressions.append(f"LAG({LAG_SOURCE_COLUMNS[column]}, {int(periods)}) OVER w AS {name}")
+    return expressions
+
+def _start_filter(condition: str, params: list, start_date, column: str = 'date') -> tuple:
+    """Extend a condition with an optional "column >= start_date" bound."""
+    if start_date is None:
+        return condition, params
+    return condition + f" AND {column} >= ?", params + [pd.Timestamp(start_date).strftime('%Y-%m-%d')]
+
+def _date_text(dates: pd.Series) -> pd.Series:
+    """Format text or datetime dates as the 'YYYY-MM-DD' text stored in SQLite."""
+    return pd.to_datetime(dates).dt.strftime('%Y-%m-%d')
+
+def _day_number(expression: str) -> str:
+    """SQL for the day number (days since 1970-01-01) of a date text expression."""
+    return f"CAST(julianday({expression}) - 2440587.5 AS INTEGER)"
+
+def _day_text(expression: str) -> str:
+    """SQL for the date text of a day number expression."""
+    return f"date(({expression}) * 86400, 'unixepoch')"
+
+def _serialized(method):
+    """Run a write method under the manager's write lock, so threads sharing the connection never interleave."""
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._write_lock:
+            return method(self, *args, **kwargs)
+    return locked
 
 class DatabaseManager:
     """
     Manages database operations for stock prediction ML project
     """
     
-    def __init__(self, db_path: str = None, config_path: str = '../config.yaml'):
+    def __init__(self, db_path: str = None, config_path: str = '../config.yaml', concurrent: bool = False):
         """
         Initialize database manager
         
@@ -62,13 +139,23 @@ class DatabaseManager:
             Path to SQLite database file
         config_path : str
             Path to configuration file
+        concurrent : bool
+            Open the database in WAL mode with tuned pragmas, one writer
+            connection whose writes are serialized by a lock and a pooled
+            read-only connection per thread (reader()), so reads proceed
+            during writes
         """
         if db_path is None:
             db_path = str(Path(__file__).parent / 'stock_database.db')
         
         self.db_path = db_path
         self.config_path = config_path
+        self.concurrent = concurrent
         self.connection = None
+        self._write_lock = threading.RLock()
+        self._pool_lock = threading.Lock()
+        self._readers = threading.local()
+        self._reader_connections = []
         
         # Load configuration
         try:
@@ -81,16 +168,94 @@ class DatabaseManager:
     def connect(self):
         """Establish database connection"""
         try:
-            self.connection = sqlite3.connect(self.db_path)
+            # In concurrent mode any thread may write, one at a time under _write_lock
+            self.connection = sqlite3.connect(self.db_path, check_same_thread=not self.concurrent)
             self.connection.row_factory = sqlite3.Row  # Enable column access by name
             self.connection.execute("PRAGMA foreign_keys = ON;")  # Enforce foreign key constraints
-            logger.info(f"Connected to database: {self.db_path} (foreign_keys=ON)")
+            if self.concurrent:
+                self.connection.execute("PRAGMA journal_mode = WAL")
+                self._tune(self.connection)
+            logger.info(f"Connected to database: {self.db_path} (foreign_keys=ON"
+                        f"{', WAL' if self.concurrent else ''})")
         except Exception as e:
             logger.error(f"Failed to connect to database: {e}")
             raise
+        self._upgrade_schema()
+
+    def _upgrade_schema(self):
+        """
+        Run setup_database on a database set up by an older version, so the
+        tables and columns added since (pipeline_state and its write times,
+        configured indicator and outcome columns, the signal_events run
+        layout) exist before anything reads or writes them.
+        A database without a schema yet is left to setup_database.
+        """
+        tables = {row[0] for row in self.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if 'stock_prices' not in tables:
+            return
+        current = (
+            'pipeline_state' in tables
+            and set(TECHNICAL_INDICATOR_COLUMNS) <= set(self._table_columns('technical_indicators'))
+            and set(OUTCOME_COLUMNS) <= set(self._table_columns('outcomes'))
+            and 'start' in self._table_columns('signal_events')
+            and 'layout' in self._table_columns('signal_definitions')
+            and set(PIPELINE_WRITTEN_AT.values()) <= set(self._table_columns('pipeline_state'))
+        )
+        if not current:
+            logger.info(f"Upgrading the schema of {self.db_path}")
+            self.setup_database()
+
+    @staticmethod
+    def _tune(connection):
+        for pragma, value in CONCURRENT_PRAGMAS.items():
+            connection.execute(f"PRAGMA {pragma} = {value}")
+
+    def _read_connection(self):
+        """The calling thread's read-only connection, opened on first use."""
+        connection = getattr(self._readers, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(f"{Path(self.db_path).absolute().as_uri()}?mode=ro", uri=True,
+                                         check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            self._tune(connection)
+            self._readers.connection = connection
+            with self._pool_lock:
+                self._reader_connections.append(connection)
+        return connection
+
+    def reader(self) -> 'DatabaseReader':
+        """
+        A reader whose get_* methods run on the calling thread's pooled
+        read-only connection (concurrent mode only). In WAL mode readers see
+        the last committed data and never wait for writes.
+        """
+        if not self.concurrent:
+            raise RuntimeError("reader() needs DatabaseManager(concurrent=True)")
+        view = getattr(self._readers, 'view', None)
+        if view is None:
+            view = DatabaseReader(self, self._read_connection())
+            self._readers.view = view
+        return view
+
+    @contextmanager
+    def writer(self):
+        """
+        Hold the write lock across a block of writes, so another thread's
+        writes cannot come between them. Each write method also takes the
+        lock itself, so single writes need no block.
+        """
+        with self._write_lock:
+            if not self.connection:
+                self.connect()
+            yield self
     
     def disconnect(self):
         """Close database connection"""
+        with self._pool_lock:
+            for connection in self._reader_connections:
+                connection.close()
+            self._reader_connections.clear()
+            self._readers = threading.local()
         if self.connection:
             self.connection.close()
             self.connection = None
@@ -105,6 +270,7 @@ class DatabaseManager:
         """Context manager exit"""
         self.disconnect()
     
+    @_serialized
     def execute_script(self, script_path: str):
         """
         Execute SQL script from file
@@ -129,12 +295,60 @@ class DatabaseManager:
             self.connection.rollback()
             raise
     
+    @_serialized
     def setup_database(self):
         """Initialize database schema"""
+        self.setup_technical_indicators_table()
+        # signal_events from before runs were stored as day numbers is rebuilt below
+        old_events = self._table_columns('signal_events')
+        if old_events and 'start' not in old_events:
+            self.connection.execute("ALTER TABLE signal_events RENAME TO signal_events_dated")
         schema_path = Path(__file__).parent / 'schema.sql'
         self.execute_script(str(schema_path))
+        # Outcome tables created before the path labels existed
+        self._add_missing_columns('outcomes', OUTCOME_COLUMNS)
+        self._add_missing_columns('pipeline_state', PIPELINE_WRITTEN_AT.values(), 'TIMESTAMP')
+        if 'layout' not in self._table_columns('signal_definitions'):
+            self.connection.execute("ALTER TABLE signal_definitions ADD COLUMN layout TEXT NOT NULL DEFAULT 'runs'")
+        if old_events and 'start' not in old_events:
+            # Events written before they became runs have no end_date: one-bar runs
+            end_date = 'end_date' if 'end_date' in old_events else 'date'
+            self.connection.execute(f"""
+                INSERT INTO signal_events (symbol_id, signal_id, start, days, value)
+                SELECT symbol_id, signal_id, {_day_number('date')},
+                       {_day_number(end_date)} - {_day_number('date')}, value
+                FROM signal_events_dated
+            """)
+            self.connection.execute("DROP TABLE signal_events_dated")
+        # Databases filled before pipeline_state existed
+        if self.connection.execute("SELECT 1 FROM pipeline_state LIMIT 1").fetchone() is None:
+            self.rebuild_pipeline_state()
+        self.connection.commit()
         logger.info("Database schema initialized")
+
+    @_serialized
+    def setup_technical_indicators_table(self):
+        """
+        Create the technical_indicators table from the indicator registry, and
+        add any configured indicator column an existing table is missing.
+        """
+        if not self.connection:
+            self.connect()
+        self.connection.execute(technical_indicators_ddl())
+        self._add_missing_columns('technical_indicators', TECHNICAL_INDICATOR_COLUMNS)
+        self.connection.commit()
+
+    def _add_missing_columns(self, table: str, columns: list, kind: str = 'REAL'):
+        """Add each of ``columns`` that ``table`` lacks as a ``kind`` column."""
+        cursor = self.connection.cursor()
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in cursor.fetchall()}
+        for col in columns:
+            if col not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {col} {kind}")
+                logger.info(f"Added column {table}.{col}")
     
+    @_serialized
     def insert_symbol(self, symbol: str, name: str = None, sector: str = None, industry: str = None, country: str = None, market_cap: str = None, exchange: str = None) -> int:
         """
         Insert symbol if it does not exist, or return its symbol_id. Do NOT overwrite existing fields with None.
@@ -156,6 +370,21 @@ class DatabaseManager:
         self.connection.commit()
         return cursor.lastrowid
     
+    def _get_symbol_ids(self, symbols) -> dict:
+        """
+        Map symbols to their symbol_id, inserting the ones not registered yet
+        (as insert_symbol does), without committing.
+        """
+        symbols = [str(symbol) for symbol in symbols]
+        cursor = self.connection.cursor()
+        cursor.executemany("""
+            INSERT OR IGNORE INTO symbols (symbol, is_active, updated_at)
+            VALUES (?, 1, CURRENT_TIMESTAMP)
+        """, [(symbol,) for symbol in symbols])
+        cursor.execute(f"SELECT symbol, symbol_id FROM symbols WHERE symbol IN ({', '.join('?' * len(symbols))})",
+                       symbols)
+        return dict(cursor.fetchall())
+
     def insert_stock_prices(self, df: pd.DataFrame, symbol: str):
         """
         Insert stock price data
@@ -163,49 +392,56 @@ class DatabaseManager:
         Parameters:
         -----------
         df : pd.DataFrame
-            Stock price data with OHLCV columns
+            Stock price data with OHLCV columns, indexed by date
         symbol : str
             Stock symbol
         """
+        self._insert_prices(df, np.full(len(df), symbol, dtype=object), df.index, symbol)
+
+    def insert_stock_prices_bulk(self, df: pd.DataFrame):
+        """
+        Insert stock price data for many symbols in one transaction.
+
+        Parameters:
+        -----------
+        df : pd.DataFrame
+            Long frame with a 'symbol' column, OHLCV columns and dates in a
+            'date' column (or the index)
+        """
+        dates = df['date'] if 'date' in df.columns else df.index
+        self._insert_prices(df, df['symbol'].to_numpy(), dates, f"{df['symbol'].nunique()} symbols")
+
+    @_serialized
+    def _insert_prices(self, df: pd.DataFrame, symbols, dates, label: str):
+        """
+        Upsert price rows: the source column of every stock_prices column is
+        resolved once per frame (see PRICE_SOURCE_COLUMNS) and the rows are
+        written from whole column arrays.
+        """
+        if df.empty:
+            return
         if not self.connection:
             self.connect()
-        
-        # Get or create symbol ID
-        symbol_id = self.insert_symbol(symbol)
-        
         try:
-            # Prepare data for insertion
-            records = []
-            for date_idx, row in df.iterrows():
-                if isinstance(date_idx, str):
-                    date_val = pd.to_datetime(date_idx).date()
+            symbol_ids = self._get_symbol_ids(pd.unique(symbols))
+            rows = {
+                'symbol_id': pd.Series(symbols).map(symbol_ids).to_numpy(),
+                'date': _date_text(pd.Series(dates)).to_numpy(),
+            }
+            for column, sources in PRICE_SOURCE_COLUMNS.items():
+                source = next((name for name in sources if name in df.columns), None)
+                if source is not None:
+                    rows[column] = df[source].to_numpy(dtype='float64')
+                elif column == 'volume':
+                    rows[column] = np.zeros(len(df))
                 else:
-                    date_val = date_idx.date()
-                
-                records.append((
-                    symbol_id,
-                    date_val,
-                    float(row.get('Open', row.get('open', None))),
-                    float(row.get('High', row.get('high', None))),
-                    float(row.get('Low', row.get('low', None))),
-                    float(row.get('Close', row.get('close', None))),
-                    float(row.get('Adj Close', row.get('adj_close', row.get('Close', row.get('close', None))))),
-                    int(row.get('Volume', row.get('volume', 0)))
-                ))
-            
-            # Insert records
-            cursor = self.connection.cursor()
-            cursor.executemany("""
-                INSERT OR REPLACE INTO stock_prices 
-                (symbol_id, date, open_price, high_price, low_price, close_price, adj_close, volume)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, records)
-            
+                    raise KeyError(f"No price column for {column} (expected one of {sources})")
+            rows['volume'] = np.nan_to_num(rows['volume']).astype('int64')
+            self._upsert_rows('stock_prices', pd.DataFrame(rows))
             self.connection.commit()
-            logger.info(f"Inserted {len(records)} price records for {symbol}")
-            
+            logger.info(f"Inserted {len(df)} price records for {label}")
         except Exception as e:
-            logger.error(f"Failed to insert stock prices for {symbol}: {e}")
+            logger.error(f"Failed to insert stock prices for {label}: {e}")
             self.connection.rollback()
             raise
     
@@ -280,146 +516,900 @@ class DatabaseManager:
         df = pd.read_sql_query(query, self.connection, params=[f'-{lookback_days} days'])
         return df
 
-    def insert_technical_indicators(self, indicators_df, upsert=False, batch_size=100):
-        if indicators_df.empty:
+    def get_new_stock_prices(self, symbol_ids: list = None) -> pd.DataFrame:
+        """
+        Get stock prices that come after each symbol's saved indicator state.
+        Symbols without state get their full history.
+        Optionally restricted to the given symbol_ids.
+        Returns the same columns as get_all_stock_prices.
+        """
+        if not self.connection:
+            self.connect()
+
+        condition, params = _symbol_filter('sp.symbol_id', symbol_ids)
+        query = f"""
+            SELECT s.symbol, s.symbol_id, sp.date, sp.open_price as open, sp.high_price as high,
+                   sp.low_price as low, sp.close_price as close, sp.adj_close, sp.volume
+            FROM stock_prices sp
+            JOIN symbols s ON sp.symbol_id = s.symbol_id
+            LEFT JOIN indicator_state st ON st.symbol_id = sp.symbol_id
+            WHERE (st.last_date IS NULL OR sp.date > st.last_date){condition}
+            ORDER BY s.symbol, sp.date
+        """
+        df = pd.read_sql_query(query, self.connection, params=params)
+        if not df.empty:
+            df['date'] = pd.to_datetime(df['date'])
+        return df
+
+    def get_indicator_states(self, symbol_ids: list = None) -> dict:
+        """
+        Get the saved incremental indicator state of every symbol (or of the
+        given symbol_ids), keyed by symbol_id.
+        """
+        if not self.connection:
+            self.connect()
+        condition, params = _symbol_filter('symbol_id', symbol_ids)
+        cursor = self.connection.cursor()
+        cursor.execute(f"SELECT symbol_id, state FROM indicator_state WHERE 1 = 1{condition}", params)
+        return {row[0]: json.loads(row[1]) for row in cursor.fetchall()}
+
+    @_serialized
+    def save_indicator_states(self, states: dict):
+        """
+        Insert or replace incremental indicator state, keyed by symbol_id.
+        """
+        if not states:
             return
         if not self.connection:
             self.connect()
-        # Only keep columns that exist in the table
+        try:
+            self._write_indicator_states(states)
+            self.connection.commit()
+            logger.info(f"Saved indicator state for {len(states)} symbols")
+        except Exception as e:
+            logger.error(f"Failed to save indicator state: {e}")
+            self.connection.rollback()
+            raise
+
+    def _write_indicator_states(self, states: dict):
+        records = [
+            (int(symbol_id), state['last_date'], json.dumps(state))
+            for symbol_id, state in states.items()
+        ]
+        self.connection.executemany("""
+            INSERT OR REPLACE INTO indicator_state (symbol_id, last_date, state, updated_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+        """, records)
+
+    @_serialized
+    def write_feature_batch(self, symbol_ids: list, tables: dict, states: dict = None, replace: bool = True):
+        """
+        Write each table of ``tables`` (table name -> frame keyed by symbol_id
+        and date) and save the indicator states, all in one transaction. With
+        replace=True every stored row of ``symbol_ids`` is deleted first;
+        otherwise the rows are upserted. Columns a table lacks are dropped.
+        """
+        if not self.connection:
+            self.connect()
+        condition, params = _symbol_filter('symbol_id', symbol_ids)
+        cursor = self.connection.cursor()
+        try:
+            for table, df in tables.items():
+                if replace:
+                    cursor.execute(f"DELETE FROM {table} WHERE 1 = 1{condition}", params)
+                if not df.empty:
+                    self._upsert_rows(table, df)
+            if states:
+                self._write_indicator_states(states)
+            self.connection.commit()
+        except Exception as e:
+            logger.error(f"Failed to write feature batch: {e}")
+            self.connection.rollback()
+            raise
+
+    def _table_columns(self, table: str) -> list:
+        cursor = self.connection.execute(f"PRAGMA table_info({table})")
+        return [row[1] for row in cursor.fetchall()]
+
+    def _upsert_rows(self, table: str, df: pd.DataFrame, keys=('symbol_id', 'date')):
+        """
+        Insert the rows of ``df`` into ``table``, updating the rows that
+        already exist for the same ``keys``, without committing. Columns the
+        table lacks are dropped; dates are stored as text.
+        """
+        table_columns = set(self._table_columns(table))
+        columns = [col for col in df.columns if col in table_columns]
+        dropped = [col for col in df.columns if col not in table_columns]
+        if dropped:
+            logger.debug(f"Dropping columns not in {table}: {dropped}")
+        rows = df[columns]
+        if 'date' in columns:
+            rows = rows.assign(date=_date_text(rows['date']))
+        if table in PIPELINE_STAGES and len(rows):
+            self._advance_watermarks(table, rows['symbol_id'], rows['date'])
+        updates = [col for col in columns if col not in keys]
+        conflict = f"DO UPDATE SET {', '.join(f'{col} = excluded.{col}' for col in updates)}" if updates else "DO NOTHING"
+        self.connection.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT({', '.join(keys)}) {conflict}",
+            rows.itertuples(index=False, name=None)
+        )
+
+    def _advance_watermarks(self, table: str, symbol_ids, dates):
+        """
+        Move each symbol's pipeline_state watermark of ``table`` up to its
+        latest of ``dates`` and stamp the table's write time, without committing.
+        """
+        column, written_at = PIPELINE_STAGES[table][0], PIPELINE_WRITTEN_AT[table]
+        last = pd.Series(dates.to_numpy(), index=symbol_ids.to_numpy()).groupby(level=0).max()
+        self.connection.executemany(f"""
+            INSERT INTO pipeline_state (symbol_id, {column}, {written_at}, updated_at)
+            VALUES (?, ?, {UPDATED_AT}, {UPDATED_AT})
+            ON CONFLICT(symbol_id) DO UPDATE SET
+                {column} = MAX(COALESCE({column}, excluded.{column}), excluded.{column}),
+                {written_at} = {UPDATED_AT},
+                updated_at = {UPDATED_AT}
+        """, zip(last.index.astype(int).tolist(), last.tolist()))
+
+    @_serialized
+    def rebuild_pipeline_state(self):
+        """Recompute every pipeline_state watermark from the tables' latest dates."""
+        if not self.connection:
+            self.connect()
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("DELETE FROM pipeline_state")
+            for table, (column, _) in PIPELINE_STAGES.items():
+                written_at = PIPELINE_WRITTEN_AT[table]
+                cursor.execute(f"""
+                    INSERT INTO pipeline_state (symbol_id, {column}, {written_at})
+                    SELECT symbol_id, MAX(date), {UPDATED_AT} FROM {table} WHERE 1 = 1 GROUP BY symbol_id
+                    ON CONFLICT(symbol_id) DO UPDATE SET {column} = excluded.{column},
+                        {written_at} = excluded.{written_at}
+                """)
+            self.connection.commit()
+        except Exception as e:
+            logger.error(f"Failed to rebuild pipeline state: {e}")
+            self.connection.rollback()
+            raise
+
+    def get_pipeline_state(self, symbol_ids: list = None) -> pd.DataFrame:
+        """Get the pipeline_state watermarks of every symbol (or of the given symbol_ids)."""
+        if not self.connection:
+            self.connect()
+        condition, params = _symbol_filter('symbol_id', symbol_ids)
+        return pd.read_sql_query(f"""
+            SELECT symbol_id, last_price_date, last_indicator_date, last_signal_date, last_outcome_date
+            FROM pipeline_state WHERE 1 = 1{condition} ORDER BY symbol_id
+        """, self.connection, params=params)
+
+    def get_write_watermarks(self, table: str, bucket_symbols: int) -> dict:
+        """
+        Per bucket of ``bucket_symbols`` symbol ids: [last write time of
+        ``table`` (a PIPELINE_STAGES key), symbols with rows in it], from
+        pipeline_state. Writes to the other tables leave it unchanged.
+        """
+        if not self.connection:
+            self.connect()
+        column, written_at = PIPELINE_STAGES[table][0], PIPELINE_WRITTEN_AT[table]
+        rows = self.connection.execute(f"""
+            SELECT symbol_id / ?, MAX({written_at}), COUNT({column})
+            FROM pipeline_state GROUP BY 1 HAVING COUNT({column}) > 0
+        """, [bucket_symbols]).fetchall()
+        return {str(row[0]): [row[1], row[2]] for row in rows}
+
+    def get_dirty_symbols(self, table: str, symbol_ids: list = None) -> pd.DataFrame:
+        """
+        Symbols whose ``table`` (a PIPELINE_STAGES key) is behind its upstream
+        watermark, with the date range still to compute: ``since`` is the last
+        date already written (None when the symbol has no rows yet) and
+        ``through`` the upstream's last date.
+        """
+        if not self.connection:
+            self.connect()
+        column, upstream = PIPELINE_STAGES[table]
+        condition, params = _symbol_filter('symbol_id', symbol_ids)
+        return pd.read_sql_query(f"""
+            SELECT symbol_id, {column} AS since, {upstream} AS through
+            FROM pipeline_state
+            WHERE {upstream} IS NOT NULL AND ({column} IS NULL OR {column} < {upstream}){condition}
+            ORDER BY symbol_id
+        """, self.connection, params=params)
+
+    @_serialized
+    def bulk_upsert(self, table: str, df: pd.DataFrame, keys=('symbol_id', 'date')):
+        """
+        Insert or update the rows of ``df`` in ``table`` by ``keys`` in one
+        transaction (see _upsert_rows), so re-runs overwrite instead of
+        failing on the unique key.
+        """
+        if df.empty:
+            return
+        if not self.connection:
+            self.connect()
+        try:
+            self._upsert_rows(table, df, keys)
+            self.connection.commit()
+            logger.info(f"Upserted {len(df)} rows into {table}")
+        except Exception as e:
+            logger.error(f"Failed to upsert into {table}: {e}")
+            self.connection.rollback()
+            raise
+
+    def insert_technical_indicators(self, indicators_df):
+        """
+        Insert or update technical indicators in the technical_indicators
+        table, keyed by (symbol_id, date). Only registry columns are written.
+        """
         allowed_cols = [col for col in TECHNICAL_INDICATOR_COLUMNS if col in indicators_df.columns]
-        for start in range(0, len(indicators_df), batch_size):
-            end = start + batch_size
-            batch = indicators_df.iloc[start:end][allowed_cols]
-            batch.to_sql(
-                'technical_indicators',
-                self.connection,
-                if_exists='append',
-                index=False,
-                method='multi'
+        self.bulk_upsert('technical_indicators', indicators_df[allowed_cols])
+
+    def _read_frame(self, query: str, params: list, compact: bool = False, dtype: dict = None) -> pd.DataFrame:
+        """
+        Run a SELECT into a DataFrame. With compact=True the rows are read in
+        chunks and each chunk is downcast by compact_frame, so the full-width
+        float64/int64 frame is never held in memory.
+        """
+        if not compact:
+            return pd.read_sql_query(query, self.connection, params=params)
+        chunks = [
+            compact_frame(chunk)
+            for chunk in pd.read_sql_query(
+                query, self.connection, params=params, dtype=dtype, chunksize=COMPACT_CHUNK_ROWS
             )
+        ]
+        if not chunks:
+            return pd.read_sql_query(query, self.connection, params=params)
+        df = pd.concat(chunks, ignore_index=True)
+        if 'symbol' in df.columns:
+            # Chunks carry different categories; concat falls back to text
+            df['symbol'] = df['symbol'].astype('category')
+        return df
 
-    def get_all_stock_prices(self) -> pd.DataFrame:
+    def get_symbol_ids_with_prices(self) -> list:
+        """Get the symbol_id of every symbol that has price data."""
+        if not self.connection:
+            self.connect()
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT DISTINCT symbol_id FROM stock_prices ORDER BY symbol_id")
+        return [row[0] for row in cursor.fetchall()]
+
+    def get_all_stock_prices(self, symbol_ids: list = None) -> pd.DataFrame:
         """
         Get all stock price data, joined with symbol names.
+        Optionally restricted to the given symbol_ids.
         Returns a DataFrame with columns: symbol, date, open, high, low, close, adj_close, volume
         """
         if not self.connection:
             self.connect()
 
-        query = """
+        condition, params = _symbol_filter('sp.symbol_id', symbol_ids)
+        query = f"""
             SELECT s.symbol, s.symbol_id, sp.date, sp.open_price as open, sp.high_price as high,
                    sp.low_price as low, sp.close_price as close, sp.adj_close, sp.volume
             FROM stock_prices sp
             JOIN symbols s ON sp.symbol_id = s.symbol_id
+            WHERE 1 = 1{condition}
+            ORDER BY s.symbol, sp.date
+        """
+        df = pd.read_sql_query(query, self.connection, params=params)
+        if not df.empty:
+            df['date'] = pd.to_datetime(df['date'])
+        return df
+
+    def get_outcome_prices(self, symbol_ids: list = None, trailing_rows: int = TRAILING_ROWS) -> pd.DataFrame:
+        """
+        Get the prices needed to refresh outcomes: each symbol's bars from its
+        ``trailing_rows``-th last outcome row on, whose labels can still change,
+        or its full history when it has fewer outcome rows.
+        Returns the same columns as get_all_stock_prices.
+        """
+        if not self.connection:
+            self.connect()
+
+        condition, params = _symbol_filter('s.symbol_id', symbol_ids)
+        query = f"""
+            WITH starts AS MATERIALIZED (
+                SELECT s.symbol_id, (
+                    SELECT o.date FROM outcomes o
+                    WHERE o.symbol_id = s.symbol_id
+                    ORDER BY o.date DESC LIMIT 1 OFFSET ?
+                ) AS start_date
+                FROM symbols s
+                WHERE 1 = 1{condition}
+            )
+            SELECT s.symbol, s.symbol_id, sp.date, sp.open_price as open, sp.high_price as high,
+                   sp.low_price as low, sp.close_price as close, sp.adj_close, sp.volume
+            FROM starts st
+            -- CROSS JOIN keeps the per-symbol starts as the outer loop, so each
+            -- symbol is one range on stock_prices' (symbol_id, date) index
+            CROSS JOIN stock_prices sp ON sp.symbol_id = st.symbol_id AND sp.date >= COALESCE(st.start_date, '')
+            JOIN symbols s ON sp.symbol_id = s.symbol_id
             ORDER BY s.symbol, sp.date
         """
-        df = pd.read_sql_query(query, self.connection)
+        df = pd.read_sql_query(query, self.connection, params=[trailing_rows - 1] + params)
         if not df.empty:
             df['date'] = pd.to_datetime(df['date'])
         return df
 
-    def get_all_technical_indicators(self) -> pd.DataFrame:
+    def get_all_technical_indicators(self, symbol_ids: list = None, compact: bool = False,
+                                     lags: list = None, with_close: bool = False,
+                                     start_date=None) -> pd.DataFrame:
         """
         Get all technical indicator data.
+        Optionally restricted to the given symbol_ids and to dates from start_date on.
+        With compact=True indicators are float32, symbol_id int32 and symbol categorical.
+        Lag columns ({column}_lag_{n}, the configured set by default) are computed
+        from stock_prices with LAG() window functions; pass any other list of
+        lag names, or [] for none. with_close=True adds the bar's close price.
         Returns a DataFrame with columns: symbol, date, ...[all indicator columns]...
         """
         if not self.connection:
             self.connect()
 
-        query = """
-            SELECT ti.*, s.symbol
-            FROM technical_indicators ti
+        lags = LAG_COLUMNS if lags is None else list(lags)
+        # The registry's columns only: tables created before lags became
+        # virtual may still hold lag and other unconfigured columns
+        stored = ['id'] + TECHNICAL_INDICATOR_COLUMNS + ['created_at']
+        columns = ", ".join(f"ti.{col}" for col in stored)
+        condition, params = _symbol_filter('ti.symbol_id', symbol_ids)
+        condition, params = _start_filter(condition, params, start_date, 'ti.date')
+        source, lag_params = "technical_indicators ti", []
+        close = ['close'] if with_close else []
+        if lags:
+            lag_condition, lag_params = _symbol_filter('symbol_id', symbol_ids)
+            price_columns = _lag_expressions(lags) + (["close_price AS close"] if with_close else [])
+            columns += ", " + ", ".join(f"lg.{name}" for name in lags + close)
+            # CROSS JOIN keeps the lag subquery as the outer loop, so each row is
+            # a lookup on technical_indicators' (symbol_id, date) index
+            source = f"""(
+                SELECT symbol_id, date, {', '.join(price_columns)}
+                FROM stock_prices
+                WHERE 1 = 1{lag_condition}
+                WINDOW w AS (PARTITION BY symbol_id ORDER BY date)
+            ) lg
+            CROSS JOIN technical_indicators ti ON ti.symbol_id = lg.symbol_id AND ti.date = lg.date"""
+        elif with_close:
+            columns += ", sp.close_price AS close"
+            source += """
+            LEFT JOIN stock_prices sp ON sp.symbol_id = ti.symbol_id AND sp.date = ti.date"""
+        query = f"""
+            SELECT {columns}, s.symbol
+            FROM {source}
             JOIN symbols s ON ti.symbol_id = s.symbol_id
+            WHERE 1 = 1{condition}
             ORDER BY s.symbol, ti.date
         """
-        df = pd.read_sql_query(query, self.connection)
+        dtype = {col: INDICATOR_DTYPE for col in TECHNICAL_INDICATOR_COLUMNS[2:] + lags + close}
+        df = self._read_frame(query, lag_params + params, compact=compact, dtype=dtype)
         if not df.empty:
             df['date'] = pd.to_datetime(df['date'])
         return df
 
-    def insert_technical_trade_signals(self, signals_df, batch_size=100):
+    def iter_technical_indicators(self, symbol_ids: list = None, block_size: int = 1, **kwargs):
+        """
+        Yield get_all_technical_indicators frames ``block_size`` symbols at a
+        time (every symbol with indicators when symbol_ids is None), so memory
+        is bounded by the largest block instead of the whole table. Keyword
+        arguments are passed on to get_all_technical_indicators.
+        """
+        if not self.connection:
+            self.connect()
+        if symbol_ids is None:
+            cursor = self.connection.cursor()
+            cursor.execute("SELECT DISTINCT symbol_id FROM technical_indicators ORDER BY symbol_id")
+            symbol_ids = [row[0] for row in cursor.fetchall()]
+        symbol_ids = list(symbol_ids)
+        for start in range(0, len(symbol_ids), block_size):
+            block = self.get_all_technical_indicators(symbol_ids[start:start + block_size], **kwargs)
+            if not block.empty:
+                yield block
+
+    def get_cached_table(self, table: str, columns: list = None, symbol_ids: list = None,
+                         start_date=None, end_date=None) -> pd.DataFrame:
+        """
+        Read columns of a feature table (stock_prices, technical_indicators,
+        technical_trade_signals or outcomes) from its memory-mapped columnar
+        cache, refreshing the partitions written since they were cached
+        first (see src/feature_cache.py). Returns symbol_id, date and the
+        columns as float64, sorted by symbol_id and date.
+        """
+        return read_cached(self, table, columns, symbol_ids, start_date, end_date)
+
+    def _feature_sources(self) -> dict:
+        """Feature matrix column name -> table of every column get_feature_matrix can read."""
+        prices = {source: name for name, source in FEATURE_PRICE_COLUMNS.items()}
+        sources = {}
+        for table in FEATURE_TABLES:
+            for col in self._table_columns(table):
+                # Tables created before lags became virtual may still hold lag columns
+                if col in ('id', 'symbol_id', 'date', 'created_at') or '_lag_' in col:
+                    continue
+                sources.setdefault(prices.get(col, col) if table == 'stock_prices' else col, table)
+        return sources
+
+    def _feature_query(self, symbols, start_date, end_date, columns) -> tuple:
+        """SELECT and parameters of get_feature_matrix and get_cross_section."""
+        if not self.connection:
+            self.connect()
+
+        sources = self._feature_sources()
+        columns = list(sources) if columns is None else [
+            col for col in columns if col not in ('symbol', 'symbol_id', 'date')
+        ]
+        lags = [col for col in columns if col not in sources]
+        selected = []
+        for col in columns:
+            if col in lags:
+                selected.append(f"sp.{col}")
+            elif sources[col] == 'stock_prices':
+                selected.append(f"sp.{FEATURE_PRICE_COLUMNS.get(col, col)} AS {col}")
+            else:
+                selected.append(f"{FEATURE_TABLES[sources[col]]}.{col}")
+
+        symbol_ids = None
+        if symbols is not None:
+            names = [s for s in symbols if isinstance(s, str)]
+            symbol_ids = [int(s) for s in symbols if not isinstance(s, str)]
+            if names:
+                cursor = self.connection.cursor()
+                cursor.execute(f"SELECT symbol_id FROM symbols WHERE symbol IN ({', '.join('?' * len(names))})",
+                               names)
+                symbol_ids += [row[0] for row in cursor.fetchall()]
+        condition, params = _symbol_filter('sp.symbol_id', symbol_ids)
+        start = None if start_date is None else pd.Timestamp(start_date).strftime('%Y-%m-%d')
+        end = None if end_date is None else pd.Timestamp(end_date).strftime('%Y-%m-%d')
+        if start is not None and start == end:
+            # An equality keeps a one-day read on the (date, symbol_id) index in symbol_id order
+            condition, params = condition + " AND sp.date = ?", params + [start]
+        else:
+            condition, params = _start_filter(condition, params, start, 'sp.date')
+            if end is not None:
+                condition, params = condition + " AND sp.date <= ?", params + [end]
+
+        source, lag_params = "stock_prices sp", []
+        if lags:
+            lag_condition, lag_params = _symbol_filter('symbol_id', symbol_ids)
+            if end is not None:
+                lag_condition, lag_params = lag_condition + " AND date <= ?", lag_params + [end]
+            # LAG() needs the bars before start_date, so the window runs over
+            # each symbol's history up to end_date and the dates are filtered outside it
+            source = f"""(
+                SELECT *, {', '.join(_lag_expressions(lags))}
+                FROM stock_prices
+                WHERE 1 = 1{lag_condition}
+                WINDOW w AS (PARTITION BY symbol_id ORDER BY date)
+            ) sp"""
+        joins = ""
+        for table in dict.fromkeys(sources[col] for col in columns if col not in lags):
+            alias = FEATURE_TABLES[table]
+            if table == 'calendar':
+                joins += "\n            LEFT JOIN calendar c ON c.date = sp.date"
+            elif table != 'stock_prices':
+                joins += f"\n            LEFT JOIN {table} {alias} ON {alias}.symbol_id = sp.symbol_id AND {alias}.date = sp.date"
+        query = f"""
+            SELECT s.symbol, sp.symbol_id, sp.date{''.join(', ' + col for col in selected)}
+            FROM {source}
+            JOIN symbols s ON s.symbol_id = sp.symbol_id{joins}
+            WHERE 1 = 1{condition}
+            ORDER BY sp.symbol_id, sp.date
         """
-        Insert trade signals into the technical_trade_signals table.
-        Dynamically filters columns to match the table schema.
-        Performs upsert by deleting existing rows for (symbol_id, date) before insert.
+        return query, lag_params + params
+
+    def get_feature_matrix(self, symbols: list = None, start_date=None, end_date=None, columns: list = None,
+                           chunk_size: int = None, compact: bool = False):
+        """
+        Get model inputs: one row per price bar of the given symbols (tickers
+        or symbol_ids, all by default) between start_date and end_date, with
+        the requested columns of stock_prices (named open, high, low, close,
+        adj_close, volume), technical_indicators, technical_trade_signals,
+        outcomes and calendar, plus any {column}_lag_{n} computed from
+        stock_prices. Without columns, every stored column of those tables.
+
+        Only the requested columns are selected and only the tables holding
+        them are joined, each by a lookup on its (symbol_id, date) index;
+        columns missing for a bar are NaN. With chunk_size, returns a
+        generator of frames of at most chunk_size rows instead of one frame.
+        With compact=True each frame is downcast by compact_frame.
+        Returns DataFrames with columns: symbol, symbol_id, date, ...[columns]...
+        sorted by symbol_id and date.
+        """
+        query, params = self._feature_query(symbols, start_date, end_date, columns)
+        if chunk_size is not None:
+            return self._iter_frames(query, params, chunk_size, compact)
+        df = pd.read_sql_query(query, self.connection, params=params)
+        df['date'] = pd.to_datetime(df['date'])
+        return compact_frame(df) if compact else df
+
+    def get_cross_section(self, date, columns: list = None, symbols: list = None,
+                          compact: bool = False) -> pd.DataFrame:
+        """
+        Get every symbol's row on one date (or the given symbols'), with the
+        same columns as get_feature_matrix. The bars are found on stock_prices'
+        (date, symbol_id) index instead of a scan of the table, and the other
+        tables are joined by their (symbol_id, date) lookups. Lag columns still
+        read each symbol's history up to the date.
+        Returns a DataFrame with columns: symbol, symbol_id, date, ...[columns]...
+        sorted by symbol_id.
+        """
+        query, params = self._feature_query(symbols, date, date, columns)
+        df = pd.read_sql_query(query, self.connection, params=params)
+        df['date'] = pd.to_datetime(df['date'])
+        return compact_frame(df) if compact else df
+
+    def _iter_frames(self, query: str, params: list, chunk_size: int, compact: bool = False):
+        """Yield the rows of a SELECT as DataFrames of at most chunk_size rows, dates parsed."""
+        for chunk in pd.read_sql_query(query, self.connection, params=params, chunksize=chunk_size):
+            chunk['date'] = pd.to_datetime(chunk['date'])
+            yield compact_frame(chunk) if compact else chunk
+
+    @_serialized
+    def drop_stored_lag_columns(self):
+        """
+        Drop lag columns left in technical_indicators by tables created before
+        lags were served at read time (needs SQLite 3.35+). Run VACUUM afterwards
+        to return the space to the file system.
+        """
+        if not self.connection:
+            self.connect()
+        cursor = self.connection.cursor()
+        cursor.execute("PRAGMA table_info(technical_indicators)")
+        stored_lags = [row[1] for row in cursor.fetchall() if '_lag_' in row[1]]
+        for col in stored_lags:
+            cursor.execute(f"ALTER TABLE technical_indicators DROP COLUMN {col}")
+        self.connection.commit()
+        logger.info(f"Dropped {len(stored_lags)} stored lag columns from technical_indicators")
+
+    def get_all_technical_trade_signals(self, symbol_ids: list = None, compact: bool = False,
+                                        start_date=None) -> pd.DataFrame:
+        """
+        Get all technical trade signals, optionally restricted to the given
+        symbol_ids and to dates from start_date on.
+        With compact=True signals are int8 and symbol_id int32.
+        Returns a DataFrame with columns: symbol_id, date, ...[all signal columns]...
+        """
+        if not self.connection:
+            self.connect()
+
+        condition, params = _symbol_filter('symbol_id', symbol_ids)
+        condition, params = _start_filter(condition, params, start_date)
+        query = f"""
+            SELECT * FROM technical_trade_signals
+            WHERE 1 = 1{condition}
+            ORDER BY symbol_id, date
+        """
+        df = self._read_frame(query, params, compact=compact)
+        if not df.empty:
+            df['date'] = pd.to_datetime(df['date'])
+        return df
+
+    def insert_technical_trade_signals(self, signals_df):
+        """
+        Insert or update trade signals in the technical_trade_signals table,
+        keyed by (symbol_id, date). Columns not in the table (such as
+        'symbol') are dropped, with a warning for signal columns.
+        """
+        if not self.connection:
+            self.connect()
+        table_columns = set(self._table_columns('technical_trade_signals'))
+        missing = [col for col in signal_columns(signals_df) if col not in table_columns]
+        if missing:
+            logger.warning(f"technical_trade_signals has no column for {len(missing)} signals, "
+                           f"which are not stored: {missing}")
+        self.bulk_upsert('technical_trade_signals', signals_df)
+
+    @_serialized
+    def get_signal_ids(self, names: list = None) -> dict:
+        """
+        Map signal names to their signal_id in signal_definitions, numbering
+        any of ``names`` not registered yet. Without names, every registered signal.
+        """
+        if not self.connection:
+            self.connect()
+        cursor = self.connection.cursor()
+        if names is not None:
+            cursor.executemany("INSERT OR IGNORE INTO signal_definitions (name) VALUES (?)",
+                               [(name,) for name in names])
+            self.connection.commit()
+        cursor.execute("SELECT name, signal_id FROM signal_definitions ORDER BY signal_id")
+        signal_ids = dict(cursor.fetchall())
+        if names is None:
+            return signal_ids
+        return {name: signal_ids[name] for name in names}
+
+    def get_signal_layouts(self) -> dict:
+        """Map every registered signal name to its layout: 'runs' (signal_events) or 'wide'."""
+        if not self.connection:
+            self.connect()
+        return dict(self.connection.execute("SELECT name, layout FROM signal_definitions ORDER BY signal_id"))
+
+    @_serialized
+    def insert_signal_events(self, signals_df):
+        """
+        Store the runs of non-zero values of a wide signals frame (as produced
+        for insert_technical_trade_signals) in signal_events. Each symbol's
+        runs over the frame's date range are replaced, in one transaction; a
+        stored run that continues into the range from the price bar before or
+        after it is joined with the new run it continues (see replace_events).
+
+        A signal's layout is chosen the first time it is stored: one with
+        more runs than DENSE_RUN_FRACTION of the frame's bars is kept in its
+        technical_trade_signals column instead (see wide_layout), so load a
+        history before nightly updates.
         """
         if signals_df.empty:
             return
         if not self.connection:
             self.connect()
-        # Drop 'symbol' column if present
-        if 'symbol' in signals_df.columns:
-            signals_df = signals_df.drop(columns=['symbol'])
-        # Dynamically get columns from the table schema
+        names = signal_columns(signals_df)
+        registered = self.get_signal_layouts()
+        signal_ids = self.get_signal_ids(names)
+        frame = signals_df.assign(date=_date_text(signals_df['date']))
+        frame = frame.sort_values(['symbol_id', 'date'], kind='stable')
+        events = signals_to_events(frame, signal_ids)
+        new = {name: signal_id for name, signal_id in signal_ids.items() if name not in registered}
+        dense = wide_layout(events, new, len(frame))
+        layouts = {**registered, **{name: 'runs' for name in new}, **dict.fromkeys(dense, 'wide')}
+        wide = [name for name in names if layouts[name] == 'wide']
+        events = events[~events['signal_id'].isin([signal_ids[name] for name in wide])]
+        ranges = frame.groupby('symbol_id')['date'].agg(['min', 'max'])
         cursor = self.connection.cursor()
-        cursor.execute("PRAGMA table_info(technical_trade_signals)")
-        table_info = cursor.fetchall()
-        table_columns = [col[1] for col in table_info]
-        # Only keep columns that exist in the table
-        allowed_cols = [col for col in signals_df.columns if col in table_columns]
-        dropped_cols = [col for col in signals_df.columns if col not in table_columns]
-        if dropped_cols:
-            print(f"[insert_technical_trade_signals] Dropping columns not in schema: {dropped_cols}")
-        for start in range(0, len(signals_df), batch_size):
-            end = start + batch_size
-            batch = signals_df.iloc[start:end][allowed_cols].copy()
-            # Ensure date is string for SQLite
-            if 'date' in batch.columns:
-                batch['date'] = batch['date'].astype(str)
-            # Upsert: delete existing rows for (symbol_id, date) in this batch
-            if not batch.empty:
-                symbol_date_tuples = list(batch[['symbol_id', 'date']].itertuples(index=False, name=None))
-                cursor.executemany(
-                    "DELETE FROM technical_trade_signals WHERE symbol_id = ? AND date = ?",
-                    symbol_date_tuples
+        try:
+            cursor.executemany("UPDATE signal_definitions SET layout = 'wide' WHERE name = ?",
+                               [(name,) for name in dense])
+            if wide:
+                self._add_missing_columns('technical_trade_signals', wide, 'INTEGER')
+                self._upsert_rows('technical_trade_signals', frame[['symbol_id', 'date'] + wide])
+            cursor.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS event_bounds (
+                    symbol_id INTEGER PRIMARY KEY, first DATE, last DATE, before DATE, after DATE
                 )
-                self.connection.commit()
-            batch.to_sql(
-                'technical_trade_signals',
-                self.connection,
-                if_exists='append',
-                index=False,
-                method='multi'
+            """)
+            cursor.execute("DELETE FROM event_bounds")
+            cursor.executemany(
+                "INSERT INTO event_bounds (symbol_id, first, last) VALUES (?, ?, ?)",
+                [(int(symbol_id), first, last) for symbol_id, first, last in ranges.itertuples()]
+            )
+            cursor.execute("""
+                UPDATE event_bounds SET
+                    before = (SELECT MAX(date) FROM stock_prices p
+                              WHERE p.symbol_id = event_bounds.symbol_id AND p.date < event_bounds.first),
+                    after = (SELECT MIN(date) FROM stock_prices p
+                             WHERE p.symbol_id = event_bounds.symbol_id AND p.date > event_bounds.last)
+            """)
+            bounds = pd.read_sql_query("SELECT * FROM event_bounds", self.connection)
+            stored = pd.read_sql_query(f"""
+                SELECT {', '.join(f'e.{col}' for col in RUN_COLUMNS)}
+                FROM event_bounds b JOIN signal_events e ON e.symbol_id = b.symbol_id
+                WHERE e.start <= {_day_number('COALESCE(b.after, b.last)')}
+                  AND e.start + e.days >= {_day_number('COALESCE(b.before, b.first)')}
+            """, self.connection)
+            cursor.executemany(
+                "DELETE FROM signal_events WHERE symbol_id = ? AND signal_id = ? AND start = ?",
+                stored[['symbol_id', 'signal_id', 'start']].itertuples(index=False, name=None)
+            )
+            runs = events_to_runs(replace_events(runs_to_events(stored), events, bounds))
+            cursor.executemany(
+                f"INSERT INTO signal_events ({', '.join(RUN_COLUMNS)}) VALUES ({', '.join('?' * len(RUN_COLUMNS))})",
+                runs[RUN_COLUMNS].itertuples(index=False, name=None)
             )
+            self._advance_watermarks('technical_trade_signals', frame['symbol_id'], frame['date'])
+            self.connection.commit()
+        except Exception as e:
+            logger.error(f"Failed to insert signal events: {e}")
+            self.connection.rollback()
+            raise
 
-    def insert_outcomes(self, outcomes_df, batch_size=100):
+    def get_signal_events(self, signals: list = None, value: int = None, start_date=None, end_date=None,
+                          symbol_ids: list = None) -> pd.DataFrame:
         """
-        Insert outcomes into the outcomes table.
+        Get the bars on which signals hold a value, expanded from the stored
+        runs against stock_prices (or read from technical_trade_signals for
+        wide-layout signals), optionally restricted to the given signal
+        names, a value (1 buy, -1 sell), a date range and symbol_ids.
+        Returns a DataFrame with columns: symbol_id, date, signal, value
         """
-        if outcomes_df.empty:
-            return
         if not self.connection:
             self.connect()
-        for start in range(0, len(outcomes_df), batch_size):
-            end = start + batch_size
-            batch = outcomes_df.iloc[start:end]
-            batch.to_sql(
-                'outcomes',
-                self.connection,
-                if_exists='append',
-                index=False,
-                method='multi'
+        layouts = self.get_signal_layouts()
+        signals = list(layouts) if signals is None else list(signals)
+        runs = [name for name in signals if layouts.get(name) == 'runs']
+        frames = []
+        if runs:
+            conditions, params = "", []
+            if value is not None:
+                conditions += " AND e.value = ?"
+                params.append(int(value))
+            # A run counts when it overlaps the range; its bars are then clipped to it
+            if start_date is not None:
+                start_date = pd.Timestamp(start_date).strftime('%Y-%m-%d')
+                conditions += f" AND e.start + e.days >= {_day_number('?')} AND p.date >= ?"
+                params += [start_date, start_date]
+            if end_date is not None:
+                end_date = pd.Timestamp(end_date).strftime('%Y-%m-%d')
+                conditions += f" AND e.start <= {_day_number('?')} AND p.date <= ?"
+                params += [end_date, end_date]
+            condition, symbol_params = _symbol_filter('s.symbol_id', symbol_ids)
+            # CROSS JOINs keep (signal, symbol) as the outer loop, so each pair
+            # is a range of signal_events' (symbol_id, signal_id, start) key
+            query = f"""
+                SELECT p.symbol_id, p.date, d.name AS signal, e.value
+                FROM signal_definitions d
+                CROSS JOIN symbols s
+                CROSS JOIN signal_events e ON e.symbol_id = s.symbol_id AND e.signal_id = d.signal_id
+                CROSS JOIN stock_prices p ON p.symbol_id = e.symbol_id
+                    AND p.date BETWEEN {_day_text('e.start')} AND {_day_text('e.start + e.days')}
+                WHERE d.name IN ({', '.join('?' * len(runs))}){condition}{conditions}
+            """
+            frames.append(pd.read_sql_query(query, self.connection, params=runs + symbol_params + params))
+        for name in signals:
+            if layouts.get(name) != 'wide':
+                continue
+            condition, params = _symbol_filter('symbol_id', symbol_ids)
+            condition, params = _start_filter(condition, params, start_date)
+            if end_date is not None:
+                condition, params = condition + " AND date <= ?", params + [pd.Timestamp(end_date).strftime('%Y-%m-%d')]
+            if value is not None:
+                condition, params = condition + f" AND {name} = ?", params + [int(value)]
+            frames.append(pd.read_sql_query(
+                f"SELECT symbol_id, date, ? AS signal, {name} AS value FROM technical_trade_signals "
+                f"WHERE {name} != 0{condition}", self.connection, params=[name] + params))
+        if not frames:
+            return pd.DataFrame(columns=['symbol_id', 'date', 'signal', 'value'])
+        df = pd.concat(frames, ignore_index=True)
+        order = df['signal'].map({name: i for i, name in enumerate(layouts)})
+        df = df.assign(order=order).sort_values(['symbol_id', 'date', 'order'], kind='stable', ignore_index=True)
+        df = df.drop(columns=['order'])
+        if not df.empty:
+            df['date'] = pd.to_datetime(df['date'])
+        return df
+
+    def get_signal_events_dense(self, symbol_ids: list = None, signals: list = None,
+                                compact: bool = False) -> pd.DataFrame:
+        """
+        Densify signal_events into the technical_trade_signals layout: one row
+        per price bar of the selected symbols and one column per signal (every
+        registered signal by default), 0 on bars no run covers. Wide-layout
+        signals are read from their technical_trade_signals columns. With
+        compact=True signals are int8 and symbol_id int32.
+        Returns a DataFrame with columns: symbol_id, date, ...[signal columns]...
+        """
+        if not self.connection:
+            self.connect()
+        signal_ids = self.get_signal_ids()
+        if signals is not None:
+            signal_ids = {name: signal_ids[name] for name in signals}
+        layouts = self.get_signal_layouts()
+        runs = {name: signal_id for name, signal_id in signal_ids.items() if layouts[name] == 'runs'}
+        wide = [name for name in signal_ids if layouts[name] == 'wide']
+        condition, params = _symbol_filter('symbol_id', symbol_ids)
+        keys = pd.read_sql_query(
+            f"SELECT symbol_id, date FROM stock_prices WHERE 1 = 1{condition} ORDER BY symbol_id, date",
+            self.connection, params=params
+        )
+        stored = pd.read_sql_query(
+            f"""SELECT {', '.join(RUN_COLUMNS)} FROM signal_events
+                WHERE signal_id IN ({', '.join('?' * len(runs))}){condition}""",
+            self.connection, params=list(runs.values()) + params
+        )
+        df = events_to_signals(runs_to_events(stored), keys, runs, compact=compact)
+        if wide:
+            values = pd.read_sql_query(
+                f"SELECT symbol_id, date, {', '.join(wide)} FROM technical_trade_signals WHERE 1 = 1{condition}",
+                self.connection, params=params
             )
+            values = keys.merge(values, on=['symbol_id', 'date'], how='left')[wide]
+            df[wide] = values.fillna(0).astype(SIGNAL_DTYPE if compact else 'int64').to_numpy()
+        df = df[['symbol_id', 'date'] + list(signal_ids)]
+        df['date'] = pd.to_datetime(df['date'])
+        if compact:
+            df['symbol_id'] = df['symbol_id'].astype('int32')
+        return df
 
-    def insert_calendar(self, calendar_df, batch_size=100):
+    def get_all_outcomes(self, symbol_ids: list = None, start_date=None) -> pd.DataFrame:
         """
-        Insert calendar features into the calendar table.
+        Get all outcomes, optionally restricted to the given symbol_ids and to
+        dates from start_date on.
+        Returns a DataFrame with columns: symbol_id, date, price_d{n}..., returns_d{n}...
+        """
+        if not self.connection:
+            self.connect()
+        condition, params = _symbol_filter('symbol_id', symbol_ids)
+        condition, params = _start_filter(condition, params, start_date)
+        query = f"""
+            SELECT * FROM outcomes
+            WHERE 1 = 1{condition}
+            ORDER BY symbol_id, date
+        """
+        df = pd.read_sql_query(query, self.connection, params=params)
+        if not df.empty:
+            df['date'] = pd.to_datetime(df['date'])
+        return df
+
+    def get_signal_evaluation(self) -> pd.DataFrame:
+        """Get the stored signal evaluation summary, one row per signal, value and lookahead."""
+        if not self.connection:
+            self.connect()
+        return pd.read_sql_query(
+            "SELECT * FROM signal_evaluation ORDER BY signal, value, lookahead", self.connection
+        ).drop(columns=['updated_at'])
+
+    def get_signal_evaluation_state(self) -> pd.DataFrame:
+        """Get the last signal date per symbol and lookahead counted in signal_evaluation."""
+        if not self.connection:
+            self.connect()
+        return pd.read_sql_query("SELECT symbol_id, lookahead, through_date FROM signal_evaluation_state",
+                                 self.connection)
+
+    @_serialized
+    def save_signal_evaluation(self, summary_df, watermarks_df, replace: bool = False):
+        """
+        Store a signal evaluation summary and the watermarks of the rows it
+        counted in one transaction. With replace=True the previous summary and
+        watermarks are dropped first (a full refresh).
         """
-        if calendar_df.empty:
-            return
         if not self.connection:
             self.connect()
-        # Ensure date is string for SQLite
-        if 'date' in calendar_df.columns:
-            calendar_df = calendar_df.copy()
-            calendar_df['date'] = pd.to_datetime(calendar_df['date']).dt.strftime('%Y-%m-%d')
-        for start in range(0, len(calendar_df), batch_size):
-            end = start + batch_size
-            batch = calendar_df.iloc[start:end]
-            batch.to_sql(
-                'calendar',
-                self.connection,
-                if_exists='append',
-                index=False,
-                method='multi'
-            )
\ No newline at end of file
+        cursor = self.connection.cursor()
+        summary = summary_df.astype(object).where(summary_df.notna(), None)
+        try:
+            if replace:
+                cursor.execute("DELETE FROM signal_evaluation")
+                cursor.execute("DELETE FROM signal_evaluation_state")
+            columns = list(summary.columns)
+            cursor.executemany(
+                f"INSERT OR REPLACE INTO signal_evaluation ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                summary.itertuples(index=False, name=None)
+            )
+            cursor.executemany(
+                "INSERT OR REPLACE INTO signal_evaluation_state (symbol_id, lookahead, through_date) VALUES (?, ?, ?)",
+                zip(watermarks_df['symbol_id'].astype(int).tolist(), watermarks_df['lookahead'].astype(int).tolist(),
+                    _date_text(watermarks_df['through_date']).tolist())
+            )
+            self.connection.commit()
+        except Exception as e:
+            logger.error(f"Failed to save signal evaluation: {e}")
+            self.connection.rollback()
+            raise
+
+    def insert_outcomes(self, outcomes_df):
+        """
+        Insert or update outcomes in the outcomes table, keyed by (symbol_id, date).
+        """
+        self.bulk_upsert('outcomes', outcomes_df)
+
+    def insert_calendar(self, calendar_df):
+        """
+        Insert or update calendar features in the calendar table, keyed by date.
+        """
+        self.bulk_upsert('calendar', calendar_df, keys=('date',))
+
+
+class DatabaseReader(DatabaseManager):
+    """
+    One thread's read-only view of a concurrent DatabaseManager, as returned
+    by DatabaseManager.reader(). Its connection belongs to the manager's
+    reader pool: entering and leaving it, or disconnect(), leave it open, and
+    the manager closes it on disconnect.
+    """
+
+    def __init__(self, manager: DatabaseManager, connection: sqlite3.Connection):
+        self.db_path = manager.db_path
+        self.config_path = manager.config_path
+        self.config = manager.config
+        self.concurrent = True
+        self.connection = connection
+        self._write_lock = manager._write_lock
+
+    def connect(self):
+        """The pooled connection is opened by the manager; nothing to do."""
+
+    def disconnect(self):
+        """The pooled connection is closed by the manager; nothing to do."""
+
+    def reader(self) -> 'DatabaseReader':
+        return self
+
+    def writer(self):
+        raise RuntimeError("A reader cannot write; use the DatabaseManager's writer()")
@@ -61,75 +61,8 @@ CREATE TABLE IF NOT EXISTS stock_prices (
 --    UNIQUE(news_id, symbol_id)
 --);
 
--- Table for storing technical indicators
-CREATE TABLE IF NOT EXISTS technical_indicators (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    symbol_id INTEGER NOT NULL,
-    date DATE NOT NULL,
-
-    -- RSI
-    rsi_7 REAL, rsi_14 REAL, rsi_30 REAL, rsi_50 REAL,
-
-    -- SMA
-    sma_5 REAL, sma_10 REAL, sma_20 REAL, sma_50 REAL, sma_100 REAL, sma_200 REAL,
-
-    -- EMA
-    ema_5 REAL, ema_10 REAL, ema_20 REAL, ema_50 REAL, ema_100 REAL, ema_200 REAL,
-
-    -- MACD (macd_{fast}_{slow}_{signal})
-    macd_6_13_5 REAL, macd_signal_6_13_5 REAL, macd_hist_6_13_5 REAL,
-    macd_12_26_9 REAL, macd_signal_12_26_9 REAL, macd_hist_12_26_9 REAL,
-    macd_19_39_9 REAL, macd_signal_19_39_9 REAL, macd_hist_19_39_9 REAL,
-
-    -- Bollinger Bands (bb_upper_{window}, etc.)
-    bb_upper_10 REAL, bb_middle_10 REAL, bb_lower_10 REAL,
-    bb_upper_14 REAL, bb_middle_14 REAL, bb_lower_14 REAL,
-    bb_upper_20 REAL, bb_middle_20 REAL, bb_lower_20 REAL,
-    bb_upper_50 REAL, bb_middle_50 REAL, bb_lower_50 REAL,
-
-    -- Stochastic Oscillator
-    stoch_k_7_3 REAL, stoch_d_7_3 REAL,
-    stoch_k_10_3 REAL, stoch_d_10_3 REAL,
-    stoch_k_14_3 REAL, stoch_d_14_3 REAL,
-    stoch_k_21_3 REAL, stoch_d_21_3 REAL,
-    stoch_k_30_3 REAL, stoch_d_30_3 REAL,
-
-    -- CCI
-    cci_10 REAL, cci_14 REAL, cci_20 REAL, cci_40 REAL,
-
-    -- ATR
-    atr_7 REAL, atr_14 REAL, atr_21 REAL, atr_30 REAL,
-
-    -- OBV (rolling windows)
-    obv_10 REAL, obv_20 REAL, obv_50 REAL,
-
-    -- Ichimoku
-    ichimoku_conv_9 REAL, ichimoku_base_26 REAL, ichimoku_spanb_52 REAL,
-    ichimoku_conv_7 REAL, ichimoku_base_22 REAL,
-    ichimoku_conv_12 REAL, ichimoku_base_33 REAL,
-
-    -- Donchian Channel
-    donchian_high_10 REAL, donchian_low_10 REAL,
-    donchian_high_20 REAL, donchian_low_20 REAL,
-    donchian_high_50 REAL, donchian_low_50 REAL,
-
-    -- ADX
-    adx_7 REAL, adx_14 REAL, adx_21 REAL, adx_30 REAL,
-
-    -- Parabolic SAR
-    psar_001_02 REAL, psar_002_02 REAL, psar_004_02 REAL,
-
-    -- Lags (example for Close, repeat for High, Low, Open, Volume)
-    close_lag_1 REAL, close_lag_2 REAL, close_lag_3 REAL, close_lag_5 REAL, close_lag_10 REAL, close_lag_20 REAL,
-    high_lag_1 REAL, high_lag_2 REAL, high_lag_3 REAL, high_lag_5 REAL, high_lag_10 REAL, high_lag_20 REAL,
-    low_lag_1 REAL, low_lag_2 REAL, low_lag_3 REAL, low_lag_5 REAL, low_lag_10 REAL, low_lag_20 REAL,
-    open_lag_1 REAL, open_lag_2 REAL, open_lag_3 REAL, open_lag_5 REAL, open_lag_10 REAL, open_lag_20 REAL,
-    volume_lag_1 REAL, volume_lag_2 REAL, volume_lag_3 REAL, volume_lag_5 REAL, volume_lag_10 REAL, volume_lag_20 REAL,
-
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (symbol_id) REFERENCES symbols(symbol_id),
-    UNIQUE(symbol_id, date)
-);
+-- technical_indicators is generated from the indicator registry in config.yaml
+-- (src/indicator_registry.py) and created by DatabaseManager.setup_database
 
 -- Table for storing technical trade signals
 CREATE TABLE IF NOT EXISTS technical_trade_signals (
@@ -173,6 +106,28 @@ CREATE TABLE IF NOT EXISTS technical_trade_signals (
     UNIQUE(symbol_id, date)
 );
 
+-- Sparse alternative to technical_trade_signals: one row per run of bars over
+-- which a signal holds the same non-zero value (src/signal_events.py), from
+-- day number start (days since 1970-01-01) to start + days. Signals that
+-- change value on most bars keep the wide layout in technical_trade_signals
+-- (signal_definitions.layout = 'wide')
+CREATE TABLE IF NOT EXISTS signal_definitions (
+    signal_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    layout TEXT NOT NULL DEFAULT 'runs'
+);
+
+CREATE TABLE IF NOT EXISTS signal_events (
+    symbol_id INTEGER NOT NULL,
+    signal_id INTEGER NOT NULL,
+    start INTEGER NOT NULL,
+    days INTEGER NOT NULL,
+    value INTEGER NOT NULL,
+    FOREIGN KEY (signal_id) REFERENCES signal_definitions(signal_id),
+    FOREIGN KEY (symbol_id) REFERENCES symbols(symbol_id),
+    PRIMARY KEY (symbol_id, signal_id, start)
+) WITHOUT ROWID;
+
 -- Table for storing predicted vs actual outcomes
 CREATE TABLE IF NOT EXISTS outcomes (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -200,11 +155,50 @@ CREATE TABLE IF NOT EXISTS outcomes (
     returns_d60 REAL,
     returns_d90 REAL,
     returns_d120 REAL,
+    -- Path labels: excursions over the next d bars, bars until a +/- target is hit
+    max_gain_d1 REAL,
+    max_gain_d3 REAL,
+    max_gain_d5 REAL,
+    max_gain_d7 REAL,
+    max_gain_d10 REAL,
+    max_gain_d14 REAL,
+    max_gain_d21 REAL,
+    max_gain_d28 REAL,
+    max_gain_d60 REAL,
+    max_gain_d90 REAL,
+    max_gain_d120 REAL,
+    max_drawdown_d1 REAL,
+    max_drawdown_d3 REAL,
+    max_drawdown_d5 REAL,
+    max_drawdown_d7 REAL,
+    max_drawdown_d10 REAL,
+    max_drawdown_d14 REAL,
+    max_drawdown_d21 REAL,
+    max_drawdown_d28 REAL,
+    max_drawdown_d60 REAL,
+    max_drawdown_d90 REAL,
+    max_drawdown_d120 REAL,
+    bars_to_gain_2pct REAL,
+    bars_to_loss_2pct REAL,
+    bars_to_gain_5pct REAL,
+    bars_to_loss_5pct REAL,
+    bars_to_gain_10pct REAL,
+    bars_to_loss_10pct REAL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (symbol_id) REFERENCES symbols(symbol_id),
     UNIQUE(symbol_id, date)
 );
 
+-- Table for carrying indicator state between incremental updates
+-- (JSON: buffered bars plus the last value of every recursive indicator)
+CREATE TABLE IF NOT EXISTS indicator_state (
+    symbol_id INTEGER PRIMARY KEY,
+    last_date DATE NOT NULL,
+    state TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (symbol_id) REFERENCES symbols(symbol_id)
+);
+
 CREATE TABLE IF NOT EXISTS calendar(
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     date DATE NOT NULL,
@@ -234,8 +228,54 @@ CREATE TABLE IF NOT EXISTS calendar(
     UNIQUE(date)
 );
 
+-- Forward returns of every signal value per lookahead (src/signal_evaluation.py)
+CREATE TABLE IF NOT EXISTS signal_evaluation (
+    signal TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    lookahead INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    hits INTEGER NOT NULL,
+    return_sum REAL,
+    mean_return REAL,
+    median_return REAL,
+    hit_rate REAL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (signal, value, lookahead)
+);
+
+-- Last signal date per symbol and lookahead counted in signal_evaluation
+CREATE TABLE IF NOT EXISTS signal_evaluation_state (
+    symbol_id INTEGER NOT NULL,
+    lookahead INTEGER NOT NULL,
+    through_date DATE NOT NULL,
+    PRIMARY KEY (symbol_id, lookahead)
+);
+
+-- Last date written per symbol to each pipeline table and when the table was
+-- last written for it, advanced in the same transaction as the rows
+-- (PIPELINE_STAGES and PIPELINE_WRITTEN_AT in database_manager.py)
+CREATE TABLE IF NOT EXISTS pipeline_state (
+    symbol_id INTEGER PRIMARY KEY,
+    last_price_date DATE,
+    last_indicator_date DATE,
+    last_signal_date DATE,
+    last_outcome_date DATE,
+    price_written_at TIMESTAMP,
+    indicator_written_at TIMESTAMP,
+    signal_written_at TIMESTAMP,
+    outcome_written_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (symbol_id) REFERENCES symbols(symbol_id)
+);
+
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_stock_prices_symbol_date ON stock_prices(symbol_id, date);
 CREATE INDEX IF NOT EXISTS idx_technical_indicators_symbol_date ON technical_indicators(symbol_id, date);
 CREATE INDEX IF NOT EXISTS idx_technical_trade_signals_symbol_date ON technical_trade_signals(symbol_id, date);
-CREATE INDEX IF NOT EXISTS idx_outcomes_symbol_date ON outcomes(symbol_id, date);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_outcomes_symbol_date ON outcomes(symbol_id, date);
+-- Cross sections (every symbol on one date): the stock_prices index carries the
+-- price columns so a snapshot of prices never reads the table itself
+CREATE INDEX IF NOT EXISTS idx_stock_prices_date_symbol ON stock_prices(
+    date, symbol_id, open_price, high_price, low_price, close_price, adj_close, volume
+);
+CREATE INDEX IF NOT EXISTS idx_technical_indicators_date_symbol ON technical_indicators(date, symbol_id);
\ No newline at end of file
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shared bulk upsert (executemany with ON CONFLICT ... DO UPDATE
+in one transaction) against the previous insert_* path (DataFrame.to_sql
+with method='multi' in batches of 100 rows, after deleting the batch's
+(symbol_id, date) rows on re-runs) for the feature tables of a temporary
+database of synthetic prices.
+
+Reports rows/sec of a first write and of a re-run over the same rows;
+tests/test_database_manager.py checks that both paths leave the same tables.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+# Add src and database to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+sys.path.append(str(Path(__file__).parent.parent / 'database'))
+
+from database_manager import DatabaseManager
+from feature_pipeline import compute_features
+from reference_paths import to_sql_batches
+from synthetic_data import synthetic_prices
+
+def write_tables(db_manager, frames, path):
+    """Write each frame twice (first write, then a re-run) and time both."""
+    timings = {}
+    for table, df in frames.items():
+        for rerun in (False, True):
+            start = time.perf_counter()
+            if path == 'to_sql':
+                to_sql_batches(db_manager, table, df, rerun)
+            else:
+                db_manager.bulk_upsert(table, df)
+            timings[table, rerun] = time.perf_counter() - start
+    return timings
+
+def main(n_symbols=100, n_bars=1000):
+    workdir = tempfile.mkdtemp()
+    seeded = os.path.join(workdir, 'seeded.db')
+    prices_df = synthetic_prices(n_symbols, n_bars)
+    with DatabaseManager(db_path=seeded) as db_manager:
+        db_manager.setup_database()
+        db_manager.insert_stock_prices_bulk(prices_df)
+        indicators, signals, outcomes, _ = compute_features(db_manager.get_all_stock_prices())
+        frames = {'technical_indicators': indicators, 'technical_trade_signals': signals, 'outcomes': outcomes}
+        for table, df in frames.items():
+            columns = db_manager._table_columns(table)
+            df = df[[col for col in df.columns if col in columns]].copy()
+            df['date'] = df['date'].astype(str).str[:10]
+            frames[table] = df
+    print(f"Universe: {n_symbols} symbols x {n_bars} bars")
+
+    try:
+        for path in ('to_sql', 'bulk_upsert'):
+            db_path = os.path.join(workdir, f'{path}.db')
+            shutil.copy(seeded, db_path)
+            with DatabaseManager(db_path=db_path) as db_manager:
+                timings = write_tables(db_manager, frames, path)
+            for table, df in frames.items():
+                first, rerun = len(df) / timings[table, False], len(df) / timings[table, True]
+                print(f"{path:<12}{table:<26}{len(df.columns):>4} cols  "
+                      f"first {first:>9,.0f} rows/s  re-run {rerun:>9,.0f} rows/s")
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark bulk upserts against batched to_sql writes')
+    parser.add_argument('--symbols', type=int, default=100, help='Number of synthetic symbols')
+    parser.add_argument('--bars', type=int, default=1000, help='Bars per symbol')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+    main(n_symbols=args.symbols, n_bars=args.bars)
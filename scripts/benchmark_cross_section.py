@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark cross-sectional snapshots (every symbol on one date) before and
+after the (date, symbol_id) indexes, on a temporary database of synthetic
+prices and indicators (3,000 symbols over six years of sessions by default).
+
+The database is filled without the date indexes, which every index in
+schema.sql led with symbol_id before, and snapshot latency is measured for
+get_cross_section and for a direct technical_indicators read on random
+dates; setup_database then builds the indexes and the same dates are read
+again. tests/test_database_manager.py checks what get_cross_section returns.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Add src and database to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+sys.path.append(str(Path(__file__).parent.parent / 'database'))
+
+from database_manager import DatabaseManager
+from synthetic_data import synthetic_prices
+from technical_indicators import generate_indicators_panel
+
+DATE_INDEXES = ['idx_stock_prices_date_symbol', 'idx_technical_indicators_date_symbol']
+# Symbols per block while filling, to bound the indicator frames in memory
+FILL_SYMBOLS = 100
+
+def fill(db_manager, prices_df):
+    for start in range(1, prices_df['symbol_id'].max() + 1, FILL_SYMBOLS):
+        block = prices_df[prices_df['symbol_id'].between(start, start + FILL_SYMBOLS - 1)]
+        db_manager.insert_stock_prices_bulk(block)
+        db_manager.insert_technical_indicators(generate_indicators_panel(block))
+
+def read_indicators(db_manager, day, columns):
+    df = pd.read_sql_query(f"""
+        SELECT symbol_id, date, {', '.join(columns)} FROM technical_indicators
+        WHERE date = ? ORDER BY symbol_id
+    """, db_manager.connection, params=[day.strftime('%Y-%m-%d')])
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+def snapshots(db_manager, days, columns, indicators):
+    """Latency of each read per date, in ms."""
+    reads = {
+        'get_cross_section': lambda day: db_manager.get_cross_section(day, columns),
+        'technical_indicators': lambda day: read_indicators(db_manager, day, indicators),
+    }
+    latencies = {name: [] for name in reads}
+    for day in days:
+        for name, read in reads.items():
+            start = time.perf_counter()
+            read(day)
+            latencies[name].append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def main(n_symbols=3000, years=6, n_dates=10):
+    workdir = tempfile.mkdtemp()
+    db_path = os.path.join(workdir, 'snapshots.db')
+    prices_df = synthetic_prices(n_symbols, 252 * years)
+    try:
+        with DatabaseManager(db_path=db_path) as db_manager:
+            db_manager.setup_database()
+            for index in DATE_INDEXES:
+                db_manager.connection.execute(f"DROP INDEX {index}")
+            start = time.perf_counter()
+            fill(db_manager, prices_df)
+            print(f"Universe: {n_symbols} symbols x {252 * years} bars ({len(prices_df)} rows per table), "
+                  f"filled in {time.perf_counter() - start:.0f} s, {os.path.getsize(db_path) / 1e9:.2f} GB")
+
+            rng = np.random.default_rng(0)
+            days = pd.DatetimeIndex(rng.choice(prices_df['date'].unique(), n_dates, replace=False))
+            indicators = sorted(rng.choice(
+                [col for col in db_manager._table_columns('technical_indicators')
+                 if col not in ('id', 'symbol_id', 'date', 'created_at')], 8, replace=False).tolist())
+            columns = ['close', 'volume'] + indicators
+            del prices_df
+
+            before_ms = snapshots(db_manager, days, columns, indicators)
+            start = time.perf_counter()
+            db_manager.setup_database()
+            print(f"date indexes built in {time.perf_counter() - start:.0f} s, "
+                  f"database now {os.path.getsize(db_path) / 1e9:.2f} GB")
+            after_ms = snapshots(db_manager, days, columns, indicators)
+
+            print(f"{n_dates} snapshots of {len(columns)} columns, latency in ms")
+            for name in before_ms:
+                for label, latencies in [('before', before_ms[name]), ('after', after_ms[name])]:
+                    p50, worst = np.percentile(latencies, [50, 100])
+                    print(f"{name:<22}{label:<8}p50 {p50:9.1f}  max {worst:9.1f}")
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark cross-sectional snapshots with and without date indexes')
+    parser.add_argument('--symbols', type=int, default=3000, help='Number of synthetic symbols')
+    parser.add_argument('--years', type=int, default=6, help='Years of sessions per symbol')
+    parser.add_argument('--dates', type=int, default=10, help='Snapshot dates')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+    main(n_symbols=args.symbols, years=args.years, n_dates=args.dates)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark loading a training slice (a set of indicator columns for a set of
+symbols) from SQLite against the memory-mapped columnar cache, on a temporary
+database of synthetic prices and indicators.
+
+Reports get_all_technical_indicators (every column, as training jobs call
+it, in compact mode), a SQL query projecting only the wanted columns, the
+cache export, a warm cached read, and the refresh after a write to one
+symbol. tests/test_feature_cache.py checks the cached values against SQLite.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Add src and database to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+sys.path.append(str(Path(__file__).parent.parent / 'database'))
+
+from database_manager import DatabaseManager
+from feature_cache import read_cached, refresh_cache
+from synthetic_data import synthetic_prices
+from technical_indicators import generate_indicators_panel
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def select_columns(db_manager, columns, symbol_ids):
+    return pd.read_sql_query(f"""
+        SELECT symbol_id, date, {', '.join(columns)} FROM technical_indicators
+        WHERE symbol_id IN ({', '.join('?' * len(symbol_ids))})
+        ORDER BY symbol_id, date
+    """, db_manager.connection, params=symbol_ids)
+
+def main(n_symbols=600, n_bars=1500, n_columns=10, n_selected=500):
+    workdir = tempfile.mkdtemp()
+    db_path = os.path.join(workdir, 'features.db')
+    prices_df = synthetic_prices(n_symbols, n_bars)
+    try:
+        with DatabaseManager(db_path=db_path) as db_manager:
+            db_manager.setup_database()
+            db_manager.insert_stock_prices_bulk(prices_df)
+            db_manager.insert_technical_indicators(generate_indicators_panel(db_manager.get_all_stock_prices()))
+            indicator_columns = [col for col in db_manager._table_columns('technical_indicators')
+                                 if col not in ('id', 'symbol_id', 'date', 'created_at')]
+            rng = np.random.default_rng(0)
+            columns = sorted(rng.choice(indicator_columns, n_columns, replace=False).tolist())
+            symbol_ids = sorted(rng.choice(np.arange(1, n_symbols + 1), n_selected, replace=False).tolist())
+            print(f"Universe: {n_symbols} symbols x {n_bars} bars, {len(indicator_columns)} indicator columns; "
+                  f"loading {n_columns} columns for {n_selected} symbols")
+
+            # Chunked compact read: every column in float64 needs more than 6 GB at the default size
+            _, full_read = timed(lambda: db_manager.get_all_technical_indicators(
+                symbol_ids, compact=True)[['symbol_id', 'date'] + columns])
+            _, projected = timed(lambda: select_columns(db_manager, columns, symbol_ids))
+            exported, export = timed(lambda: refresh_cache(db_manager, 'technical_indicators'))
+            _, cached_read = timed(lambda: read_cached(db_manager, 'technical_indicators', columns, symbol_ids))
+            print(f"get_all_technical_indicators {full_read:8.2f} s  (every column and lag, compact)")
+            print(f"SQL projection               {projected:8.2f} s")
+            print(f"cache export                 {export:8.2f} s  ({exported} rows, once)")
+            print(f"cached read                  {cached_read:8.3f} s  (staleness check included)")
+
+            db_manager.insert_technical_indicators(
+                generate_indicators_panel(db_manager.get_all_stock_prices([symbol_ids[0]])).tail(5))
+            exported, refresh = timed(lambda: refresh_cache(db_manager, 'technical_indicators'))
+            print(f"refresh after a write to one symbol {refresh:5.2f} s  ({exported} rows re-exported)")
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the columnar feature cache against SQLite reads')
+    parser.add_argument('--symbols', type=int, default=600, help='Number of synthetic symbols')
+    parser.add_argument('--bars', type=int, default=1500, help='Bars per symbol')
+    parser.add_argument('--columns', type=int, default=10, help='Indicator columns loaded')
+    parser.add_argument('--selected', type=int, default=500, help='Symbols loaded')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+    main(n_symbols=args.symbols, n_bars=args.bars, n_columns=args.columns, n_selected=args.selected)
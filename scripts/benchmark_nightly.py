@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark a nightly run driven by pipeline_state watermarks against
+recomputing every stage, after a few new bars arrive for part of the
+universe in a temporary database of synthetic prices.
+
+The nightly run computes only each stage's dirty set: indicators resume
+from saved state, signals are generated for indicator rows past each
+symbol's last signal date and outcomes refresh their trailing rows, all for
+the symbols with new bars only. The pipeline run does the same in memory,
+one transaction per block (run_feature_pipeline.py without --full).
+tests/test_pipeline.py checks that both leave the same tables and
+watermarks behind as a full recompute.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+# Add src and database to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+sys.path.append(str(Path(__file__).parent.parent / 'database'))
+
+from database_manager import DatabaseManager
+from run_feature_pipeline import dirty_symbol_ids, run_blocks
+from staged_pipeline import TABLES, run_full, run_nightly
+from synthetic_data import synthetic_prices
+
+def run_pipeline_nightly(db_manager):
+    run_blocks(db_manager, dirty_symbol_ids(db_manager), full=False)
+
+def main(n_symbols=200, n_bars=1000, new_bars=1, updated_fraction=0.5):
+    workdir = tempfile.mkdtemp()
+    seeded = os.path.join(workdir, 'seeded.db')
+    prices_df = synthetic_prices(n_symbols, n_bars)
+    cutoff = prices_df['date'].drop_duplicates().sort_values().iloc[-new_bars - 1]
+    updated = prices_df['symbol_id'] <= round(n_symbols * updated_fraction)
+    with DatabaseManager(db_path=seeded) as db_manager:
+        db_manager.setup_database()
+        db_manager.insert_stock_prices_bulk(prices_df[prices_df['date'] <= cutoff])
+        run_full(db_manager)
+        db_manager.insert_stock_prices_bulk(prices_df[(prices_df['date'] > cutoff) & updated])
+        dirty = db_manager.get_dirty_symbols('technical_indicators')
+    print(f"Universe: {n_symbols} symbols x {n_bars} bars, {new_bars} new bars for {len(dirty)} symbols")
+
+    try:
+        for name, run in [('full', run_full), ('nightly', run_nightly), ('pipeline', run_pipeline_nightly)]:
+            db_path = os.path.join(workdir, f'{name}.db')
+            shutil.copy(seeded, db_path)
+            with DatabaseManager(db_path=db_path) as db_manager:
+                start = time.perf_counter()
+                run(db_manager)
+                elapsed = time.perf_counter() - start
+                remaining = sum(len(db_manager.get_dirty_symbols(table)) for table in TABLES)
+            print(f"{name:<10}{elapsed:8.2f} s  ({remaining} dirty symbol stages left)")
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark a watermark-driven nightly run against a full recompute')
+    parser.add_argument('--symbols', type=int, default=200, help='Number of synthetic symbols')
+    parser.add_argument('--bars', type=int, default=1000, help='Bars per symbol')
+    parser.add_argument('--new-bars', type=int, default=1, help='Bars added after the first run')
+    parser.add_argument('--updated-fraction', type=float, default=0.5,
+                        help='Fraction of symbols that receive the new bars')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+    main(n_symbols=args.symbols, n_bars=args.bars, new_bars=args.new_bars, updated_fraction=args.updated_fraction)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark the outcome path labels (excursions and first target hits) against
+a bar-by-bar scan of every horizon, and an incremental outcome refresh
+(trailing rows plus new bars, upserted) against recomputing and upserting
+every outcome row after a few new bars arrive in a temporary database of
+synthetic prices.
+
+tests/test_outcomes.py checks that the labels match the scan, that lookahead
+prices count exchange sessions rather than rows, and that both refreshes
+leave the same outcomes table behind.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+# Add src and database to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+sys.path.append(str(Path(__file__).parent.parent / 'database'))
+
+import indicator_kernels as k
+from benchmark_indicators import best_of
+from database_manager import DatabaseManager
+from generate_outcomes import compute_outcomes
+from outcomes import generate_outcomes, path_labels
+from reference_paths import path_labels_scan
+from synthetic_data import synthetic_prices
+
+def time_path_labels(prices_df, repeats=3):
+    """Best-of timings of the path-label kernels and the scan on the same bars, and of every outcome column."""
+    df = prices_df.sort_values(['symbol_id', 'date'], kind='stable')
+    codes, positions, lengths = k.build_panel(df['symbol_id'])
+    high, low, close = (k.to_panel(df[col].to_numpy(dtype='float64'), codes, positions, lengths)
+                        for col in ('high', 'low', 'close'))
+    generate_outcomes(prices_df)  # builds the session calendar once
+    kernels = best_of(lambda: path_labels(high, low, close, lengths), repeats)
+    scan = best_of(lambda: path_labels_scan(prices_df), repeats)
+    every_column = best_of(lambda: generate_outcomes(prices_df), repeats)
+    print(f"path labels: kernels {kernels:.3f} s, bar-by-bar scan {scan:.3f} s ({scan / kernels:.1f}x); "
+          f"generate_outcomes {every_column:.3f} s for every outcome column")
+
+def main(n_symbols=200, n_bars=1000, new_bars=5):
+    workdir = tempfile.mkdtemp()
+    seeded = os.path.join(workdir, 'seeded.db')
+    prices_df = synthetic_prices(n_symbols, n_bars)
+    cutoff = prices_df['date'].drop_duplicates().sort_values().iloc[-new_bars - 1]
+    with DatabaseManager(db_path=seeded) as db_manager:
+        db_manager.setup_database()
+        db_manager.insert_stock_prices_bulk(prices_df[prices_df['date'] <= cutoff])
+        db_manager.insert_outcomes(compute_outcomes(db_manager, full=True))
+        db_manager.insert_stock_prices_bulk(prices_df[prices_df['date'] > cutoff])
+    print(f"Universe: {n_symbols} symbols x {n_bars} bars, {new_bars} new bars per symbol")
+    time_path_labels(prices_df)
+
+    try:
+        for name, full in [('full', True), ('incremental', False)]:
+            db_path = os.path.join(workdir, f'{name}.db')
+            shutil.copy(seeded, db_path)
+            with DatabaseManager(db_path=db_path) as db_manager:
+                start = time.perf_counter()
+                outcomes_df = compute_outcomes(db_manager, full=full)
+                computed = time.perf_counter() - start
+                db_manager.insert_outcomes(outcomes_df)
+                elapsed = time.perf_counter() - start
+            print(f"{name:<12}{len(outcomes_df):>9} rows  compute {computed:6.2f} s  total {elapsed:6.2f} s")
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark incremental outcome refreshes')
+    parser.add_argument('--symbols', type=int, default=200, help='Number of synthetic symbols')
+    parser.add_argument('--bars', type=int, default=1000, help='Bars per symbol')
+    parser.add_argument('--new-bars', type=int, default=5, help='Bars added after the first run')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+    main(n_symbols=args.symbols, n_bars=args.bars, new_bars=args.new_bars)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark the in-memory feature pipeline against the staged scripts
+(indicators -> SQLite -> signals, then outcomes from a second price read) on a
+temporary database of synthetic prices.
+
+tests/test_pipeline.py checks that both leave identical technical_indicators,
+technical_trade_signals and outcomes tables behind.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+# Add src and database to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+sys.path.append(str(Path(__file__).parent.parent / 'database'))
+
+from database_manager import DatabaseManager
+from run_feature_pipeline import BLOCK_SYMBOLS, run_blocks
+from staged_pipeline import run_full
+from synthetic_data import synthetic_prices
+
+def main(n_symbols=200, n_bars=1000, block_symbols=BLOCK_SYMBOLS):
+    workdir = tempfile.mkdtemp()
+    seeded = os.path.join(workdir, 'seeded.db')
+    prices_df = synthetic_prices(n_symbols, n_bars)
+    with DatabaseManager(db_path=seeded) as db_manager:
+        db_manager.setup_database()
+        db_manager.insert_stock_prices_bulk(prices_df)
+    print(f"Universe: {n_symbols} symbols x {n_bars} bars")
+
+    try:
+        for name, run in [('staged', run_full),
+                          ('pipeline', lambda db: run_blocks(db, db.get_symbol_ids_with_prices(), block_symbols))]:
+            db_path = os.path.join(workdir, f'{name}.db')
+            shutil.copy(seeded, db_path)
+            with DatabaseManager(db_path=db_path) as db_manager:
+                start = time.perf_counter()
+                run(db_manager)
+                elapsed = time.perf_counter() - start
+            print(f"{name:<10}{elapsed:8.2f} s")
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the in-memory feature pipeline against the staged scripts')
+    parser.add_argument('--symbols', type=int, default=200, help='Number of synthetic symbols')
+    parser.add_argument('--bars', type=int, default=1000, help='Bars per symbol')
+    parser.add_argument('--block-symbols', type=int, default=BLOCK_SYMBOLS, help='Symbols per pipeline transaction')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+    main(n_symbols=args.symbols, n_bars=args.bars, block_symbols=args.block_symbols)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark price inserts into a temporary database: the previous per-symbol
+insert_stock_prices (iterrows, per-cell column fallbacks and float coercion)
+against the vectorised per-symbol insert and insert_stock_prices_bulk, which
+writes one long frame of many symbols in a single transaction.
+
+Reports rows/sec; tests/test_database_manager.py checks that every path
+leaves the same stock_prices and symbols tables behind.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+# Add src and database to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+sys.path.append(str(Path(__file__).parent.parent / 'database'))
+
+from database_manager import DatabaseManager
+from reference_paths import insert_with_iterrows, per_symbol
+from synthetic_data import synthetic_prices
+
+def main(n_symbols=200, n_bars=1000):
+    workdir = tempfile.mkdtemp()
+    prices_df = synthetic_prices(n_symbols, n_bars)
+    print(f"Universe: {n_symbols} symbols x {n_bars} bars")
+    paths = [
+        ('iterrows', per_symbol(insert_with_iterrows)),
+        ('vectorised', per_symbol(lambda db, df, symbol: db.insert_stock_prices(df, symbol))),
+        ('bulk', lambda db, df: db.insert_stock_prices_bulk(df)),
+    ]
+    try:
+        for name, run in paths:
+            with DatabaseManager(db_path=os.path.join(workdir, f'{name}.db')) as db_manager:
+                db_manager.setup_database()
+                start = time.perf_counter()
+                run(db_manager, prices_df)
+                elapsed = time.perf_counter() - start
+            print(f"{name:<12}{elapsed:8.2f} s  {len(prices_df) / elapsed:>10,.0f} rows/s")
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark stock price inserts')
+    parser.add_argument('--symbols', type=int, default=200, help='Number of synthetic symbols')
+    parser.add_argument('--bars', type=int, default=1000, help='Bars per symbol')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+    main(n_symbols=args.symbols, n_bars=args.bars)
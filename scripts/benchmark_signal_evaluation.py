@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark evaluate_signals against the ad-hoc pandas approach (merge signals
+with outcomes, melt to one row per signal value and group) on synthetic data.
+
+Reports wall time and peak traced memory of each; tests/test_signals.py checks
+that both give the same counts, hits, mean and median returns.
+"""
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+import pandas as pd
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from outcomes import LOOKAHEADS, generate_outcomes
+from reference_paths import evaluate_with_merge
+from signal_evaluation import evaluate_signals
+from synthetic_data import synthetic_prices
+from technical_indicators import generate_indicators_panel
+from technical_trade_signals import generate_trade_signals_fused
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+def main(n_symbols=300, n_bars=1500):
+    prices_df = synthetic_prices(n_symbols, n_bars)
+    indicators_df = generate_indicators_panel(prices_df)
+    signals_df = generate_trade_signals_fused(indicators_df).drop(columns=['symbol'])
+    signals_df.insert(0, 'symbol_id', indicators_df['symbol_id'].to_numpy())
+    signals_df['date'] = pd.to_datetime(signals_df['date'])
+    outcomes_df = generate_outcomes(prices_df)
+    outcomes_df['date'] = pd.to_datetime(outcomes_df['date'])
+    print(f"Universe: {n_symbols} symbols x {n_bars} bars, {len(signals_df.columns) - 2} signals, "
+          f"{len(LOOKAHEADS)} lookaheads")
+
+    for name, fn in [('pandas merge', lambda: evaluate_with_merge(signals_df, outcomes_df)),
+                     ('vectorised', lambda: evaluate_signals(signals_df, outcomes_df)[0])]:
+        _, elapsed, peak = measure(fn)
+        print(f"{name:<14}{elapsed:8.2f} s  peak {peak:8.0f} MB")
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark signal evaluation on synthetic data')
+    parser.add_argument('--symbols', type=int, default=300, help='Number of synthetic symbols')
+    parser.add_argument('--bars', type=int, default=1500, help='Bars per symbol')
+    args = parser.parse_args()
+    main(n_symbols=args.symbols, n_bars=args.bars)
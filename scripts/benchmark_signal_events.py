@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Compare the wide technical_trade_signals table with the sparse signal_events
+table (one row per run of a non-zero signal value) on a temporary database of
+synthetic prices: storage per table (with its indexes), latency of a "every
+buy of one signal in one year" query and the query plan SQLite picks for each.
+
+tests/test_signal_events.py checks that densified events equal the wide
+table and that both queries return the same rows.
+"""
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+import pandas as pd
+
+# Add src and database to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+sys.path.append(str(Path(__file__).parent.parent / 'database'))
+
+from benchmark_indicators import best_of
+from database_manager import DatabaseManager
+from generate_technical_trade_signals import compute_signals
+from memory_report import seed_database
+
+def table_megabytes(db_manager, tables):
+    """Pages held by ``tables`` and their indexes, in MB (needs SQLite's dbstat)."""
+    query = f"""
+        SELECT SUM(pgsize) FROM dbstat
+        WHERE name IN (SELECT name FROM sqlite_master
+                       WHERE tbl_name IN ({', '.join('?' * len(tables))}))
+    """
+    return db_manager.connection.execute(query, tables).fetchone()[0] / 1e6
+
+def query_plan(db_manager, query, params):
+    rows = db_manager.connection.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+    return "; ".join(row[-1] for row in rows)
+
+def main(n_symbols=200, n_bars=1000, signal='rsi_signal_14', repeats=5):
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = str(Path(workdir) / 'signal_events.db')
+        seed_database(db_path, n_symbols, n_bars)
+        with DatabaseManager(db_path=db_path) as db_manager:
+            signals_df = compute_signals(db_manager, verbose=False)
+            db_manager.insert_technical_trade_signals(signals_df)
+            start = time.perf_counter()
+            db_manager.insert_signal_events(signals_df)
+            inserted = time.perf_counter() - start
+            db_manager.connection.execute("VACUUM")
+
+            wide_mb = table_megabytes(db_manager, ['technical_trade_signals'])
+            events_mb = table_megabytes(db_manager, ['signal_events', 'signal_definitions'])
+            events = db_manager.connection.execute("SELECT COUNT(*) FROM signal_events").fetchone()[0]
+            print(f"Universe: {n_symbols} symbols x {n_bars} bars, {len(signals_df)} signal rows, {events} runs")
+            print(f"{'technical_trade_signals':<26}{wide_mb:8.1f} MB")
+            print(f"{'signal_events':<26}{events_mb:8.1f} MB ({events_mb / wide_mb:.2f}x), written in {inserted:.1f} s")
+
+
+            year = str(pd.to_datetime(signals_df['date']).median().year)
+            start, end = f"{year}-01-01", f"{year}-12-31"
+            wide_query = f"""
+                SELECT symbol_id, date FROM technical_trade_signals
+                WHERE {signal} = 1 AND date BETWEEN ? AND ? ORDER BY symbol_id, date
+            """
+            # Runs overlapping the year, expanded to their price bars in it
+            events_query = """
+                SELECT p.symbol_id, p.date FROM signal_definitions d
+                CROSS JOIN symbols s
+                CROSS JOIN signal_events e ON e.symbol_id = s.symbol_id AND e.signal_id = d.signal_id
+                CROSS JOIN stock_prices p ON p.symbol_id = e.symbol_id
+                    AND p.date BETWEEN date(e.start * 86400, 'unixepoch') AND date((e.start + e.days) * 86400, 'unixepoch')
+                WHERE d.name = ? AND e.value = 1
+                      AND e.start <= julianday(?) - 2440587.5 AND e.start + e.days >= julianday(?) - 2440587.5
+                      AND p.date BETWEEN ? AND ? ORDER BY p.symbol_id, p.date
+            """
+            wide_rows = db_manager.connection.execute(wide_query, [start, end]).fetchall()
+            print(f"\n{signal} buys in {year}: {len(wide_rows)} rows")
+            for name, query, params in [('wide', wide_query, [start, end]),
+                                        ('events', events_query, [signal, end, start, start, end])]:
+                elapsed = best_of(lambda: db_manager.connection.execute(query, params).fetchall(), repeats)
+                print(f"{name:<8}{elapsed * 1000:8.2f} ms  {query_plan(db_manager, query, params)}")
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Compare wide and sparse signal storage')
+    parser.add_argument('--symbols', type=int, default=200, help='Number of synthetic symbols')
+    parser.add_argument('--bars', type=int, default=1000, help='Bars per symbol')
+    parser.add_argument('--signal', default='rsi_signal_14', help='Signal whose buys are queried')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+    main(n_symbols=args.symbols, n_bars=args.bars, signal=args.signal)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Benchmark sweep_signal_thresholds against regenerating the signals once per
+threshold level with generate_trade_signals_fused, on synthetic indicators.
+
+tests/test_signals.py checks that every level of the sweep equals the
+regenerated signals and that the sorted-count mode agrees with counting the
+full sweep.
+"""
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from benchmark_indicators import best_of
+from reference_paths import THRESHOLD_GRID, regenerate
+from synthetic_data import synthetic_prices
+from technical_indicators import generate_indicators_panel
+from technical_trade_signals import sweep_signal_thresholds
+
+def main(n_symbols=300, n_bars=1500, repeats=3):
+    indicators_df = generate_indicators_panel(synthetic_prices(n_symbols, n_bars))
+    levels = sum(len(values) for values in THRESHOLD_GRID.values())
+    print(f"Universe: {n_symbols} symbols x {n_bars} bars ({len(indicators_df)} rows), {levels} threshold levels")
+
+    start = time.perf_counter()
+    regenerate(indicators_df, THRESHOLD_GRID)
+    regenerate_time = time.perf_counter() - start
+    sweep_time = best_of(lambda: sweep_signal_thresholds(indicators_df, THRESHOLD_GRID), repeats)
+    counts_time = best_of(lambda: sweep_signal_thresholds(indicators_df, THRESHOLD_GRID, counts=True), repeats)
+    print(f"{'regenerate per level':<22}{regenerate_time:8.3f} s")
+    print(f"{'sweep':<22}{sweep_time:8.3f} s  ({regenerate_time / sweep_time:.0f}x)")
+    print(f"{'sweep counts':<22}{counts_time:8.3f} s  ({regenerate_time / counts_time:.0f}x)")
+
+    names, counts = sweep_signal_thresholds(indicators_df, THRESHOLD_GRID, counts=True)['rsi']
+    print(f"\nbuy/sell rows per RSI level for {names[1]}:")
+    for (buy, sell), row in zip(THRESHOLD_GRID['rsi'], counts[:, 1]):
+        print(f"  {buy:>3}/{sell:<3} buy {row[2]:>8}  sell {row[0]:>8}")
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the signal threshold sweep on synthetic data')
+    parser.add_argument('--symbols', type=int, default=300, help='Number of synthetic symbols')
+    parser.add_argument('--bars', type=int, default=1500, help='Bars per symbol')
+    parser.add_argument('--repeats', type=int, default=3, help='Timing repeats (best is reported)')
+    args = parser.parse_args()
+    main(n_symbols=args.symbols, n_bars=args.bars, repeats=args.repeats)
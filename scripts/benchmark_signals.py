@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark the fused int8 signal engine against generate_trade_signals on a
+synthetic universe (no database needed).
+
+Reports wall time and peak traced memory of each engine; tests/test_signals.py
+checks that they agree on every row except a symbol's first row, where
+generate_trade_signals compares against the previous symbol's last row.
+"""
+import sys
+import tracemalloc
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from benchmark_indicators import best_of
+from synthetic_data import synthetic_prices
+from technical_indicators import generate_indicators_panel
+from technical_trade_signals import generate_trade_signals, generate_trade_signals_fused
+
+def peak_megabytes(fn):
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+def main(n_symbols=300, n_bars=1500, repeats=3):
+    indicators_df = generate_indicators_panel(synthetic_prices(n_symbols, n_bars))
+    print(f"Universe: {n_symbols} symbols x {n_bars} bars ({len(indicators_df)} rows)")
+
+    results = {}
+    for name, fn in [('pandas', generate_trade_signals), ('fused', generate_trade_signals_fused)]:
+        elapsed = best_of(lambda: fn(indicators_df), repeats)
+        peak = peak_megabytes(lambda: fn(indicators_df))
+        results[name] = (elapsed, fn(indicators_df))
+        print(f"{name:<8}{elapsed:8.3f} s  peak {peak:8.0f} MB")
+    print(f"fused is {results['pandas'][0] / results['fused'][0]:.1f}x faster")
+
+    reference, fused = results['pandas'][1], results['fused'][1]
+    signal_cols = [col for col in reference.columns if col not in ('symbol', 'date')]
+    print(f"dtypes: pandas {reference[signal_cols[0]].dtype}, fused {fused[signal_cols[0]].dtype}")
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark signal engines on synthetic data')
+    parser.add_argument('--symbols', type=int, default=300, help='Number of synthetic symbols')
+    parser.add_argument('--bars', type=int, default=1500, help='Bars per symbol')
+    parser.add_argument('--repeats', type=int, default=3, help='Timing repeats (best is reported)')
+    args = parser.parse_args()
+    main(n_symbols=args.symbols, n_bars=args.bars, repeats=args.repeats)
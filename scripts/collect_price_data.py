@@ -6,13 +6,15 @@ import sys
 from pathlib import Path
 import yaml
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
 import time
 
-# Add database path
+# Add src and database to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
 sys.path.append(str(Path(__file__).parent.parent / 'database'))
 from database_manager import DatabaseManager
+from sessions import fetch_start
 
 # Add yfinance
 import yfinance as yf
@@ -73,6 +75,8 @@ def collect_price_data(batch_size=10, total_symbols=None):
         # Get all symbols from database
         symbols_df = db_manager.get_symbols()
         print(f"Found {len(symbols_df)} symbols in database")
+        # Each symbol resumes the day after its last stored bar
+        last_dates = db_manager.get_pipeline_state().set_index('symbol_id')['last_price_date'].dropna()
         
         if total_symbols is None:
             total_symbols = len(symbols_df)
@@ -94,22 +98,18 @@ def collect_price_data(batch_size=10, total_symbols=None):
                 symbol = row['symbol']
                 
                 try:
-                    # Check if we already have recent data for this symbol
-                    existing_data = db_manager.get_stock_prices(
-                        symbol, 
-                        start_date=(end_date - timedelta(days=3)).date()
-                    )
-                    
-                    if not existing_data.empty:
-                        print(f"  {symbol}: Already has recent data, skipping...")
+                    symbol_start = fetch_start(last_dates.get(row['symbol_id']), start_date, end_date)
+                    # Skip symbols with no completed exchange session since their last bar
+                    if symbol_start is None:
+                        print(f"  {symbol}: Up to date, skipping...")
                         continue
                     
-                    # Fetch historical data
-                    print(f"  {symbol}: Fetching data...", end="")
+                    # Fetch the bars since the last stored one (full history for new symbols)
+                    print(f"  {symbol}: Fetching data from {symbol_start.strftime('%Y-%m-%d')}...", end="")
                     
                     stock_data = data_loader.fetch_stock_data(
                         symbol, 
-                        start_date.strftime('%Y-%m-%d'),
+                        symbol_start.strftime('%Y-%m-%d'),
                         end_date.strftime('%Y-%m-%d')
                     )
                     
@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+import pandas as pd
+
+# Add src and database to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+sys.path.append(str(Path(__file__).parent.parent / 'database'))
+
+from database_manager import DatabaseManager
+from signal_evaluation import evaluate_signals, merge_evaluations
+
+def refresh_evaluation(db_manager, full=False):
+    """
+    Update signal_evaluation from technical_trade_signals and outcomes.
+    Unless ``full``, only rows past each symbol's stored watermarks are read
+    and counted; symbols without watermarks are read in full.
+    Returns the number of (signal, value, lookahead) rows stored.
+    """
+    since = None if full else db_manager.get_signal_evaluation_state()
+    if since is not None and since.empty:
+        full, since = True, None
+    start_date = None
+    if not full and set(db_manager.get_symbol_ids_with_prices()) <= set(since['symbol_id']):
+        start_date = pd.to_datetime(since['through_date']).min() + pd.Timedelta(days=1)
+
+    signals_df = db_manager.get_all_technical_trade_signals(start_date=start_date)
+    outcomes_df = db_manager.get_all_outcomes(start_date=start_date)
+    if signals_df.empty or outcomes_df.empty:
+        return 0
+    summary, watermarks = evaluate_signals(signals_df, outcomes_df, since=since, median=full)
+    if not full:
+        summary = merge_evaluations(db_manager.get_signal_evaluation(), summary)
+    db_manager.save_signal_evaluation(summary, watermarks, replace=full)
+    return len(summary)
+
+def main(full=False, lookahead=5, top=10):
+    db_manager = DatabaseManager()
+    with db_manager:
+        rows = refresh_evaluation(db_manager, full=full)
+        if rows == 0:
+            print("No trade signals or outcomes found.")
+            return
+        print(f"Stored {rows} signal evaluation rows.")
+        summary = db_manager.get_signal_evaluation()
+        best = summary[(summary['lookahead'] == lookahead) & (summary['value'] != 0)]
+        print(f"\nBest hit rates at {lookahead} bars:")
+        print(best.nlargest(top, 'hit_rate')[['signal', 'value', 'count', 'hit_rate', 'mean_return', 'median_return']]
+              .to_string(index=False))
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Evaluate trade signals against their outcomes')
+    parser.add_argument('--full', action='store_true',
+                        help='Recount every row and refresh medians instead of adding new dates only')
+    parser.add_argument('--lookahead', type=int, default=5, help='Lookahead of the printed ranking')
+    args = parser.parse_args()
+    main(full=args.full, lookahead=args.lookahead)
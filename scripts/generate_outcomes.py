@@ -6,18 +6,58 @@ sys.path.append(str(Path(__file__).parent.parent / 'src'))
 sys.path.append(str(Path(__file__).parent.parent / 'database'))
 
 from database_manager import DatabaseManager
-from outcomes import generate_outcomes
+from outcomes import TRAILING_ROWS, generate_outcomes
+from parallel import run_sharded
 
-def main():
+def compute_outcomes(db_manager, symbol_ids=None, full=False):
+    """
+    Compute outcome rows for the given symbols (all when None). Unless
+    ``full``, only each symbol's last TRAILING_ROWS outcome rows, whose
+    labels can still change, and its new bars are recomputed.
+    """
+    if full:
+        prices_df = db_manager.get_all_stock_prices(symbol_ids)
+    else:
+        prices_df = db_manager.get_outcome_prices(symbol_ids, TRAILING_ROWS)
+    if prices_df.empty:
+        return prices_df
+    return generate_outcomes(prices_df)
+
+def compute_shard(symbol_ids, db_path, full=False):
+    """Worker entry point: compute outcomes for one shard of symbols."""
+    with DatabaseManager(db_path=db_path) as db_manager:
+        return compute_outcomes(db_manager, symbol_ids, full)
+
+def main(workers=1, full=False):
     db_manager = DatabaseManager()
     with db_manager:
-        prices_df = db_manager.get_all_stock_prices()
-        if prices_df.empty:
-            print("No price data found.")
+        # Incremental runs only touch symbols with prices past their last outcome row
+        symbol_ids = None if full else db_manager.get_dirty_symbols('outcomes')['symbol_id'].tolist()
+        if symbol_ids == []:
+            results = []
+        elif workers > 1:
+            results = run_sharded(
+                compute_shard, symbol_ids or db_manager.get_symbol_ids_with_prices(), workers,
+                db_path=db_manager.db_path, full=full
+            )
+        else:
+            results = [(compute_outcomes(db_manager, symbol_ids, full=full), None)]
+
+        total = 0
+        for outcomes_df, _ in results:
+            db_manager.insert_outcomes(outcomes_df)
+            total += len(outcomes_df)
+        if total == 0:
+            print("No price data found." if full else "No new price data found.")
             return
-        outcomes_df = generate_outcomes(prices_df)
-        db_manager.insert_outcomes(outcomes_df)
-        print(f"Inserted {len(outcomes_df)} outcome rows.")
+        print(f"Inserted/updated {total} outcome rows.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of worker processes; symbols are sharded across them')
+    parser.add_argument('--full', action='store_true',
+                        help='Recompute every outcome row instead of the trailing rows and new bars')
+    args = parser.parse_args()
+    main(workers=args.workers, full=args.full)
@@ -7,33 +7,84 @@ sys.path.append(str(Path(__file__).parent.parent / 'src'))
 sys.path.append(str(Path(__file__).parent.parent / 'database'))
 
 from database_manager import DatabaseManager
-from technical_indicators import generate_indicators
+from technical_indicators import generate_indicators, generate_indicators_panel
+from indicator_state import build_states, update_indicators
+from parallel import run_sharded
 
 # SYMBOLS_TO_USE = ['AAPL', 'MSFT', 'GOOG']  # Example subset
 SYMBOLS_TO_USE = None
 
-def main(update_mode=False):
-    db_manager = DatabaseManager()
+ENGINES = {
+    'panel': generate_indicators_panel,
+    'ta': generate_indicators,
+}
+
+def compute_indicators(db_manager, symbol_ids=None, update_mode=False, engine='panel'):
+    """
+    Load prices for the given symbols (all when None) and compute their
+    indicator rows. Returns (indicators_df, states).
+    """
+    if update_mode:
+        # Only bars after each symbol's saved state (full history for new symbols)
+        states = db_manager.get_indicator_states(symbol_ids)
+        prices_df = db_manager.get_new_stock_prices(symbol_ids)
+    else:
+        states = {}
+        prices_df = db_manager.get_all_stock_prices(symbol_ids)
+    if prices_df.empty:
+        return prices_df, {}
+
+    # Filter to subset for development
+    if SYMBOLS_TO_USE is not None:
+        prices_df = prices_df[prices_df['symbol'].isin(SYMBOLS_TO_USE)]
+
+    if update_mode:
+        return update_indicators(prices_df, states)
+    if engine == 'panel':
+        # Same columns as generate_indicators_panel, plus state for later --update runs
+        return build_states(prices_df)
+    return ENGINES[engine](prices_df), {}
+
+def compute_shard(symbol_ids, db_path, update_mode, engine):
+    """Worker entry point: compute one shard of symbols on its own connection."""
+    with DatabaseManager(db_path=db_path) as db_manager:
+        return compute_indicators(db_manager, symbol_ids, update_mode, engine)
+
+def main(update_mode=False, engine='panel', workers=1, db_path=None):
+    db_manager = DatabaseManager(db_path=db_path)
     with db_manager:
+        # Updates only touch symbols whose prices are past their last indicator row
+        symbol_ids = None
         if update_mode:
-            prices_df = db_manager.get_recent_stock_prices(lookback_days=100)
+            symbol_ids = db_manager.get_dirty_symbols('technical_indicators')['symbol_id'].tolist()
+        if update_mode and not symbol_ids:
+            results = []
+        elif workers > 1:
+            results = run_sharded(
+                compute_shard, symbol_ids or db_manager.get_symbol_ids_with_prices(), workers,
+                db_path=db_manager.db_path, update_mode=update_mode, engine=engine
+            )
         else:
-            prices_df = db_manager.get_all_stock_prices()
-        if prices_df.empty:
-            print("No stock price data found. Run collect_price_data.py first.")
-            return
+            results = [compute_indicators(db_manager, symbol_ids, update_mode=update_mode, engine=engine)]
 
-        # Filter to subset for development
-        if SYMBOLS_TO_USE is not None:
-            prices_df = prices_df[prices_df['symbol'].isin(SYMBOLS_TO_USE)]
-
-        indicators_df = generate_indicators(prices_df)
-        db_manager.insert_technical_indicators(indicators_df, upsert=update_mode)
-        print(f"Inserted/updated {len(indicators_df)} technical indicator rows.")
+        total = 0
+        for indicators_df, states in results:
+            db_manager.insert_technical_indicators(indicators_df)
+            db_manager.save_indicator_states(states)
+            total += len(indicators_df)
+        if total == 0:
+            print("No new stock price data found." if update_mode else "No stock price data found. Run collect_price_data.py first.")
+            return
+        print(f"Inserted/updated {total} technical indicator rows.")
 
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser()
-    parser.add_argument('--update', action='store_true', help='Only update recent data (last 100 days)')
+    parser.add_argument('--update', action='store_true',
+                        help='Only compute bars added since the last run, resuming saved indicator state')
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='panel',
+                        help='Indicator engine for full runs: vectorized panel (default) or per-symbol ta')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of worker processes; symbols are sharded across them')
     args = parser.parse_args()
-    main(update_mode=args.update)
\ No newline at end of file
+    main(update_mode=args.update, engine=args.engine, workers=args.workers)
\ No newline at end of file
@@ -7,49 +7,145 @@ sys.path.append(str(Path(__file__).parent.parent / 'src'))
 sys.path.append(str(Path(__file__).parent.parent / 'database'))
 
 from database_manager import DatabaseManager
-from technical_trade_signals import generate_trade_signals
+from frame_dtypes import compact_frame
+from technical_trade_signals import generate_trade_signals, generate_trade_signals_fused
+from parallel import run_sharded
 
-def main():
-    db_manager = DatabaseManager()
-    with db_manager:
-        # Load all technical indicators
-        indicators_df = db_manager.get_all_technical_indicators()
-        prices_df = db_manager.get_all_stock_prices()
+ENGINES = {
+    'fused': generate_trade_signals_fused,
+    'pandas': generate_trade_signals,
+}
+
+def compute_signals(db_manager, symbol_ids=None, verbose=True, compact=False, engine='fused'):
+    """
+    Load indicators and close prices for the given symbols (all when None) and
+    generate their trade signals with ``engine``, keyed by symbol_id and date.
+    With compact=True indicators are read as float32 and signals come back as int8.
+    """
+    # Load all technical indicators
+    indicators_df = db_manager.get_all_technical_indicators(symbol_ids, compact=compact)
+    prices_df = db_manager.get_all_stock_prices(symbol_ids)
+    if indicators_df.empty:
+        return pd.DataFrame()
 
-        # Ensure indicators_df has 'symbol' column for signal generation
-        if 'symbol' not in indicators_df.columns:
-            symbol_map = prices_df[['symbol_id', 'symbol']].drop_duplicates()
-            indicators_df = indicators_df.merge(symbol_map, on='symbol_id', how='left')
+    # Ensure indicators_df has 'symbol' column for signal generation
+    if 'symbol' not in indicators_df.columns:
+        symbol_map = prices_df[['symbol_id', 'symbol']].drop_duplicates()
+        indicators_df = indicators_df.merge(symbol_map, on='symbol_id', how='left')
 
+    if verbose:
         print("Indicators DataFrame shape:", indicators_df.shape)
         print(indicators_df.head())
 
-        # Merge on symbol_id and date to get price/close
-        merged_df = indicators_df.merge(
-            prices_df[['symbol_id', 'date', 'close']],
-            on=['symbol_id', 'date'],
-            how='left'
-        )
+    # Merge on symbol_id and date to get price/close
+    close_df = prices_df[['symbol_id', 'date', 'close']]
+    if compact:
+        # Compare close at the indicators' float32 precision (PSAR starts at the close)
+        close_df = compact_frame(close_df)
+    merged_df = indicators_df.merge(
+        close_df,
+        on=['symbol_id', 'date'],
+        how='left'
+    )
 
+    if verbose:
         print("Merged DataFrame shape:", merged_df.shape)
         print(merged_df.head())
 
-        signals_df = generate_trade_signals(merged_df)
+    signals_df = ENGINES[engine](merged_df, compact=compact)
+
+    # Merge to get symbol_id from symbol (if not present)
+    if 'symbol_id' not in signals_df.columns:
+        symbol_map = prices_df[['symbol', 'symbol_id']].drop_duplicates()
+        signals_df = signals_df.merge(symbol_map, on='symbol', how='left')
+    # Drop symbol column, keep symbol_id
+    if 'symbol' in signals_df.columns:
+        signals_df = signals_df.drop(columns=['symbol'])
+    # Drop rows with missing symbol_id
+    signals_df = signals_df.dropna(subset=['symbol_id'])
+    signals_df['symbol_id'] = signals_df['symbol_id'].astype('int32' if compact else int)
+    return signals_df
+
+def stream_signals(db_manager, symbol_ids=None, compact=False, engine='fused', block_symbols=1, start_date=None):
+    """
+    Yield trade signals ``block_symbols`` symbols at a time (from start_date
+    on, when given). Indicators are read already joined to their close price
+    in SQL, so peak memory is bounded by the largest block rather than the
+    whole indicators table.
+    """
+    for indicators_df in db_manager.iter_technical_indicators(
+            symbol_ids, block_symbols, compact=compact, lags=[], with_close=True, start_date=start_date):
+        signals_df = ENGINES[engine](indicators_df, compact=compact)
+        # Both engines keep the indicators' row order, so symbol_id lines up
+        signals_df = signals_df.drop(columns=['symbol'])
+        signals_df.insert(0, 'symbol_id', indicators_df['symbol_id'].to_numpy().astype('int32' if compact else int))
+        yield signals_df
 
-        # Merge to get symbol_id from symbol (if not present)
-        if 'symbol_id' not in signals_df.columns:
-            symbol_map = prices_df[['symbol', 'symbol_id']].drop_duplicates()
-            signals_df = signals_df.merge(symbol_map, on='symbol', how='left')
-        # Drop symbol column, keep symbol_id
-        if 'symbol' in signals_df.columns:
-            signals_df = signals_df.drop(columns=['symbol'])
-        # Drop rows with missing symbol_id
-        signals_df = signals_df.dropna(subset=['symbol_id'])
-        signals_df['symbol_id'] = signals_df['symbol_id'].astype(int)
+def stream_signal_updates(db_manager, compact=False, engine='fused', block_symbols=1):
+    """
+    Yield trade signals for the bars each symbol's indicators gained since its
+    last signal row (pipeline_state). That row is read again as the previous
+    bar the cross and breakout rules compare with, then dropped.
+    """
+    dirty = db_manager.get_dirty_symbols('technical_trade_signals')
+    for since, group in dirty.groupby(dirty['since'].fillna(''), sort=False):
+        for signals_df in stream_signals(db_manager, group['symbol_id'].tolist(), compact, engine,
+                                         block_symbols, start_date=since or None):
+            yield signals_df[signals_df['date'] > pd.Timestamp(since)] if since else signals_df
+
+def compute_shard(symbol_ids, db_path, compact=False, engine='fused'):
+    """Worker entry point: generate signals for one shard of symbols."""
+    with DatabaseManager(db_path=db_path) as db_manager:
+        return compute_signals(db_manager, symbol_ids, verbose=False, compact=compact, engine=engine)
+
+def main(workers=1, compact=False, engine='fused', stream=False, block_symbols=1, storage='wide',
+         update_mode=False):
+    db_manager = DatabaseManager()
+    with db_manager:
+        if update_mode:
+            results = ((signals_df, None) for signals_df in stream_signal_updates(
+                db_manager, compact=compact, engine=engine, block_symbols=block_symbols))
+        elif stream:
+            results = ((signals_df, None) for signals_df in stream_signals(
+                db_manager, compact=compact, engine=engine, block_symbols=block_symbols))
+        elif workers > 1:
+            results = run_sharded(
+                compute_shard, db_manager.get_symbol_ids_with_prices(), workers,
+                db_path=db_manager.db_path, compact=compact, engine=engine
+            )
+        else:
+            results = [(compute_signals(db_manager, compact=compact, engine=engine), None)]
 
-        # Insert signals into technical_trade_signals table
-        db_manager.insert_technical_trade_signals(signals_df)
-        print(f"Inserted {len(signals_df)} trade signal rows.")
+        total = 0
+        for signals_df, _ in results:
+            # Insert signals into technical_trade_signals and/or signal_events
+            if storage in ('wide', 'both'):
+                db_manager.insert_technical_trade_signals(signals_df)
+            if storage in ('events', 'both'):
+                db_manager.insert_signal_events(signals_df)
+            total += len(signals_df)
+        print(f"Inserted {total} trade signal rows.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of worker processes; symbols are sharded across them')
+    parser.add_argument('--compact', action='store_true',
+                        help='Hold indicators as float32 and signals as int8 to reduce memory')
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='fused',
+                        help='fused: int8 NumPy rules that respect symbol boundaries (default); '
+                             'pandas: the original column-by-column rules')
+    parser.add_argument('--stream', action='store_true',
+                        help='Read indicators and write signals one block of symbols at a time')
+    parser.add_argument('--block-symbols', type=int, default=1,
+                        help='Symbols per block in --stream and --update modes')
+    parser.add_argument('--update', action='store_true',
+                        help='Only generate signals for indicator rows added since the last run '
+                             '(read block by block as in --stream)')
+    parser.add_argument('--storage', choices=['wide', 'events', 'both'], default='wide',
+                        help='wide: technical_trade_signals (default); events: only non-zero values '
+                             'in signal_events; both')
+    args = parser.parse_args()
+    main(workers=args.workers, compact=args.compact, engine=args.engine,
+         stream=args.stream, block_symbols=args.block_symbols, storage=args.storage, update_mode=args.update)
\ No newline at end of file
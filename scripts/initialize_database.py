@@ -8,7 +8,8 @@ from pathlib import Path
 import yaml
 import logging
 
-# Add database path
+# Add src and database paths
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
 sys.path.append(str(Path(__file__).parent.parent / 'database'))
 from database_manager import DatabaseManager
 
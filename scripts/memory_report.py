@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Peak-RSS report for each feature stage in standard and compact dtype mode:
+indicators, signals (signals-stream generates them one symbol at a time),
+outcomes, the signal evaluation and the feature cache export. Compact
+outcomes are downcast once generated and the compact evaluation reads
+compact signals and outcomes; the cache export has no compact mode.
+
+Each stage runs in a fresh process, as the generate_* scripts do, so the peak
+resident memory of every (stage, mode) pair is measured on its own. Without
+--db a temporary database is filled with synthetic prices and their features
+first. With --db, cache-export rebuilds that database's feature cache.
+"""
+import resource
+import subprocess
+import sys
+import tempfile
+import warnings
+from pathlib import Path
+
+# Add src and database to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+sys.path.append(str(Path(__file__).parent.parent / 'database'))
+
+from database_manager import DatabaseManager
+from frame_dtypes import compact_frame, frame_megabytes
+
+STAGES = ['indicators', 'signals', 'signals-stream', 'outcomes', 'evaluation', 'cache-export']
+# Stages measured in standard mode only
+STANDARD_ONLY = ['cache-export']
+
+def seed_database(db_path, n_symbols, n_bars):
+    """Fill a fresh database with synthetic prices and their indicators, signals and outcomes."""
+    from run_feature_pipeline import run_blocks
+    from synthetic_data import synthetic_prices
+    prices_df = synthetic_prices(n_symbols, n_bars)
+    with DatabaseManager(db_path=db_path) as db_manager:
+        db_manager.setup_database()
+        db_manager.insert_stock_prices_bulk(prices_df)
+        run_blocks(db_manager, db_manager.get_symbol_ids_with_prices())
+
+def peak_rss_megabytes():
+    """
+    Peak resident memory of this process in MB. VmHWM is reset on exec, unlike
+    ru_maxrss, which would report the (larger) parent that seeded the database.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def run_stage(stage, db_path, compact):
+    """
+    Run one stage in this process and print its peak RSS and result size in
+    MB (the exported files for cache-export).
+    """
+    with DatabaseManager(db_path=db_path) as db_manager:
+        if stage == 'indicators':
+            from technical_indicators import generate_indicators_panel
+            result = generate_indicators_panel(db_manager.get_all_stock_prices(), compact=compact)
+        elif stage == 'signals':
+            from generate_technical_trade_signals import compute_signals
+            result = compute_signals(db_manager, verbose=False, compact=compact)
+        elif stage == 'signals-stream':
+            # Keep only the largest block, as a writer consuming the stream would
+            from generate_technical_trade_signals import stream_signals
+            result = max(stream_signals(db_manager, compact=compact), key=len)
+        elif stage == 'outcomes':
+            from outcomes import generate_outcomes
+            result = generate_outcomes(db_manager.get_all_stock_prices())
+            result = compact_frame(result) if compact else result
+        elif stage == 'evaluation':
+            from signal_evaluation import evaluate_signals
+            outcomes_df = db_manager.get_all_outcomes()
+            result, _ = evaluate_signals(db_manager.get_all_technical_trade_signals(compact=compact),
+                                         compact_frame(outcomes_df) if compact else outcomes_df)
+        else:
+            from feature_cache import CACHED_TABLES, cache_dir, refresh_cache
+            for table in CACHED_TABLES:
+                refresh_cache(db_manager, table, full=True)
+            files = cache_dir(db_path).rglob('*.npy')
+            print(f"{peak_rss_megabytes():.1f} {sum(f.stat().st_size for f in files) / 1e6:.1f}")
+            return
+    peak = peak_rss_megabytes()
+    print(f"{peak:.1f} {frame_megabytes(result):.1f}")
+
+def measure(stage, db_path, compact):
+    command = [sys.executable, __file__, '--stage', stage, '--db', db_path] + (['--compact'] if compact else [])
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout.split()
+    return float(output[-2]), float(output[-1])
+
+def report(db_path):
+    print(f"{'stage':<16}{'mode':<10}{'peak RSS MB':>12}{'result MB':>12}")
+    for stage in STAGES:
+        peaks = {}
+        for compact in (False,) if stage in STANDARD_ONLY else (False, True):
+            peak, size = measure(stage, db_path, compact)
+            peaks[compact] = peak
+            print(f"{stage:<16}{'compact' if compact else 'standard':<10}{peak:>12.1f}{size:>12.1f}")
+        if len(peaks) == 2:
+            print(f"{'':<16}{'saved':<10}{peaks[False] - peaks[True]:>12.1f}"
+                  f"{'':>6}({1 - peaks[True] / peaks[False]:.0%} of peak)")
+
+def main(db_path=None, n_symbols=200, n_bars=1000):
+    if db_path is not None:
+        report(db_path)
+        return
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = str(Path(workdir) / 'memory_report.db')
+        print(f"Seeding {n_symbols} symbols x {n_bars} bars into {db_path}")
+        seed_database(db_path, n_symbols, n_bars)
+        report(db_path)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Peak memory of each stage in standard and compact dtype mode')
+    parser.add_argument('--db', help='Existing database to measure (default: a temporary synthetic one)')
+    parser.add_argument('--symbols', type=int, default=200, help='Synthetic symbols when no --db is given')
+    parser.add_argument('--bars', type=int, default=1000, help='Synthetic bars per symbol when no --db is given')
+    parser.add_argument('--stage', choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument('--compact', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+    if args.stage:
+        run_stage(args.stage, args.db, args.compact)
+    else:
+        main(db_path=args.db, n_symbols=args.symbols, n_bars=args.bars)
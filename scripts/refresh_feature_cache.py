@@ -0,0 +1,27 @@
+import sys
+from pathlib import Path
+
+# Add src and database to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+sys.path.append(str(Path(__file__).parent.parent / 'database'))
+
+from database_manager import DatabaseManager
+from feature_cache import CACHED_TABLES, cache_dir, refresh_cache
+
+def main(tables=CACHED_TABLES, full=False):
+    db_manager = DatabaseManager()
+    with db_manager:
+        for table in tables:
+            rows = refresh_cache(db_manager, table, full=full)
+            print(f"{table}: exported {rows} rows")
+        print(f"Cache: {cache_dir(db_manager.db_path)}")
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Mirror the feature tables into the columnar cache')
+    parser.add_argument('--tables', nargs='+', choices=CACHED_TABLES, default=list(CACHED_TABLES),
+                        help='Tables to refresh (all cached tables by default)')
+    parser.add_argument('--full', action='store_true',
+                        help='Re-export every partition instead of those written since the last refresh')
+    args = parser.parse_args()
+    main(tables=args.tables, full=args.full)
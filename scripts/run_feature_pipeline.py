@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+import pandas as pd
+
+# Add src and database to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+sys.path.append(str(Path(__file__).parent.parent / 'database'))
+
+from database_manager import DatabaseManager
+from feature_pipeline import compute_features, update_features
+
+# Symbols loaded, computed and written per transaction
+BLOCK_SYMBOLS = 100
+
+def run_block(db_manager, symbol_ids, full=True):
+    """
+    Load one block of symbols' prices, compute indicators, signals and
+    outcomes in memory and write all three tables in one transaction.
+    Unless ``full``, only the rows past each table's watermark are computed
+    (see update_features) and upserted; a full run replaces every row of the
+    block. Returns the number of rows written per table.
+    """
+    if full:
+        prices_df = db_manager.get_all_stock_prices(symbol_ids)
+        if prices_df.empty:
+            return {}
+        indicators_df, signals_df, outcomes_df, states = compute_features(prices_df)
+    else:
+        state = db_manager.get_pipeline_state(symbol_ids).set_index('symbol_id')
+        signal_dates = state['last_signal_date'].reindex(symbol_ids)
+        # The stored indicator rows not signalled yet, and the last signalled one as the previous bar
+        start = None if signal_dates.isna().any() else signal_dates.min()
+        stored_df = db_manager.get_all_technical_indicators(symbol_ids, lags=[], with_close=True, start_date=start)
+        since = pd.to_datetime(stored_df['symbol_id'].map(signal_dates))
+        stored_df = stored_df[since.isna() | (stored_df['date'] >= since)]
+        indicators_df, signals_df, outcomes_df, states = update_features(
+            db_manager.get_new_stock_prices(symbol_ids), db_manager.get_indicator_states(symbol_ids),
+            stored_df, signal_dates.to_dict(), db_manager.get_outcome_prices(symbol_ids))
+    tables = {
+        'technical_indicators': indicators_df,
+        'technical_trade_signals': signals_df,
+        'outcomes': outcomes_df,
+    }
+    db_manager.write_feature_batch(symbol_ids, tables, states, replace=full)
+    return {table: len(df) for table, df in tables.items()}
+
+def run_blocks(db_manager, symbol_ids, block_symbols=BLOCK_SYMBOLS, full=True):
+    """run_block over ``symbol_ids`` in blocks of ``block_symbols``; returns the rows written per table."""
+    totals = {}
+    for start in range(0, len(symbol_ids), block_symbols):
+        for table, rows in run_block(db_manager, symbol_ids[start:start + block_symbols], full).items():
+            totals[table] = totals.get(table, 0) + rows
+    return totals
+
+def dirty_symbol_ids(db_manager):
+    """Symbols with prices past their last indicator, signal or outcome row (pipeline_state)."""
+    dirty = set()
+    for table in ('technical_indicators', 'technical_trade_signals', 'outcomes'):
+        dirty.update(db_manager.get_dirty_symbols(table)['symbol_id'].tolist())
+    return sorted(dirty)
+
+def main(block_symbols=BLOCK_SYMBOLS, full=False):
+    db_manager = DatabaseManager()
+    with db_manager:
+        symbol_ids = db_manager.get_symbol_ids_with_prices()
+        if not symbol_ids:
+            print("No stock price data found. Run collect_price_data.py first.")
+            return
+        if not full:
+            symbol_ids = dirty_symbol_ids(db_manager)
+            print(f"{len(symbol_ids)} symbols have new bars.")
+        for table, rows in run_blocks(db_manager, symbol_ids, block_symbols, full).items():
+            print(f"Wrote {rows} {table} rows.")
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Compute indicators, trade signals and outcomes from one read of each symbol\'s prices')
+    parser.add_argument('--block-symbols', type=int, default=BLOCK_SYMBOLS,
+                        help='Symbols loaded and written per transaction')
+    parser.add_argument('--full', action='store_true',
+                        help='Recompute every symbol instead of those with new bars')
+    args = parser.parse_args()
+    main(block_symbols=args.block_symbols, full=args.full)
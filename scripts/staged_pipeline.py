@@ -0,0 +1,40 @@
+"""
+The staged feature path: generate_technical_indicators.py,
+generate_technical_trade_signals.py and generate_outcomes.py run one after
+the other, each stage reading the previous one's table back from SQLite.
+
+run_feature_pipeline.py computes the same tables in memory; the tests check
+it against these runs and the pipeline benchmarks time both.
+"""
+import sys
+from pathlib import Path
+
+# Add src and database to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+sys.path.append(str(Path(__file__).parent.parent / 'database'))
+
+from generate_outcomes import compute_outcomes
+from generate_technical_indicators import compute_indicators
+from generate_technical_trade_signals import compute_signals, stream_signal_updates
+
+# Tables the feature stages write
+TABLES = ['technical_indicators', 'technical_trade_signals', 'outcomes']
+
+def run_full(db_manager):
+    """Recompute every stage for every symbol."""
+    indicators_df, states = compute_indicators(db_manager)
+    db_manager.insert_technical_indicators(indicators_df)
+    db_manager.save_indicator_states(states)
+    db_manager.insert_technical_trade_signals(compute_signals(db_manager, verbose=False))
+    db_manager.insert_outcomes(compute_outcomes(db_manager, full=True))
+
+def run_nightly(db_manager):
+    """Run each stage for its dirty symbols only (pipeline_state watermarks)."""
+    symbol_ids = db_manager.get_dirty_symbols('technical_indicators')['symbol_id'].tolist()
+    indicators_df, states = compute_indicators(db_manager, symbol_ids, update_mode=True)
+    db_manager.insert_technical_indicators(indicators_df)
+    db_manager.save_indicator_states(states)
+    for signals_df in stream_signal_updates(db_manager, block_symbols=100):
+        db_manager.insert_technical_trade_signals(signals_df)
+    symbol_ids = db_manager.get_dirty_symbols('outcomes')['symbol_id'].tolist()
+    db_manager.insert_outcomes(compute_outcomes(db_manager, symbol_ids))
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Stress test readers against bulk writes on a temporary database of synthetic
+prices, in the default journal mode (each reader thread opens its own
+connection, as a notebook would) and in concurrent mode (WAL, pooled
+per-thread read connections from DatabaseManager.reader(), writes serialized
+by its write lock).
+
+A writer thread upserts the whole price table (with changed closes) in one
+transaction after another while reader threads query one symbol's prices at
+a time. Reports the reads completed, their latency percentiles and "database
+is locked" errors per mode; tests/test_concurrent.py checks the isolation
+each mode gives.
+"""
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Add src and database to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+sys.path.append(str(Path(__file__).parent.parent / 'database'))
+
+from database_manager import DatabaseManager
+from synthetic_data import synthetic_prices
+
+def run(db_path, prices_df, concurrent, n_readers, seconds):
+    stop = threading.Event()
+    writes, latencies, errors = [], [], []
+    lock = threading.Lock()
+    db_manager = DatabaseManager(db_path=db_path, concurrent=concurrent)
+    db_manager.connect()
+
+    def write():
+        # Without concurrent mode a connection stays in the thread that opened it
+        writer = db_manager if concurrent else DatabaseManager(db_path=db_path)
+        while not stop.is_set():
+            # SQLite skips rewriting unchanged rows, so every pass moves the closes
+            rows = prices_df.assign(close=prices_df['close'] * (1 + (len(writes) + 1) * 1e-4))
+            start = time.perf_counter()
+            with writer.writer():
+                writer.insert_stock_prices_bulk(rows)
+            writes.append(time.perf_counter() - start)
+        if writer is not db_manager:
+            writer.disconnect()
+
+    def read(seed):
+        rng = np.random.default_rng(seed)
+        own = None if concurrent else DatabaseManager(db_path=db_path)
+        while not stop.is_set():
+            symbol_id = int(rng.integers(1, prices_df['symbol_id'].max() + 1))
+            start = time.perf_counter()
+            try:
+                manager = db_manager.reader() if concurrent else own
+                manager.get_all_stock_prices([symbol_id])
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+            # pandas re-raises the driver's "database is locked" as DatabaseError
+            except (sqlite3.OperationalError, pd.errors.DatabaseError) as e:
+                with lock:
+                    errors.append(str(e))
+        if own is not None:
+            own.disconnect()
+
+    threads = [threading.Thread(target=write)] + [threading.Thread(target=read, args=(i,)) for i in range(n_readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    db_manager.disconnect()
+    return writes, np.array(latencies) * 1000, errors
+
+def main(n_symbols=200, n_bars=1000, n_readers=4, seconds=15):
+    workdir = tempfile.mkdtemp()
+    seeded = os.path.join(workdir, 'seeded.db')
+    prices_df = synthetic_prices(n_symbols, n_bars)
+    with DatabaseManager(db_path=seeded) as db_manager:
+        db_manager.setup_database()
+        db_manager.insert_stock_prices_bulk(prices_df)
+    print(f"Universe: {n_symbols} symbols x {n_bars} bars, {n_readers} readers, {seconds} s per mode")
+
+    try:
+        for name, concurrent in [('default', False), ('concurrent', True)]:
+            db_path = os.path.join(workdir, f'{name}.db')
+            shutil.copy(seeded, db_path)
+            writes, latencies, errors = run(db_path, prices_df, concurrent, n_readers, seconds)
+            p50, p99, worst = np.percentile(latencies, [50, 99, 100]) if len(latencies) else (np.nan,) * 3
+            print(f"{name:<11}{len(writes):>3} writes ({np.mean(writes):5.2f} s each)  "
+                  f"{len(latencies):>6} reads  p50 {p50:7.1f} ms  p99 {p99:7.1f} ms  max {worst:7.1f} ms  "
+                  f"{len(errors)} locked errors")
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Stress readers against bulk writes with and without WAL')
+    parser.add_argument('--symbols', type=int, default=200, help='Number of synthetic symbols')
+    parser.add_argument('--bars', type=int, default=1000, help='Bars per symbol')
+    parser.add_argument('--readers', type=int, default=4, help='Reader threads')
+    parser.add_argument('--seconds', type=float, default=15, help='Duration of each mode')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+    main(n_symbols=args.symbols, n_bars=args.bars, n_readers=args.readers, seconds=args.seconds)
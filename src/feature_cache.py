@@ -0,0 +1,162 @@
+"""
+Columnar, memory-mapped cache of the feature tables.
+
+Each cached table is mirrored into partitions of CACHE_BUCKET_SYMBOLS symbol
+ids, one .npy file per column sorted by (symbol_id, date), next to the
+database. A partition is rebuilt only when pipeline_state shows a write to
+the table for one of its symbols since it was exported, so a nightly update
+refreshes the partitions of the symbols it touched, and a write to another
+table (new prices, say) leaves the indicator partitions alone. Reads
+memory-map only the requested columns of the partitions holding the
+requested symbols and gather the rows of those symbols (and dates) with
+binary searches on the sorted keys, instead of a full SQLite scan into
+row-by-row frame construction.
+"""
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CACHED_TABLES = ('stock_prices', 'technical_indicators', 'technical_trade_signals', 'outcomes')
+# Symbol ids per partition
+CACHE_BUCKET_SYMBOLS = 100
+# Table columns that are bookkeeping rather than data
+_SKIPPED_COLUMNS = ('id', 'created_at')
+
+
+def cache_dir(db_path: str) -> Path:
+    """Cache directory of a database: feature_cache/<database name> beside the file."""
+    db_path = Path(db_path)
+    return db_path.parent / 'feature_cache' / db_path.stem
+
+
+def _table_columns(connection, table: str) -> list:
+    rows = connection.execute(f"PRAGMA table_info({table})").fetchall()
+    return [row[1] for row in rows if row[1] not in _SKIPPED_COLUMNS]
+
+
+def _load_manifest(path: Path) -> dict:
+    try:
+        return json.loads((path / 'manifest.json').read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def _export_partition(connection, table: str, columns: list, bucket: int, path: Path) -> int:
+    """Write one partition's columns to a fresh directory and swap it in."""
+    df = pd.read_sql_query(f"""
+        SELECT {', '.join(columns)} FROM {table}
+        WHERE symbol_id >= ? AND symbol_id < ?
+        ORDER BY symbol_id, date
+    """, connection, params=[bucket * CACHE_BUCKET_SYMBOLS, (bucket + 1) * CACHE_BUCKET_SYMBOLS])
+    target, staging = path / f'part-{bucket:05d}', path / f'part-{bucket:05d}.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    for col in columns:
+        if col == 'date':
+            values = pd.to_datetime(df['date']).to_numpy(dtype='datetime64[D]')
+        elif col == 'symbol_id':
+            values = df[col].to_numpy(dtype='int64')
+        else:
+            values = df[col].to_numpy(dtype='float64')
+        np.save(staging / f'{col}.npy', values)
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+    return len(df)
+
+
+def refresh_cache(db_manager, table: str, full: bool = False) -> int:
+    """
+    Export the partitions of ``table`` whose symbols were written since they
+    were cached (all of them when ``full`` or when the table's columns
+    changed) and drop partitions whose symbols are gone. Returns the number
+    of rows exported.
+    """
+    if table not in CACHED_TABLES:
+        raise ValueError(f"Not a cached table: {table}; expected one of {CACHED_TABLES}")
+    if not db_manager.connection:
+        db_manager.connect()
+    connection = db_manager.connection
+    path = cache_dir(db_manager.db_path) / table
+    manifest = _load_manifest(path)
+    columns = _table_columns(connection, table)
+    if full or manifest.get('columns') != columns:
+        shutil.rmtree(path, ignore_errors=True)
+        manifest = {}
+    cached = manifest.get('partitions', {})
+    watermarks = db_manager.get_write_watermarks(table, CACHE_BUCKET_SYMBOLS)
+    exported = 0
+    for bucket, watermark in watermarks.items():
+        if cached.get(bucket) != watermark:
+            exported += _export_partition(connection, table, columns, int(bucket), path)
+    for bucket in set(cached) - set(watermarks):
+        shutil.rmtree(path / f'part-{int(bucket):05d}', ignore_errors=True)
+    path.mkdir(parents=True, exist_ok=True)
+    (path / 'manifest.json').write_text(json.dumps({'columns': columns, 'partitions': watermarks}))
+    return exported
+
+
+def _row_ranges(keys: np.ndarray, dates: np.ndarray, symbol_ids, start, end) -> np.ndarray:
+    """Row numbers of a partition kept by the symbol and date filters."""
+    if symbol_ids is None:
+        bounds = [(0, len(keys))]
+    else:
+        lo, hi = np.searchsorted(keys, symbol_ids, 'left'), np.searchsorted(keys, symbol_ids, 'right')
+        bounds = [(a, b) for a, b in zip(lo, hi) if b > a]
+    rows = []
+    for a, b in bounds:
+        if start is not None:
+            a += np.searchsorted(dates[a:b], start, 'left')
+        if end is not None:
+            b = a + np.searchsorted(dates[a:b], end, 'right')
+        if b > a:
+            rows.append(np.arange(a, b))
+    return np.concatenate(rows) if rows else np.array([], dtype=np.int64)
+
+
+def read_cached(db_manager, table: str, columns: list = None, symbol_ids: list = None,
+                start_date=None, end_date=None, refresh: bool = True) -> pd.DataFrame:
+    """
+    Read ``columns`` (all by default) of ``table`` for ``symbol_ids`` (all
+    by default) between ``start_date`` and ``end_date`` from the cache,
+    refreshing stale partitions first unless ``refresh=False``. Returns
+    symbol_id, date (datetime64) and the columns, sorted by symbol_id and
+    date; values are float64 as in SQLite.
+    """
+    if refresh:
+        refresh_cache(db_manager, table)
+    path = cache_dir(db_manager.db_path) / table
+    manifest = _load_manifest(path)
+    columns = [col for col in (columns or manifest['columns']) if col not in ('symbol_id', 'date')]
+    missing = set(columns) - set(manifest['columns'])
+    if missing:
+        raise KeyError(f"Columns not in {table}: {sorted(missing)}")
+    start = None if start_date is None else np.datetime64(pd.Timestamp(start_date).date(), 'D')
+    end = None if end_date is None else np.datetime64(pd.Timestamp(end_date).date(), 'D')
+    if symbol_ids is None:
+        buckets = {int(bucket): None for bucket in manifest['partitions']}
+    else:
+        symbol_ids = np.unique(np.asarray(symbol_ids, dtype='int64'))
+        buckets = {}
+        for bucket in np.unique(symbol_ids // CACHE_BUCKET_SYMBOLS):
+            if str(bucket) in manifest['partitions']:
+                buckets[int(bucket)] = symbol_ids[symbol_ids // CACHE_BUCKET_SYMBOLS == bucket]
+
+    parts = {col: [] for col in ['symbol_id', 'date'] + columns}
+    for bucket in sorted(buckets):
+        part = path / f'part-{bucket:05d}'
+        keys = np.load(part / 'symbol_id.npy', mmap_mode='r')
+        dates = np.load(part / 'date.npy', mmap_mode='r')
+        rows = _row_ranges(keys, dates, buckets[bucket], start, end)
+        parts['symbol_id'].append(keys[rows])
+        parts['date'].append(dates[rows])
+        for col in columns:
+            parts[col].append(np.load(part / f'{col}.npy', mmap_mode='r')[rows])
+    if not buckets:
+        return pd.DataFrame(columns=list(parts))
+    df = pd.DataFrame({col: np.concatenate(values) for col, values in parts.items()})
+    df['date'] = df['date'].astype('datetime64[ns]')
+    return df
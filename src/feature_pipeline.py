@@ -0,0 +1,68 @@
+"""
+In-memory end-to-end feature pipeline.
+
+Indicators, trade signals and outcomes are all derived from the same prices,
+so a batch of symbols is loaded once and all three tables are computed from
+it in memory, instead of writing indicators to SQLite, reading them back for
+signals and re-reading every price for outcomes. update_features does the
+same for only the bars each table is missing, so a nightly run costs the new
+bars rather than the history.
+"""
+import pandas as pd
+
+from indicator_state import build_states, update_indicators
+from outcomes import generate_outcomes
+from technical_trade_signals import generate_trade_signals_fused
+
+
+def compute_features(prices_df: pd.DataFrame):
+    """
+    Compute indicators, trade signals and outcomes for every symbol in
+    ``prices_df`` (full history per symbol, as get_all_stock_prices returns).
+
+    Returns (indicators_df, signals_df, outcomes_df, states), each keyed by
+    symbol_id and date like the tables they are written to; ``states`` is the
+    indicator state for later incremental updates.
+    """
+    indicators_df, states = build_states(prices_df)
+    if indicators_df.empty:
+        return indicators_df, pd.DataFrame(), pd.DataFrame(), states
+    # Indicator rows still carry their close, so no merge with prices is needed
+    signals_df = _signals(indicators_df)
+    outcomes_df = generate_outcomes(prices_df)
+    return indicators_df, signals_df, outcomes_df, states
+
+
+def _signals(indicators_df: pd.DataFrame) -> pd.DataFrame:
+    signals_df = generate_trade_signals_fused(indicators_df).drop(columns=['symbol'])
+    signals_df.insert(0, 'symbol_id', indicators_df['symbol_id'].to_numpy().astype(int))
+    return signals_df
+
+
+def update_features(prices_df: pd.DataFrame, states: dict, stored_df: pd.DataFrame, signal_dates: dict,
+                    outcome_prices_df: pd.DataFrame):
+    """
+    Incremental compute_features: only the rows each table is missing.
+
+    ``prices_df`` and ``states`` are each symbol's bars after its indicator
+    state and the states (get_new_stock_prices, get_indicator_states);
+    indicators resume from the states. ``stored_df`` holds the stored
+    indicator rows, with their close, from each symbol's last signal date in
+    ``signal_dates`` (symbol_id -> date, None without signals) on: signals
+    are generated for the rows after that date, the row on it being read
+    again as the previous bar the cross and breakout rules compare with.
+    Outcomes are generated from ``outcome_prices_df`` (get_outcome_prices).
+
+    Returns (indicators_df, signals_df, outcomes_df, states) like
+    compute_features, with the states of the symbols that got new bars.
+    """
+    indicators_df, states = update_indicators(prices_df, states)
+    rows = pd.concat([stored_df, indicators_df.assign(date=pd.to_datetime(indicators_df['date']))],
+                     ignore_index=True)
+    signals_df = pd.DataFrame()
+    if not rows.empty:
+        rows = rows.sort_values(['symbol_id', 'date'], kind='stable', ignore_index=True)
+        since = pd.to_datetime(rows['symbol_id'].map(signal_dates))
+        signals_df = _signals(rows)[(since.isna() | (rows['date'] > since)).to_numpy()].reset_index(drop=True)
+    outcomes_df = pd.DataFrame() if outcome_prices_df.empty else generate_outcomes(outcome_prices_df)
+    return indicators_df, signals_df, outcomes_df, states
@@ -0,0 +1,425 @@
+"""
+NumPy kernels for the panel indicator engine.
+
+Every kernel works along the last axis of its input, so the same code serves a
+single symbol (1-D array) or a whole universe laid out as a 2-D panel of shape
+(n_symbols, n_bars) with NaN padding after each symbol's last bar. Indicator
+windows only ever look backwards, so the padding never leaks into real bars;
+the forward-looking kernels used for outcomes ignore it as missing data.
+"""
+import numpy as np
+import pandas as pd
+
+
+def build_panel(keys: pd.Series):
+    """
+    Compute the panel layout for rows already sorted by (key, date).
+
+    Returns (codes, positions, lengths): the panel row and column of every
+    input row, and the number of bars per panel row.
+    """
+    codes, _ = pd.factorize(keys, sort=False)
+    lengths = np.bincount(codes)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    positions = np.arange(len(codes)) - starts[codes]
+    return codes, positions, lengths
+
+
+def to_panel(values, codes, positions, lengths, fill=np.nan) -> np.ndarray:
+    """Scatter a flat column into a (n_symbols, max_bars) float64 panel."""
+    panel = np.full((len(lengths), lengths.max() if len(lengths) else 0), fill, dtype='float64')
+    panel[codes, positions] = values
+    return panel
+
+
+def from_panel(panel, codes, positions) -> np.ndarray:
+    """Gather a panel back into the flat row order it was built from."""
+    return panel[codes, positions]
+
+
+def shift(x, periods: int) -> np.ndarray:
+    """Shift along the time axis, filling vacated bars with NaN."""
+    out = np.full(x.shape, np.nan)
+    if periods < x.shape[-1]:
+        out[..., periods:] = x[..., :x.shape[-1] - periods]
+    return out
+
+
+class PrefixSums:
+    """
+    Prefix sums of a series (optionally of its squares too) shared by every
+    trailing window over it, so each rolling sum, mean or standard deviation
+    costs one subtraction regardless of the window.
+
+    Values are centred on each row's first bar to keep the prefix sums small,
+    and windows that contain a non-finite value come back as NaN, matching
+    pandas ``min_periods=window`` semantics.
+    """
+
+    def __init__(self, x, squares: bool = False):
+        bad = ~np.isfinite(x)
+        self._ref = np.where(bad[..., :1], 0.0, x[..., :1])
+        centred = np.where(bad, 0.0, x - self._ref)
+        self._sum = self._prefix(centred)
+        self._sumsq = self._prefix(centred * centred) if squares else None
+        self._bad = self._prefix(bad.astype('int32'))
+
+    @staticmethod
+    def _prefix(x):
+        out = np.zeros(x.shape[:-1] + (x.shape[-1] + 1,), dtype=x.dtype)
+        np.cumsum(x, axis=-1, out=out[..., 1:])
+        return out
+
+    def _window(self, prefix, window):
+        n = prefix.shape[-1] - 1
+        out = np.full(prefix.shape[:-1] + (n,), np.nan)
+        if window <= n:
+            out[..., window - 1:] = prefix[..., window:] - prefix[..., :n + 1 - window]
+            bad = self._bad[..., window:] - self._bad[..., :n + 1 - window]
+            out[..., window - 1:][bad > 0] = np.nan
+        return out
+
+    def sum(self, window: int) -> np.ndarray:
+        """Trailing window sum (``rolling(window).sum()``)."""
+        return self._window(self._sum, window) + window * self._ref
+
+    def mean(self, window: int) -> np.ndarray:
+        """Trailing window mean (``rolling(window).mean()``)."""
+        return self._window(self._sum, window) / window + self._ref
+
+    def std(self, window: int) -> np.ndarray:
+        """Trailing population standard deviation (``rolling(window).std(ddof=0)``)."""
+        mean = self._window(self._sum, window) / window
+        var = self._window(self._sumsq, window) / window - mean * mean
+        return np.sqrt(np.maximum(var, 0.0))
+
+
+def rolling_sum(x, window: int) -> np.ndarray:
+    """Trailing window sum with pandas ``min_periods=window`` semantics."""
+    return PrefixSums(x).sum(window)
+
+
+def rolling_mean(x, window: int) -> np.ndarray:
+    """Trailing window mean (``rolling(window).mean()``)."""
+    return PrefixSums(x).mean(window)
+
+
+def rolling_std(x, window: int) -> np.ndarray:
+    """Trailing population standard deviation (``rolling(window).std(ddof=0)``)."""
+    return PrefixSums(x, squares=True).std(window)
+
+
+def rolling_extrema(x, windows, op) -> dict:
+    """
+    Trailing maxima (``op=np.fmax``) or minima (``op=np.fmin``) for a whole
+    set of windows in one sweep.
+
+    Builds doubling levels (a sparse table): level j holds the extreme of the
+    last 2**j bars and is one ``op`` of level j - 1 with itself shifted. Any
+    window w is then the ``op`` of two overlapping power-of-two blocks, so the
+    cost is log2(max window) passes for the levels plus one pass per window,
+    instead of w passes per window. Before a window fills up it covers the
+    bars seen so far.
+
+    ``windows`` holds window lengths (``min_periods`` equal to the window) or
+    (window, min_periods) pairs; the result is keyed by the same entries.
+    """
+    specs = [(w, w) if isinstance(w, (int, np.integer)) else tuple(w) for w in windows]
+    n = x.shape[-1]
+    levels = [x]
+    for j in range(max(w for w, _ in specs).bit_length() - 1):
+        half = 1 << j
+        level = levels[-1].copy()
+        if half < n:
+            op(level[..., half:], levels[-1][..., :-half], out=level[..., half:])
+        levels.append(level)
+    result = {}
+    for key, (window, min_periods) in zip(windows, specs):
+        j = window.bit_length() - 1
+        rest = window - (1 << j)
+        out = levels[j].copy()
+        if 0 < rest < n:
+            op(out[..., rest:], levels[j][..., :-rest], out=out[..., rest:])
+        out[..., :min_periods - 1] = np.nan
+        result[key] = out
+    return result
+
+
+def rolling_max(x, window: int, min_periods: int = None) -> np.ndarray:
+    """Trailing window maximum; ``min_periods`` defaults to the window."""
+    spec = (window, min_periods or window)
+    return rolling_extrema(x, [spec], np.fmax)[spec]
+
+
+def rolling_min(x, window: int, min_periods: int = None) -> np.ndarray:
+    """Trailing window minimum; ``min_periods`` defaults to the window."""
+    spec = (window, min_periods or window)
+    return rolling_extrema(x, [spec], np.fmin)[spec]
+
+
+def forward_extrema(x, windows, op) -> dict:
+    """
+    Maxima (``op=np.fmax``) or minima (``op=np.fmin``) of the next w bars,
+    excluding the current one, for a whole set of windows: rolling_extrema
+    over the reversed time axis. Windows that run past the last bar cover the
+    bars there are (NaN when there are none).
+    """
+    trailing = rolling_extrema(x[..., ::-1], [(w, 1) for w in windows], op)
+    result = {}
+    for w in windows:
+        out = np.full(x.shape, np.nan)
+        out[..., :-1] = trailing[(w, 1)][..., ::-1][..., 1:]
+        result[w] = out
+    return result
+
+
+def first_reach(x, level, max_bars: int) -> np.ndarray:
+    """
+    Bars until ``x`` first reaches ``level`` (x >= level, one level per bar)
+    within the next ``max_bars`` bars; NaN when it does not.
+
+    ``level`` may stack several sets of levels along leading axes, as
+    ``alpha`` does in ``ewm``; they are searched together and the result has
+    the shape of ``level``.
+
+    Builds forward doubling maxima once (table j holds the maximum of the next
+    2**j bars) and, for all bars and levels at once, skips every block whose
+    maximum stays below the level from the largest block down, so the search
+    takes log2(max_bars) vectorised gathers instead of max_bars passes.
+    """
+    n = x.shape[-1]
+    width = n + max_bars
+    ahead = np.full(x.shape[:-1] + (width,), np.nan)
+    ahead[..., :n - 1] = x[..., 1:]
+    tables = [ahead]
+    for j in range(max_bars.bit_length() - 1):
+        half = 1 << j
+        table = tables[-1].copy()
+        np.fmax(table[..., :-half], tables[-1][..., half:], out=table[..., :-half])
+        tables.append(table)
+    # Gather from the flattened tables: bar i of row r sits at r * width + i
+    rows = np.arange(int(np.prod(x.shape[:-1], dtype=np.int64))).reshape(x.shape[:-1] + (1,))
+    bars = rows * width + np.arange(n)
+    tables = [table.ravel() for table in tables]
+
+    level = np.asarray(level, dtype='float64')
+    skipped = np.zeros(level.shape, dtype=np.int64)
+    index = np.empty(level.shape, dtype=np.int64)
+    with np.errstate(invalid='ignore'):
+        for j in reversed(range(len(tables))):
+            block = 1 << j
+            np.add(bars, skipped, out=index)
+            below = tables[j].take(index) < level
+            below &= skipped <= max_bars - block
+            np.add(skipped, block, out=skipped, where=below)
+        np.add(bars, skipped, out=index)
+        hit = tables[0].take(index) >= level
+    return np.where(hit & (skipped < max_bars), skipped + 1, np.nan)
+
+
+def rolling_mad(x, mean, window: int) -> np.ndarray:
+    """Trailing mean absolute deviation around the given rolling ``mean``."""
+    total = np.abs(x - mean)
+    for k in range(1, window):
+        if k >= x.shape[-1]:
+            break
+        total[..., k:] += np.abs(x[..., :-k] - mean[..., k:])
+    return total / window
+
+
+def ewm(x, alpha, min_periods, start: int = 0, init=None) -> np.ndarray:
+    """
+    Recursive exponential average (``ewm(alpha=..., adjust=False)``).
+
+    ``alpha`` may be a 1-D array of smoothing factors (with matching
+    ``min_periods``); the averages are then advanced together in a single pass
+    over the bars and stacked along a new leading axis. The recursion is seeded
+    at bar ``start`` (the first valid bar) and results before
+    ``start + min_periods - 1`` are NaN. Passing ``init`` (the average at bar
+    ``start - 1``) resumes a previous run instead.
+    """
+    alpha = np.asarray(alpha, dtype='float64')
+    shape = alpha.shape + x.shape
+    n = x.shape[-1]
+    out = np.full(shape, np.nan)
+    if start >= n:
+        return out
+    a = alpha.reshape(alpha.shape + (1,) * (x.ndim - 1))
+    if init is None:
+        y = np.broadcast_to(x[..., start], shape[:-1]).copy()
+        out[..., start] = y
+        first = start + 1
+    else:
+        y = np.broadcast_to(np.asarray(init, dtype='float64'), shape[:-1]).copy()
+        first = start
+    for t in range(first, n):
+        y = (1.0 - a) * y + a * x[..., t]
+        out[..., t] = y
+    if init is None:
+        for idx, periods in np.ndenumerate(np.broadcast_to(min_periods, alpha.shape)):
+            out[idx][..., :min(n, start + periods - 1)] = np.nan
+    return out
+
+
+def wilder(x, window: int, start: int = 0, init=None) -> np.ndarray:
+    """
+    Wilder smoothing as used by ``ta``'s ATR: seeded with the mean of the first
+    ``window`` values and reported as 0 before that. Passing ``init`` resumes
+    from the value at bar ``start - 1``.
+    """
+    n = x.shape[-1]
+    out = np.zeros(x.shape)
+    if init is None:
+        if window > n:
+            return out
+        y = x[..., :window].mean(axis=-1)
+        out[..., window - 1] = y
+        first = window
+    else:
+        y = np.asarray(init, dtype='float64').copy()
+        first = start
+    for t in range(first, n):
+        y = (y * (window - 1) + x[..., t]) / float(window)
+        out[..., t] = y
+    return out
+
+
+def true_range(high, low, close) -> np.ndarray:
+    """True range; the first bar falls back to high - low."""
+    prev_close = shift(close, 1)
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return tr
+
+
+def directional_movement(high, low, true_range) -> np.ndarray:
+    """
+    Stack of (true range, +DM, -DM) as used by ``ta``'s ADX. ``ta`` takes the
+    range as max(high, prev close) - min(low, prev close), which is the true
+    range bit for bit; the first bar is NaN in every component.
+    """
+    dm = true_range.copy()
+    dm[..., :1] = np.nan
+    diff_up = high - shift(high, 1)
+    diff_down = shift(low, 1) - low
+    pos = np.abs(((diff_up > diff_down) & (diff_up > 0)) * diff_up)
+    neg = np.abs(((diff_down > diff_up) & (diff_down > 0)) * diff_down)
+    return np.stack([dm, pos, neg])
+
+
+def wilder_sums(moves, window: int, start: int = 0, init=None) -> np.ndarray:
+    """
+    Wilder running sums of directional movement: seeded at bar ``window`` with
+    the sum of bars 1..window, 0 before that. ``init`` resumes from bar
+    ``start - 1``.
+    """
+    n = moves.shape[-1]
+    sums = np.zeros(moves.shape)
+    if init is None:
+        if window >= n:
+            return sums
+        sums[..., window] = moves[..., 1:window + 1].sum(axis=-1)
+        first = window + 1
+    else:
+        sums[..., start - 1] = init
+        first = start
+    for t in range(first, n):
+        sums[..., t] = sums[..., t - 1] - (sums[..., t - 1] / float(window)) + moves[..., t]
+    return sums
+
+
+def adx_from_sums(sums, window: int, start: int = 0, init=None) -> np.ndarray:
+    """
+    Average Directional Index from ``wilder_sums`` output with ``ta``'s
+    conventions: the first value at bar ``2 * window - 1`` and 0 before that.
+    ``init`` resumes from the ADX at bar ``start - 1``.
+    """
+    trs, dip, din = sums
+    n = trs.shape[-1]
+    out = np.zeros(trs.shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dip = np.where(trs != 0, 100 * (dip / trs), 0)
+        din = np.where(trs != 0, 100 * (din / trs), 0)
+        dx = np.where(dip + din != 0, 100 * np.abs((dip - din) / (dip + din)), 0)
+    if init is None:
+        if n < 2 * window:
+            return out
+        out[..., 2 * window - 1] = dx[..., window:2 * window].mean(axis=-1)
+        first = 2 * window
+    else:
+        out[..., start - 1] = init
+        first = start
+    for t in range(first, n):
+        out[..., t] = ((out[..., t - 1] * (window - 1)) + dx[..., t]) / float(window)
+    return out
+
+
+def adx(high, low, close, window: int) -> np.ndarray:
+    """Average Directional Index with ``ta``'s conventions."""
+    moves = directional_movement(high, low, true_range(high, low, close))
+    return adx_from_sums(wilder_sums(moves, window), window)
+
+
+def psar(high, low, close, step, max_step: float = 0.2, start: int = 0, init=None):
+    """
+    Parabolic SAR following ``ta``'s PSARIndicator, advanced one bar at a time
+    for every row at once.
+
+    ``step`` may be a 1-D array of acceleration steps; every configuration then
+    advances in the same loop over the bars and the outputs gain a leading axis,
+    as in ``ewm``. Returns (psar, up_trend, acceleration, trend_high, trend_low)
+    so the state at any bar can be read back. ``init`` is a tuple of those five
+    values at bar ``start - 1`` and resumes a previous run.
+    """
+    steps = np.asarray(step, dtype='float64')
+    shape = steps.shape + close.shape
+    step = steps.reshape(steps.shape + (1,) * (close.ndim - 1))
+    n = close.shape[-1]
+    out = np.broadcast_to(close.astype('float64'), shape).copy()
+    up_trend = np.ones(shape, dtype=bool)
+    accel = np.broadcast_to(steps.reshape(steps.shape + (1,) * close.ndim), shape).copy()
+    trend_high = np.full(shape, np.nan)
+    trend_low = np.full(shape, np.nan)
+    if n == 0:
+        return out, up_trend, accel, trend_high, trend_low
+    if init is None:
+        up = np.ones(shape[:-1], dtype=bool)
+        af = np.broadcast_to(step, shape[:-1]).copy()
+        uth = np.broadcast_to(high[..., 0], shape[:-1]).copy()
+        dtl = np.broadcast_to(low[..., 0], shape[:-1]).copy()
+        trend_high[..., :2] = uth[..., None]
+        trend_low[..., :2] = dtl[..., None]
+        first = 2
+    else:
+        prev, up, af, uth, dtl = (np.broadcast_to(v, shape[:-1]).copy() for v in init)
+        up = up.astype(bool)
+        out[..., start - 1] = prev
+        first = start
+    for i in range(first, n):
+        hi = high[..., i]
+        lo = low[..., i]
+        prev = out[..., i - 1]
+        value = np.where(up, prev + af * (uth - prev), prev - af * (prev - dtl))
+        rev_up = up & (lo < value)
+        rev_down = ~up & (hi > value)
+        new_high = up & ~rev_up & (hi > uth)
+        new_low = ~up & ~rev_down & (lo < dtl)
+
+        value = np.where(rev_up, uth, np.where(rev_down, dtl, value))
+        af = np.where(rev_up | rev_down, step, np.where(new_high | new_low, np.minimum(af + step, max_step), af))
+        dtl = np.where(rev_up | new_low, lo, dtl)
+        uth = np.where(rev_down | new_high, hi, uth)
+
+        hold_up = up & ~rev_up
+        low1, low2 = low[..., i - 1], low[..., i - 2]
+        value = np.where(hold_up & (low2 < value), low2, np.where(hold_up & (low1 < value), low1, value))
+        hold_down = ~up & ~rev_down
+        high1, high2 = high[..., i - 1], high[..., i - 2]
+        value = np.where(hold_down & (high2 > value), high2, np.where(hold_down & (high1 > value), high1, value))
+
+        up = up != (rev_up | rev_down)
+        out[..., i] = value
+        up_trend[..., i] = up
+        accel[..., i] = af
+        trend_high[..., i] = uth
+        trend_low[..., i] = dtl
+    return out, up_trend, accel, trend_high, trend_low
@@ -0,0 +1,196 @@
+"""
+Registry of technical indicator families and their parameter sets.
+
+The parameters live in the ``technical_indicators`` section of config.yaml,
+one entry per family in column order. Column names, the technical_indicators
+table definition and the parameter subset needed for a requested set of
+columns are all derived from it, so adding a window is a config change only.
+Lag columns are virtual: they are shifted stock_prices, served at read time
+by DatabaseManager and never stored.
+"""
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+DEFAULT_CONFIG_PATH = Path(__file__).parent.parent / 'config.yaml'
+
+
+def psar_key(step: float, max_step: float) -> str:
+    """Column suffix of a PSAR parameter set, e.g. 0.02 / 0.2 -> '002_02'."""
+    return f"{step:.2f}".replace('.', '') + '_' + f"{max_step:.1f}".replace('.', '')
+
+
+def _macd_columns(config, params):
+    key = '_'.join(str(w) for w in config)
+    return [f'macd_{key}', f'macd_signal_{key}', f'macd_hist_{key}']
+
+
+def _ichimoku_columns(config, params):
+    conv, base, span_b = config
+    return [f'ichimoku_conv_{conv}', f'ichimoku_base_{base}', f'ichimoku_spanb_{span_b}']
+
+
+# Families served at read time from stock_prices instead of being stored
+VIRTUAL_FAMILIES = {'lags'}
+
+# family -> (parameter holding one entry per parameter set, columns of one entry)
+FAMILIES = {
+    'rsi': ('windows', lambda w, params: [f'rsi_{w}']),
+    'sma': ('windows', lambda w, params: [f'sma_{w}']),
+    'ema': ('windows', lambda w, params: [f'ema_{w}']),
+    'macd': ('configs', _macd_columns),
+    'bb': ('windows', lambda w, params: [f'bb_upper_{w}', f'bb_middle_{w}', f'bb_lower_{w}']),
+    'stoch': ('windows', lambda w, params: [
+        f"stoch_k_{w}_{params['smooth_window']}", f"stoch_d_{w}_{params['smooth_window']}"
+    ]),
+    'cci': ('windows', lambda w, params: [f'cci_{w}']),
+    'atr': ('windows', lambda w, params: [f'atr_{w}']),
+    'obv': ('windows', lambda w, params: [f'obv_{w}']),
+    'ichimoku': ('configs', _ichimoku_columns),
+    'donchian': ('windows', lambda w, params: [f'donchian_high_{w}', f'donchian_low_{w}']),
+    'adx': ('windows', lambda w, params: [f'adx_{w}']),
+    'psar': ('steps', lambda step, params: [f"psar_{psar_key(step, params['max_step'])}"]),
+    'lags': ('columns', lambda col, params: [f'{col}_lag_{lag}' for lag in params['lags']]),
+}
+
+
+@lru_cache(maxsize=None)
+def _read_config(config_path: str) -> dict:
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f) or {}
+    indicators = config.get('technical_indicators')
+    if not indicators:
+        raise ValueError(f"No technical_indicators section in {config_path}")
+    unknown = set(indicators) - set(FAMILIES)
+    if unknown:
+        raise ValueError(f"Unknown indicator families in {config_path}: {sorted(unknown)}")
+    return indicators
+
+
+def load_indicator_config(config_path=None) -> dict:
+    """Load the indicator families (family -> parameters) from config.yaml."""
+    return _read_config(str(config_path or DEFAULT_CONFIG_PATH))
+
+
+def family_entries(indicators: dict, family: str):
+    """Yield (entry, columns) for each parameter set of ``family``."""
+    params = indicators.get(family)
+    if not params:
+        return
+    entry_param, columns = FAMILIES[family]
+    for entry in params[entry_param]:
+        yield entry, columns(entry, params)
+
+
+def parameter_sets(indicators: dict, family: str) -> list:
+    """Parameter sets of ``family`` (windows, configs, steps...), empty if not selected."""
+    return [entry for entry, _ in family_entries(indicators, family)]
+
+
+def _lookback(family: str, entry, params: dict) -> int:
+    """Bars one parameter set needs before its last column is warmed up."""
+    if family == 'adx':
+        # The ADX is a Wilder average of DX values, each needing a window of bars
+        return 2 * entry
+    if family == 'stoch':
+        # %D averages the last smooth_window %K values
+        return entry + params['smooth_window'] - 1
+    if family == 'macd':
+        # The signal line is an EMA of MACD values starting at the slow window
+        fast, slow, signal = entry
+        return slow + signal - 1
+    return max(np.atleast_1d(entry))
+
+
+def longest_lookback(indicators: dict = None) -> int:
+    """
+    Bars after which every configured warm-up period is over, counting
+    indicators smoothed from other windowed values (ADX, stoch %D, the MACD
+    signal) over both windows.
+    """
+    indicators = indicators if indicators is not None else load_indicator_config()
+    lookback = 1
+    for family in indicators:
+        if family in ('psar', 'lags'):
+            lengths = indicators[family].get('lags', [])
+        else:
+            lengths = [_lookback(family, entry, indicators[family]) for entry in parameter_sets(indicators, family)]
+        lookback = max([lookback] + [int(n) for n in lengths])
+    return lookback
+
+
+def indicator_columns(indicators: dict = None, stored: bool = False) -> list:
+    """
+    Every indicator column in table order (columns shared by entries appear
+    once). With ``stored`` only the columns kept in technical_indicators.
+    """
+    indicators = indicators if indicators is not None else load_indicator_config()
+    columns = {}
+    for family in indicators:
+        if stored and family in VIRTUAL_FAMILIES:
+            continue
+        for _, entry_columns in family_entries(indicators, family):
+            columns.update(dict.fromkeys(entry_columns))
+    return list(columns)
+
+
+def lag_columns(indicators: dict = None) -> list:
+    """The configured {column}_lag_{n} columns, served at read time."""
+    indicators = indicators if indicators is not None else load_indicator_config()
+    return [col for _, entry_columns in family_entries(indicators, 'lags') for col in entry_columns]
+
+
+def select_indicators(columns, indicators: dict = None) -> dict:
+    """
+    Restrict ``indicators`` to the parameter sets that produce ``columns``.
+    Raises ValueError for a column no family produces.
+    """
+    indicators = indicators if indicators is not None else load_indicator_config()
+    wanted = set(columns)
+    selected, found = {}, set()
+    for family, params in indicators.items():
+        entry_param, _ = FAMILIES[family]
+        entries = []
+        for entry, entry_columns in family_entries(indicators, family):
+            new = wanted.intersection(entry_columns) - found
+            if new:
+                entries.append(entry)
+                found.update(new)
+        if entries:
+            selected[family] = {**params, entry_param: entries}
+    missing = wanted - found
+    if missing:
+        raise ValueError(f"Unknown indicator columns: {sorted(missing)}")
+    return selected
+
+
+def technical_indicators_ddl(indicators: dict = None) -> str:
+    """CREATE TABLE statement for technical_indicators with one REAL column per stored indicator column."""
+    indicators = indicators if indicators is not None else load_indicator_config()
+    lines = [
+        "CREATE TABLE IF NOT EXISTS technical_indicators (",
+        "    id INTEGER PRIMARY KEY AUTOINCREMENT,",
+        "    symbol_id INTEGER NOT NULL,",
+        "    date DATE NOT NULL,",
+    ]
+    seen = set()
+    for family in indicators:
+        if family in VIRTUAL_FAMILIES:
+            continue
+        columns = list(dict.fromkeys(
+            col for _, entry_columns in family_entries(indicators, family)
+            for col in entry_columns if col not in seen
+        ))
+        if columns:
+            seen.update(columns)
+            lines += ["", f"    -- {family}", "    " + ", ".join(f"{col} REAL" for col in columns) + ","]
+    lines += [
+        "",
+        "    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,",
+        "    FOREIGN KEY (symbol_id) REFERENCES symbols(symbol_id),",
+        "    UNIQUE(symbol_id, date)",
+        ");",
+    ]
+    return "\n".join(lines)
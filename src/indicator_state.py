@@ -0,0 +1,136 @@
+"""
+Per-symbol indicator state for incremental updates.
+
+After a symbol's indicators are computed, its state keeps the last STATE_BARS
+raw bars (lookback for every windowed column) plus the final value of every
+recursive quantity (EMA, Wilder RSI/ATR/ADX sums, OBV, PSAR trend and extreme
+points). An update then only walks the new bars and reproduces what a full
+recompute over the whole history would give.
+"""
+import numpy as np
+import pandas as pd
+
+import indicator_kernels as k
+from indicator_registry import longest_lookback
+from technical_indicators import PANEL_BAR_COLUMNS, compute_panel_columns
+
+# Longest lookback of any configured indicator column (SMA/EMA 200). Once a
+# symbol has this many bars every warm-up period is over and recursions can be
+# resumed.
+STATE_BARS = longest_lookback()
+
+
+def _compute(frame: pd.DataFrame, states: dict, resume: bool, indicators: dict, state_bars: int):
+    """
+    Compute indicators for ``frame`` (lookback bars followed by new bars, with
+    an ``is_new`` flag) and return (new indicator rows, updated states).
+    """
+    frame = frame.sort_values(['symbol_id', 'date'], kind='stable').reset_index(drop=True)
+    codes, positions, lengths = k.build_panel(frame['symbol_id'])
+    symbol_ids = frame['symbol_id'].to_numpy()[np.concatenate(([0], np.cumsum(lengths)[:-1]))]
+    bars = {
+        col: k.to_panel(frame[col].to_numpy(dtype='float64'), codes, positions, lengths)
+        for col in PANEL_BAR_COLUMNS
+    }
+    state, start = None, 0
+    if resume:
+        names = states[symbol_ids[0]]['carry'].keys()
+        state = {name: np.array([states[s]['carry'][name] for s in symbol_ids]) for name in names}
+        start = state_bars
+    out, carry = compute_panel_columns(bars, state=state, start=start, indicators=indicators)
+
+    is_new = frame['is_new'].to_numpy()
+    result = frame.loc[is_new].drop(columns=['is_new']).reset_index(drop=True)
+    result['date'] = pd.to_datetime(result['date']).dt.strftime('%Y-%m-%d')
+    columns = pd.DataFrame({
+        name: k.from_panel(values, codes[is_new], positions[is_new]) for name, values in out.items()
+    })
+    indicators_df = pd.concat([result, columns], axis=1)
+
+    new_states = {}
+    last = lengths - 1
+    rows = np.arange(len(lengths))
+    final = {name: values[rows, last] for name, values in carry.items()}
+    dates = pd.to_datetime(frame['date']).dt.strftime('%Y-%m-%d').to_numpy()
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    for i, symbol_id in enumerate(symbol_ids):
+        previous = states.get(symbol_id)
+        tail = slice(max(offsets[i], offsets[i + 1] - state_bars), offsets[i + 1])
+        new_states[int(symbol_id)] = {
+            'n_bars': (previous['n_bars'] if previous else 0) + int(is_new[offsets[i]:offsets[i + 1]].sum()),
+            'last_date': dates[offsets[i + 1] - 1],
+            'dates': dates[tail].tolist(),
+            'bars': {col: frame[col].iloc[tail].astype(float).tolist() for col in PANEL_BAR_COLUMNS},
+            'carry': {name: float(values[i]) for name, values in final.items()},
+        }
+    return indicators_df, new_states
+
+
+def _lookback_frame(symbol_id: int, state: dict, template: pd.DataFrame) -> pd.DataFrame:
+    """Rebuild a symbol's buffered bars as price rows flagged as not new."""
+    frame = pd.DataFrame(state['bars'])
+    frame['date'] = pd.to_datetime(state['dates'])
+    frame['symbol_id'] = symbol_id
+    for col in template.columns:
+        if col not in frame.columns:
+            frame[col] = template[col].iloc[0] if col == 'symbol' else np.nan
+    frame['is_new'] = False
+    return frame
+
+
+def update_indicators(prices_df: pd.DataFrame, states: dict, indicators: dict = None):
+    """
+    Compute indicator rows for the bars in ``prices_df`` that come after each
+    symbol's state.
+
+    ``prices_df`` holds the new bars for symbols with state and the full history
+    for symbols without. Symbols with at least STATE_BARS bars of history resume
+    their recursive state, so the work is proportional to the number of new
+    bars; shorter histories are recomputed from their buffered bars, which then
+    cover the whole history. ``indicators`` is the indicator config (config.yaml
+    by default); the states must have been built with the same one.
+
+    Returns (indicators_df, states) with the states of every touched symbol.
+    """
+    state_bars = STATE_BARS if indicators is None else longest_lookback(indicators)
+    if prices_df.empty:
+        return prices_df.copy(), {}
+    resumed, recomputed = [], []
+    for symbol_id, group in prices_df.groupby('symbol_id', sort=False):
+        state = states.get(symbol_id)
+        if state is not None:
+            group = group[pd.to_datetime(group['date']) > pd.Timestamp(state['last_date'])]
+            if group.empty:
+                continue
+        group = group.assign(is_new=True)
+        if state is None:
+            recomputed.append(group)
+            continue
+        lookback = _lookback_frame(symbol_id, state, group)
+        combined = pd.concat([lookback, group], ignore_index=True)
+        if state['n_bars'] >= state_bars:
+            resumed.append(combined)
+        else:
+            recomputed.append(combined)
+
+    results, new_states = [], {}
+    for frames, resume in [(resumed, True), (recomputed, False)]:
+        if frames:
+            indicators_df, touched = _compute(pd.concat(frames, ignore_index=True), states, resume,
+                                              indicators, state_bars)
+            results.append(indicators_df)
+            new_states.update(touched)
+    if not results:
+        return prices_df.iloc[0:0].copy(), {}
+    result = pd.concat(results, ignore_index=True)
+    sort_col = 'symbol' if 'symbol' in result.columns else 'symbol_id'
+    result = result.sort_values([sort_col, 'date'], kind='stable').reset_index(drop=True)
+    return result, new_states
+
+
+def build_states(prices_df: pd.DataFrame, indicators: dict = None):
+    """
+    Compute indicators over each symbol's full history and return
+    (indicators_df, states), ready for later update_indicators calls.
+    """
+    return update_indicators(prices_df, {}, indicators)
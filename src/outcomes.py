@@ -1,20 +1,106 @@
+import numpy as np
 import pandas as pd
 
+import indicator_kernels as k
+from sessions import SESSION_CALENDAR, session_index, session_numbers
+
 LOOKAHEADS = [1, 3, 5, 7, 10, 14, 21, 28, 60, 90, 120]
+# Rows at the end of each symbol whose labels can still change as bars arrive;
+# horizons count sessions and a row is at least one session, so this is enough
+TRAILING_ROWS = max(LOOKAHEADS)
+# +/- return targets whose first hit is labelled, searched over TRAILING_ROWS sessions
+TARGETS = [0.02, 0.05, 0.10]
+
+def target_name(target: float) -> str:
+    """Column suffix of a return target, e.g. 0.05 -> '5pct'."""
+    return f"{round(target * 100):g}pct"
+
+OUTCOME_COLUMNS = (
+    [f'price_d{d}' for d in LOOKAHEADS]
+    + [f'returns_d{d}' for d in LOOKAHEADS]
+    + [f'max_gain_d{d}' for d in LOOKAHEADS]
+    + [f'max_drawdown_d{d}' for d in LOOKAHEADS]
+    + [f'bars_to_{side}_{target_name(t)}' for t in TARGETS for side in ('gain', 'loss')]
+)
+
+def path_labels(high, low, close, lengths) -> dict:
+    """
+    Excursion and first-hit labels (column -> panel) from (symbol, session)
+    panels of highs, lows and closes with ``lengths`` sessions per symbol.
+    Excursions that would run past a symbol's last session are NaN.
+    """
+    highs, lows = k.forward_extrema(high, LOOKAHEADS, np.fmax), k.forward_extrema(low, LOOKAHEADS, np.fmin)
+    sessions_ahead = lengths[:, None] - 1 - np.arange(close.shape[-1])
+    gains, drawdowns = {}, {}
+    for d in LOOKAHEADS:
+        complete = sessions_ahead >= d
+        gains[f'max_gain_d{d}'] = np.where(complete, highs[d] / close - 1, np.nan)
+        drawdowns[f'max_drawdown_d{d}'] = np.where(complete, lows[d] / close - 1, np.nan)
+    result = {**gains, **drawdowns}
+    # Every target is searched in one pass; the low reaching a loss is the
+    # negated low reaching the negated level
+    targets = np.asarray(TARGETS, dtype='float64')[:, None, None]
+    to_gain = k.first_reach(high, close * (1 + targets), TRAILING_ROWS)
+    to_loss = k.first_reach(-low, -close * (1 - targets), TRAILING_ROWS)
+    for target, gain, loss in zip(TARGETS, to_gain, to_loss):
+        result[f'bars_to_gain_{target_name(target)}'] = gain
+        result[f'bars_to_loss_{target_name(target)}'] = loss
+    return result
 
-def generate_outcomes(prices_df: pd.DataFrame) -> pd.DataFrame:
+def generate_outcomes(prices_df: pd.DataFrame, calendar: str = SESSION_CALENDAR) -> pd.DataFrame:
     """
-    For each symbol_id and date, compute look-ahead prices and returns.
+    For each symbol_id and date, compute look-ahead prices and returns, the
+    maximum gain (from the highs) and drawdown (from the lows) over the next
+    d sessions relative to the close, and the sessions until the high first
+    gains or the low first loses each of TARGETS.
+
+    Horizons count sessions of ``calendar``, not rows: every date is mapped
+    to its session number once and each symbol is laid out on a (symbol,
+    session) panel, so a missing bar is a NaN gap and the target of
+    ``price_d5`` is exactly five sessions later (NaN when that bar is
+    missing). Rows dated outside the calendar's sessions get NaN labels. The
+    path labels come from forward sparse-table kernels over the same panel,
+    so every horizon costs about one pass. Excursions need d sessions of
+    history ahead; a target not hit within TRAILING_ROWS sessions is NaN.
     Returns a DataFrame matching the outcomes table schema.
     """
-    outcomes = []
-    for symbol_id, group in prices_df.groupby('symbol_id'):
-        group = group.sort_values('date').copy()
+    df = prices_df.sort_values(['symbol_id', 'date'], kind='stable')
+    dates = pd.to_datetime(df['date'])
+    close = df['close'].to_numpy(dtype='float64')
+    result = {
+        'symbol_id': df['symbol_id'].to_numpy(),
         # Ensure date is string for consistency
-        group['date'] = pd.to_datetime(group['date']).dt.strftime('%Y-%m-%d')
-        for d in LOOKAHEADS:
-            group[f'price_d{d}'] = group['close'].shift(-d)
-            group[f'returns_d{d}'] = (group[f'price_d{d}'] - group['close']) / group['close']
-        outcomes.append(group[['symbol_id', 'date'] + [f'price_d{d}' for d in LOOKAHEADS] + [f'returns_d{d}' for d in LOOKAHEADS]])
-    result = pd.concat(outcomes)
-    return result.reset_index(drop=True)
\ No newline at end of file
+        'date': dates.dt.strftime('%Y-%m-%d').to_numpy(),
+    }
+
+    numbers = session_numbers(dates, session_index(dates.min(), dates.max(), calendar))
+    on_session = numbers >= 0
+    codes, _, _ = k.build_panel(df['symbol_id'])
+    codes, numbers = codes[on_session], numbers[on_session]
+    # Rows are date-sorted, so a symbol's first row holds its first session
+    first = np.full(codes.max() + 1 if len(codes) else 0, np.iinfo(np.int64).max)
+    np.minimum.at(first, codes, numbers)
+    positions = numbers - first[codes]
+    lengths = np.zeros(len(first), dtype=np.int64)
+    np.maximum.at(lengths, codes, positions + 1)
+
+    def labels(panel):
+        out = np.full(len(close), np.nan)
+        out[on_session] = k.from_panel(panel, codes, positions)
+        return out
+
+    high, low, base = (
+        k.to_panel(df[col].to_numpy(dtype='float64')[on_session], codes, positions, lengths)
+        for col in ('high', 'low', 'close')
+    )
+    returns = {}
+    for d in LOOKAHEADS:
+        ahead = np.full(base.shape, np.nan)
+        ahead[:, :-d] = base[:, d:]
+        future = labels(ahead)
+        result[f'price_d{d}'] = future
+        returns[f'returns_d{d}'] = (future - close) / close
+    result.update(returns)
+
+    result.update({name: labels(panel) for name, panel in path_labels(high, low, base, lengths).items()})
+    return pd.DataFrame(result)
@@ -0,0 +1,88 @@
+"""
+Process-pool execution for per-symbol generators.
+
+Symbols are split into shards and each shard runs in a worker process that
+opens its own database connection and reads only its own symbols. Results come
+back as compact NumPy column arrays, and the calling process stays the single
+writer.
+"""
+import math
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+# More shards than workers keeps the pool busy when symbols differ in history length
+SHARDS_PER_WORKER = 4
+# Keeps "symbol_id IN (...)" well below SQLite's bound-parameter limit
+MAX_SHARD_SIZE = 500
+
+
+def shard_symbol_ids(symbol_ids, workers: int) -> list:
+    """Split symbol ids into contiguous shards for ``workers`` processes."""
+    symbol_ids = list(symbol_ids)
+    if not symbol_ids:
+        return []
+    size = math.ceil(len(symbol_ids) / (max(workers, 1) * SHARDS_PER_WORKER))
+    size = max(1, min(size, MAX_SHARD_SIZE))
+    return [symbol_ids[i:i + size] for i in range(0, len(symbol_ids), size)]
+
+
+def frame_to_arrays(df: pd.DataFrame) -> dict:
+    """
+    Convert a frame to compact NumPy columns for transfer between processes.
+    Dates travel as datetime64[D], text as int32 codes plus their categories.
+    """
+    arrays = {}
+    for col in df.columns:
+        values = df[col]
+        if col == 'date':
+            as_text = not pd.api.types.is_datetime64_any_dtype(values)
+            arrays[col] = ('date', pd.to_datetime(values).to_numpy(dtype='datetime64[D]'), as_text)
+        elif pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+            arrays[col] = ('values', values.to_numpy(), None)
+        else:
+            codes, categories = pd.factorize(values)
+            arrays[col] = ('codes', codes.astype('int32'), np.asarray(categories, dtype=object))
+    return arrays
+
+
+def arrays_to_frame(arrays: dict) -> pd.DataFrame:
+    """Rebuild the frame produced by frame_to_arrays."""
+    columns = {}
+    for col, (kind, values, extra) in arrays.items():
+        if kind == 'date':
+            dates = pd.to_datetime(values)
+            columns[col] = dates.strftime('%Y-%m-%d') if extra else dates
+        elif kind == 'codes':
+            text = np.full(len(values), None, dtype=object)
+            text[values >= 0] = extra[values[values >= 0]]
+            columns[col] = text
+        else:
+            columns[col] = values
+    return pd.DataFrame(columns)
+
+
+def _run_shard(task, symbol_ids, kwargs):
+    result = task(symbol_ids, **kwargs)
+    if isinstance(result, tuple):
+        frame, extra = result
+    else:
+        frame, extra = result, None
+    return frame_to_arrays(frame), extra
+
+
+def run_sharded(task, symbol_ids, workers: int, **kwargs):
+    """
+    Run ``task(symbol_ids, **kwargs)`` for every shard across a process pool.
+
+    ``task`` must be a module-level function returning a DataFrame, or a
+    (DataFrame, extra) tuple. Yields (DataFrame, extra) per shard in completion
+    order so the caller can write each result as soon as it arrives.
+    """
+    shards = shard_symbol_ids(symbol_ids, workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_shard, task, shard, kwargs) for shard in shards]
+        for future in as_completed(futures):
+            arrays, extra = future.result()
+            yield arrays_to_frame(arrays), extra
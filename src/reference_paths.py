@@ -0,0 +1,147 @@
+"""
+Reference implementations of the paths the optimised code replaced.
+
+Each is the straightforward version (row-by-row inserts, batched to_sql,
+pandas merges, per-bar scans, per-level regeneration). The tests check the
+optimised paths against them and scripts/benchmark_*.py time both.
+"""
+import numpy as np
+import pandas as pd
+
+from outcomes import LOOKAHEADS, TARGETS, TRAILING_ROWS, target_name
+from signal_evaluation import EVALUATION_COLUMNS
+from technical_trade_signals import generate_trade_signals_fused
+
+# Columns of the hand-merged model input
+PRICE_COLUMNS = ['close', 'volume']
+CALENDAR_COLUMNS = ['dow_1', 'dow_5', 'month_1', 'quarter_4']
+# Threshold levels per family swept by sweep_signal_thresholds
+THRESHOLD_GRID = {
+    'rsi': [(buy, 100 - buy) for buy in range(10, 46, 5)],
+    'stoch': [(buy, 100 - buy) for buy in range(5, 46, 5)],
+    'cci': [(-level, level) for level in range(50, 251, 25)],
+    'adx': list(range(10, 51, 5)),
+}
+
+
+def insert_with_iterrows(db_manager, df, symbol):
+    """The previous insert_stock_prices body."""
+    symbol_id = db_manager.insert_symbol(symbol)
+    records = []
+    for date_idx, row in df.iterrows():
+        date_val = pd.to_datetime(date_idx).date() if isinstance(date_idx, str) else date_idx.date()
+        records.append((
+            symbol_id,
+            date_val,
+            float(row.get('Open', row.get('open', None))),
+            float(row.get('High', row.get('high', None))),
+            float(row.get('Low', row.get('low', None))),
+            float(row.get('Close', row.get('close', None))),
+            float(row.get('Adj Close', row.get('adj_close', row.get('Close', row.get('close', None))))),
+            int(row.get('Volume', row.get('volume', 0)))
+        ))
+    db_manager.connection.executemany("""
+        INSERT OR REPLACE INTO stock_prices
+        (symbol_id, date, open_price, high_price, low_price, close_price, adj_close, volume)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, records)
+    db_manager.connection.commit()
+
+
+def per_symbol(insert):
+    """Run a per-symbol price ``insert`` over every symbol of a long prices frame."""
+    def run(db_manager, prices_df):
+        for symbol, group in prices_df.groupby('symbol'):
+            insert(db_manager, group.set_index('date'), symbol)
+    return run
+
+
+def to_sql_batches(db_manager, table, df, rerun, batch_size=100):
+    """The previous insert_* write: delete the batch's keys on re-runs, then to_sql."""
+    cursor = db_manager.connection.cursor()
+    for start in range(0, len(df), batch_size):
+        batch = df.iloc[start:start + batch_size]
+        if rerun:
+            cursor.executemany(f"DELETE FROM {table} WHERE symbol_id = ? AND date = ?",
+                               batch[['symbol_id', 'date']].itertuples(index=False, name=None))
+            db_manager.connection.commit()
+        batch.to_sql(table, db_manager.connection, if_exists='append', index=False, method='multi')
+
+
+def calendar_frame(dates):
+    """Day-of-week, month and quarter dummies of the distinct ``dates``, as the calendar table holds them."""
+    dates = pd.Series(pd.to_datetime(dates.unique()))
+    features = {'date': dates}
+    features.update({f'dow_{n}': (dates.dt.dayofweek == n - 1).astype(int) for n in range(1, 8)})
+    features.update({f'month_{n}': (dates.dt.month == n).astype(int) for n in range(1, 13)})
+    features.update({f'quarter_{n}': (dates.dt.quarter == n).astype(int) for n in range(1, 5)})
+    return pd.DataFrame(features)
+
+
+def hand_merge(db_manager, symbol_ids, start_date, end_date, indicators, signals, outcomes):
+    """Read each table whole for the symbols, then merge and filter in pandas."""
+    frame = db_manager.get_all_stock_prices(symbol_ids)[['symbol', 'symbol_id', 'date'] + PRICE_COLUMNS]
+    keys = ['symbol_id', 'date']
+    frame = frame.merge(db_manager.get_all_technical_indicators(symbol_ids, lags=[])[keys + indicators],
+                        on=keys, how='left')
+    frame = frame.merge(db_manager.get_all_technical_trade_signals(symbol_ids)[keys + signals], on=keys, how='left')
+    frame = frame.merge(db_manager.get_all_outcomes(symbol_ids)[keys + outcomes], on=keys, how='left')
+    calendar = pd.read_sql_query("SELECT * FROM calendar", db_manager.connection)
+    calendar['date'] = pd.to_datetime(calendar['date'])
+    frame = frame.merge(calendar[['date'] + CALENDAR_COLUMNS], on='date', how='left')
+    frame = frame[(frame['date'] >= start_date) & (frame['date'] <= end_date)]
+    return frame.sort_values(keys).reset_index(drop=True)
+
+
+def path_labels_scan(prices_df):
+    """Path labels from one pass per bar ahead (O(rows x TRAILING_ROWS))."""
+    df = prices_df.sort_values(['symbol_id', 'date'], kind='stable')
+    symbol_ids = df['symbol_id'].to_numpy()
+    high, low, close = (df[col].to_numpy(dtype='float64') for col in ('high', 'low', 'close'))
+    n = len(close)
+    running_high, running_low = np.full(n, -np.inf), np.full(n, np.inf)
+    labels = {f'bars_to_{side}_{target_name(t)}': np.full(n, np.nan) for t in TARGETS for side in ('gain', 'loss')}
+    for j in range(1, TRAILING_ROWS + 1):
+        ahead = np.full(n, False)
+        ahead[:-j] = symbol_ids[j:] == symbol_ids[:-j]
+        future_high, future_low = np.full(n, np.nan), np.full(n, np.nan)
+        future_high[:-j], future_low[:-j] = high[j:], low[j:]
+        running_high = np.where(ahead, np.fmax(running_high, future_high), np.nan)
+        running_low = np.where(ahead, np.fmin(running_low, future_low), np.nan)
+        if j in LOOKAHEADS:
+            labels[f'max_gain_d{j}'] = running_high / close - 1
+            labels[f'max_drawdown_d{j}'] = running_low / close - 1
+        for t in TARGETS:
+            for side, hit in [('gain', ahead & (future_high >= close * (1 + t))),
+                              ('loss', ahead & (future_low <= close * (1 - t)))]:
+                label = labels[f'bars_to_{side}_{target_name(t)}']
+                label[np.isnan(label) & hit] = j
+    return pd.DataFrame(labels)
+
+
+def evaluate_with_merge(signals_df, outcomes_df):
+    """The merge / melt / groupby evaluation analysts run by hand."""
+    merged = signals_df.merge(outcomes_df, on=['symbol_id', 'date'])
+    names = [col for col in signals_df.columns if col not in ('symbol_id', 'date')]
+    long = merged.melt(id_vars=[f'returns_d{d}' for d in LOOKAHEADS], value_vars=names,
+                       var_name='signal', value_name='value')
+    frames = []
+    for d in LOOKAHEADS:
+        returns = long[f'returns_d{d}']
+        hit = np.where(long['value'] < 0, returns < 0, returns > 0) & returns.notna()
+        grouped = long.assign(ret=returns, hit=hit).groupby(['signal', 'value'])
+        frame = grouped.agg(count=('ret', 'count'), hits=('hit', 'sum'), return_sum=('ret', 'sum'),
+                            median_return=('ret', 'median')).reset_index()
+        frames.append(frame.assign(lookahead=d))
+    result = pd.concat(frames)
+    result['mean_return'] = result['return_sum'] / result['count'].where(result['count'] > 0)
+    result['hit_rate'] = result['hits'] / result['count'].where(result['count'] > 0)
+    return result[EVALUATION_COLUMNS]
+
+
+def regenerate(indicators_df, grid):
+    """One fused regeneration per level, as tuning without the sweep would need."""
+    return {
+        family: [generate_trade_signals_fused(indicators_df, thresholds={family: level}) for level in levels]
+        for family, levels in grid.items()
+    }
@@ -0,0 +1,58 @@
+"""
+Exchange session index for trading-day arithmetic.
+
+Dates are mapped once to integer session numbers from the exchange calendar,
+so "d sessions later" is an integer addition, and a missing bar in a
+symbol's history is a missing session instead of a shift of every later
+horizon.
+"""
+from functools import lru_cache
+
+import exchange_calendars as xcals
+import numpy as np
+import pandas as pd
+
+SESSION_CALENDAR = 'XNYS'
+
+
+@lru_cache(maxsize=None)
+def _sessions(start: str, end: str, calendar: str) -> np.ndarray:
+    # exchange_calendars needs start < end, so a one-day range is built a day
+    # longer and cut back
+    stop = (pd.Timestamp(end) + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+    try:
+        cal = xcals.get_calendar(calendar, start=start, end=stop)
+    except xcals.errors.NoSessionsError:
+        return np.array([], dtype='datetime64[D]')
+    sessions = cal.sessions.to_numpy(dtype='datetime64[D]')
+    return sessions[sessions <= np.datetime64(end)]
+
+
+def session_index(start, end, calendar: str = SESSION_CALENDAR) -> np.ndarray:
+    """Sessions of ``calendar`` from ``start`` to ``end`` as datetime64[D], built once per range."""
+    return _sessions(pd.Timestamp(start).strftime('%Y-%m-%d'), pd.Timestamp(end).strftime('%Y-%m-%d'), calendar)
+
+
+def session_numbers(dates, sessions: np.ndarray) -> np.ndarray:
+    """Position of each date in ``sessions``; -1 for dates that are not sessions."""
+    dates = np.asarray(pd.to_datetime(dates).to_numpy(dtype='datetime64[D]'))
+    numbers = np.searchsorted(sessions, dates)
+    found = numbers < len(sessions)
+    found[found] = sessions[numbers[found]] == dates[found]
+    return np.where(found, numbers, -1)
+
+
+def fetch_start(last_date, start_date, end_date, calendar: str = SESSION_CALENDAR):
+    """
+    First date to fetch a symbol's bars from: the day after its last stored
+    bar ``last_date``, or ``start_date`` for a symbol without one (None/NaT).
+    ``end_date`` is exclusive, as yfinance's is, so only sessions before it
+    have completed bars. None when none of those comes after the last bar.
+    """
+    start = pd.Timestamp(start_date)
+    if last_date is not None and not pd.isna(last_date):
+        start = pd.Timestamp(last_date) + pd.Timedelta(days=1)
+    sessions = session_index(start_date, pd.Timestamp(end_date).normalize() - pd.Timedelta(days=1), calendar)
+    if not len(sessions) or start > pd.Timestamp(sessions[-1]):
+        return None
+    return start
@@ -0,0 +1,150 @@
+"""
+Signal versus outcome evaluation.
+
+Trade signals and outcomes are aligned on (symbol_id, date) with a merge of
+their sorted keys, then every signal, value (-1, 0, 1) and lookahead is
+summarised in one pass: row count, hits (forward return in the signal's
+direction; up moves for 0, as a baseline), and the mean and median forward
+return. Counts, hits and return sums add up, so rows for new dates can be
+merged into a stored summary; medians cannot and are refreshed by a full run.
+"""
+import numpy as np
+import pandas as pd
+
+from outcomes import LOOKAHEADS
+from signal_events import signal_columns
+
+SIGNAL_VALUES = (-1, 0, 1)
+EVALUATION_COLUMNS = [
+    'signal', 'value', 'lookahead', 'count', 'hits', 'return_sum', 'mean_return', 'median_return', 'hit_rate'
+]
+# Rows per one-hot block when summing returns
+CHUNK_ROWS = 100_000
+
+
+def _row_keys(df: pd.DataFrame) -> np.ndarray:
+    """(symbol_id, date) packed into one sortable int64 per row."""
+    days = pd.to_datetime(df['date']).to_numpy(dtype='datetime64[D]').astype('int64')
+    return (df['symbol_id'].to_numpy(dtype='int64') << 32) + days
+
+
+def align_rows(signals_df: pd.DataFrame, outcomes_df: pd.DataFrame):
+    """
+    Positions of the signal rows and outcome rows sharing a (symbol_id, date),
+    found by binary search in the sorted outcome keys. Duplicate outcome rows
+    resolve to the first.
+    """
+    signal_keys, outcome_keys = _row_keys(signals_df), _row_keys(outcomes_df)
+    order = np.argsort(outcome_keys, kind='stable')
+    sorted_keys = outcome_keys[order]
+    found = np.searchsorted(sorted_keys, signal_keys)
+    matched = found < len(sorted_keys)
+    matched[matched] = sorted_keys[found[matched]] == signal_keys[matched]
+    return np.flatnonzero(matched), order[found[matched]]
+
+
+def _group_sums(groups: np.ndarray, n_groups: int, values: np.ndarray) -> np.ndarray:
+    """Sum the rows of ``values`` per group, as one-hot matrix products over row blocks."""
+    total = np.zeros((n_groups, values.shape[1]))
+    for start in range(0, len(groups), CHUNK_ROWS):
+        block = groups[start:start + CHUNK_ROWS]
+        onehot = np.zeros((len(block), n_groups))
+        onehot[np.arange(len(block))[:, None], block] = 1
+        total += onehot.T @ values[start:start + CHUNK_ROWS]
+    return total
+
+
+def evaluate_signals(signals_df: pd.DataFrame, outcomes_df: pd.DataFrame, lookaheads: list = None,
+                     since: pd.DataFrame = None, median: bool = True):
+    """
+    Summarise the forward returns of every signal value in ``signals_df`` (a
+    wide technical_trade_signals frame) against ``outcomes_df`` (returns_d{n}
+    columns) for each lookahead.
+
+    ``since`` (symbol_id, lookahead, through_date), as returned with a
+    previous summary, skips the rows that summary already counted. Returns
+    (summary, watermarks): summary has EVALUATION_COLUMNS, watermarks the
+    last counted date per symbol and lookahead.
+    """
+    lookaheads = list(LOOKAHEADS if lookaheads is None else lookaheads)
+    names = signal_columns(signals_df)
+    signal_rows, outcome_rows = align_rows(signals_df, outcomes_df)
+    values = signals_df[names].to_numpy(dtype='int8')[signal_rows]
+    returns = outcomes_df[[f'returns_d{d}' for d in lookaheads]].to_numpy(dtype='float64')[outcome_rows]
+    symbol_ids = signals_df['symbol_id'].to_numpy(dtype='int64')[signal_rows]
+    dates = pd.to_datetime(signals_df['date']).to_numpy(dtype='datetime64[D]')[signal_rows]
+
+    if since is not None and not since.empty:
+        # Rows at or before a (symbol, lookahead) watermark were counted already
+        for col, d in enumerate(lookaheads):
+            through = since[since['lookahead'] == d]
+            through = pd.Series(pd.to_datetime(through['through_date']).to_numpy(dtype='datetime64[D]'),
+                                index=through['symbol_id'].to_numpy())
+            limit = through.reindex(symbol_ids).to_numpy(dtype='datetime64[D]')
+            returns[~np.isnat(limit) & (dates <= limit), col] = np.nan
+
+    # One group per (signal, value); valid/up/down rows and returns summed per group
+    n_values = len(SIGNAL_VALUES)
+    groups = values - SIGNAL_VALUES[0] + n_values * np.arange(len(names))
+    valid = ~np.isnan(returns)
+    filled = np.where(valid, returns, 0.0)
+    sums = _group_sums(groups, n_values * len(names), np.hstack([valid, filled > 0, filled < 0, filled]))
+    count, up, down, return_sum = np.split(sums, 4, axis=1)
+    direction = np.tile(SIGNAL_VALUES, len(names))[:, None]
+    hits = np.where(direction < 0, down, up)
+
+    medians = np.full(count.shape, np.nan)
+    if median:
+        # Rank each lookahead's returns once (NaN last); the middle members of
+        # a value's rows in that ranking are its median returns
+        by_signal = np.ascontiguousarray(values.T)
+        for lag in range(len(lookaheads)):
+            ranked = np.argsort(returns[:, lag])
+            ordered, ranked_values = returns[ranked, lag], by_signal[:, ranked]
+            for col in range(len(names)):
+                for i, value in enumerate(SIGNAL_VALUES):
+                    group = col * n_values + i
+                    n = int(count[group, lag])
+                    if n:
+                        members = np.flatnonzero(ranked_values[col] == value)
+                        medians[group, lag] = (ordered[members[(n - 1) // 2]] + ordered[members[n // 2]]) / 2
+
+    n_groups = len(names) * n_values
+    summary = pd.DataFrame({
+        'signal': np.repeat(names, n_values * len(lookaheads)),
+        'value': np.repeat(np.tile(SIGNAL_VALUES, len(names)), len(lookaheads)),
+        'lookahead': np.tile(lookaheads, n_groups),
+        'count': count.ravel().astype('int64'),
+        'hits': hits.ravel().astype('int64'),
+        'return_sum': return_sum.ravel(),
+        'median_return': medians.ravel(),
+    })
+    summary = _with_rates(summary)
+
+    watermarks = []
+    for col, d in enumerate(lookaheads):
+        last = pd.Series(dates[valid[:, col]]).groupby(symbol_ids[valid[:, col]]).max()
+        watermarks.append(pd.DataFrame({'symbol_id': last.index, 'lookahead': d, 'through_date': last.to_numpy()}))
+    return summary, pd.concat(watermarks, ignore_index=True)
+
+
+def _with_rates(summary: pd.DataFrame) -> pd.DataFrame:
+    count = summary['count'].where(summary['count'] > 0)
+    summary = summary.assign(mean_return=summary['return_sum'] / count, hit_rate=summary['hits'] / count)
+    return summary[EVALUATION_COLUMNS]
+
+
+def merge_evaluations(stored: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add the counts, hits and return sums of ``new`` rows into ``stored``.
+    Medians are kept from ``stored`` where it has rows (a full run refreshes them).
+    """
+    keys = ['signal', 'value', 'lookahead']
+    merged = new.merge(stored, on=keys, how='outer', suffixes=('', '_stored'))
+    for col in ['count', 'hits', 'return_sum']:
+        merged[col] = merged[col].fillna(0) + merged[f'{col}_stored'].fillna(0)
+    merged['count'] = merged['count'].astype('int64')
+    merged['hits'] = merged['hits'].astype('int64')
+    merged['median_return'] = merged['median_return_stored'].where(
+        merged['count_stored'].fillna(0) > 0, merged['median_return'])
+    return _with_rates(merged).sort_values(keys, ignore_index=True)
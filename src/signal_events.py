@@ -0,0 +1,167 @@
+"""
+Sparse event form of trade signals.
+
+Instead of one wide row of signal columns per (symbol, date), a signal is
+kept as runs: one (symbol_id, signal_id, value, date, end_date) event per
+stretch of consecutive bars over which it holds the same non-zero value,
+with signal names numbered in the signal_definitions table. State-like
+signals (PSAR, ADX, the bands) hold their value for many bars, so a run
+replaces dozens of rows. The signal_events table stores a run as integers:
+its first day as a day number (days since 1970-01-01) and the days to its
+last bar, keyed by (symbol_id, signal_id, start). A signal that changes
+value on most bars gains nothing from runs and is kept in the wide layout
+instead (wide_layout).
+"""
+import numpy as np
+import pandas as pd
+
+from frame_dtypes import SIGNAL_DTYPE
+
+EVENT_COLUMNS = ['symbol_id', 'date', 'end_date', 'signal_id', 'value']
+# signal_events columns of a run
+RUN_COLUMNS = ['symbol_id', 'signal_id', 'start', 'days', 'value']
+# Signals with more runs than this fraction of their bars stay in the wide layout
+DENSE_RUN_FRACTION = 0.5
+
+
+def signal_columns(signals_df: pd.DataFrame) -> list:
+    """The signal columns of a wide signals frame (everything but keys and bookkeeping)."""
+    return [col for col in signals_df.columns if col not in ('id', 'symbol', 'symbol_id', 'date', 'created_at')]
+
+
+def signals_to_events(signals_df: pd.DataFrame, signal_ids: dict) -> pd.DataFrame:
+    """
+    Runs of non-zero values of the wide ``signals_df`` (symbol_id, date and
+    one column per signal, rows grouped by symbol in date order) as event
+    rows; ``signal_ids`` maps each signal column to its id.
+    """
+    names = signal_columns(signals_df)
+    matrix = signals_df[names].to_numpy()
+    symbols = signals_df['symbol_id'].to_numpy()
+    dates = signals_df['date'].to_numpy()
+    first = np.ones(len(symbols), dtype=bool)
+    first[1:] = symbols[1:] != symbols[:-1]
+    last = np.roll(first, -1)
+    changed = np.ones(matrix.shape, dtype=bool)
+    changed[1:] = matrix[1:] != matrix[:-1]
+    non_zero = matrix != 0
+    starts = non_zero & (changed | first[:, None])
+    ends = np.zeros(matrix.shape, dtype=bool)
+    ends[:-1] = changed[1:]
+    ends = non_zero & (ends | last[:, None])
+    # Scanning signal by signal, the n-th start and the n-th end belong to the same run
+    cols, start_rows = np.nonzero(starts.T)
+    _, end_rows = np.nonzero(ends.T)
+    return pd.DataFrame({
+        'symbol_id': symbols[start_rows],
+        'date': dates[start_rows],
+        'end_date': dates[end_rows],
+        'signal_id': np.array([signal_ids[name] for name in names], dtype='int64')[cols],
+        'value': matrix[start_rows, cols].astype(SIGNAL_DTYPE),
+    })
+
+
+def day_numbers(dates) -> np.ndarray:
+    """Days since 1970-01-01 of text or datetime dates."""
+    return pd.to_datetime(pd.Series(dates)).to_numpy().astype('datetime64[D]').astype('int64')
+
+
+def day_dates(numbers) -> np.ndarray:
+    """'YYYY-MM-DD' text of day numbers."""
+    return np.datetime_as_string(np.asarray(numbers, dtype='int64').astype('datetime64[D]'))
+
+
+def events_to_runs(events_df: pd.DataFrame) -> pd.DataFrame:
+    """Event rows as signal_events rows (RUN_COLUMNS)."""
+    start = day_numbers(events_df['date'])
+    return pd.DataFrame({
+        'symbol_id': events_df['symbol_id'].to_numpy(dtype='int64'),
+        'signal_id': events_df['signal_id'].to_numpy(dtype='int64'),
+        'start': start,
+        'days': day_numbers(events_df['end_date']) - start,
+        'value': events_df['value'].to_numpy(dtype='int64'),
+    })
+
+
+def runs_to_events(runs_df: pd.DataFrame) -> pd.DataFrame:
+    """signal_events rows as event rows (EVENT_COLUMNS), dates as text."""
+    start = runs_df['start'].to_numpy(dtype='int64')
+    return pd.DataFrame({
+        'symbol_id': runs_df['symbol_id'].to_numpy(dtype='int64'),
+        'date': day_dates(start),
+        'end_date': day_dates(start + runs_df['days'].to_numpy(dtype='int64')),
+        'signal_id': runs_df['signal_id'].to_numpy(dtype='int64'),
+        'value': runs_df['value'].to_numpy().astype(SIGNAL_DTYPE),
+    })
+
+
+def wide_layout(events_df: pd.DataFrame, signal_ids: dict, n_bars: int) -> list:
+    """
+    The signals of ``signal_ids`` whose runs in ``events_df`` (over
+    ``n_bars`` bars) number more than DENSE_RUN_FRACTION of the bars.
+    """
+    runs = events_df['signal_id'].value_counts()
+    return [name for name, signal_id in signal_ids.items()
+            if runs.get(signal_id, 0) > DENSE_RUN_FRACTION * n_bars]
+
+
+def _bar_keys(symbol_ids, dates) -> np.ndarray:
+    """One sortable integer per (symbol_id, date)."""
+    return np.asarray(symbol_ids, dtype='int64') * 1_000_000 + day_numbers(dates)
+
+
+def events_to_signals(events_df: pd.DataFrame, keys_df: pd.DataFrame, signal_ids: dict,
+                      compact: bool = False) -> pd.DataFrame:
+    """
+    Densify events back to the wide layout: one row per (symbol_id, date) of
+    ``keys_df`` (grouped by symbol in date order) and one column per signal
+    of ``signal_ids``, holding each run's value from its date to its
+    end_date and 0 elsewhere. Events of other signals are ignored.
+    """
+    keys = keys_df[['symbol_id', 'date']].reset_index(drop=True)
+    names = list(signal_ids)
+    # Each run adds its value at its first bar and takes it off after its last
+    changes = np.zeros((len(keys) + 1, len(names)), dtype='int64')
+    if not events_df.empty and len(keys):
+        bars = _bar_keys(keys['symbol_id'], keys['date'])
+        first = np.searchsorted(bars, _bar_keys(events_df['symbol_id'], events_df['date']), side='left')
+        stop = np.searchsorted(bars, _bar_keys(events_df['symbol_id'], events_df['end_date']), side='right')
+        cols = pd.Index([signal_ids[name] for name in names]).get_indexer(events_df['signal_id'])
+        found = (cols >= 0) & (first < stop)
+        values = events_df['value'].to_numpy(dtype='int64')[found]
+        np.add.at(changes, (first[found], cols[found]), values)
+        np.add.at(changes, (stop[found], cols[found]), -values)
+    matrix = np.cumsum(changes[:-1], axis=0).astype(SIGNAL_DTYPE if compact else 'int64')
+    return pd.concat([keys, pd.DataFrame(matrix, columns=names)], axis=1)
+
+
+def replace_events(stored_df: pd.DataFrame, events_df: pd.DataFrame, bounds_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The events to store in place of ``stored_df`` once ``events_df`` is
+    written. ``bounds_df`` holds each symbol's range of new bars (first,
+    last) and the stored bars next to it (before, after); ``stored_df``
+    holds every stored run reaching from ``before`` to ``after``. Stored runs
+    are cut back to the bars outside the range, and a run that continues
+    across either end of the range is joined with the run it continues.
+    """
+    bounds = bounds_df.set_index('symbol_id')
+    stored = stored_df.join(bounds, on='symbol_id')
+    left = stored[stored['date'] < stored['first']]
+    left = left.assign(end_date=left['end_date'].where(left['end_date'] < left['first'], left['before']))
+    right = stored[stored['end_date'] > stored['last']]
+    right = right.assign(date=right['date'].where(right['date'] > right['last'], right['after']))
+    runs = pd.concat([left[EVENT_COLUMNS], events_df[EVENT_COLUMNS], right[EVENT_COLUMNS]], ignore_index=True)
+    runs = runs.dropna(subset=['date', 'end_date']).join(bounds, on='symbol_id')
+    runs = runs.sort_values(['symbol_id', 'signal_id', 'date'], kind='stable', ignore_index=True)
+
+    previous = runs.shift()
+    continues = (
+        (runs[['symbol_id', 'signal_id', 'value']] == previous[['symbol_id', 'signal_id', 'value']]).all(axis=1)
+        & (((previous['end_date'] == runs['before']) & (runs['date'] == runs['first']))
+           | ((previous['end_date'] == runs['last']) & (runs['date'] == runs['after'])))
+    )
+    # Joined runs are adjacent rows: keep the first of each and the end of the last
+    starts = ~continues.to_numpy()
+    merged = runs.loc[starts, EVENT_COLUMNS].reset_index(drop=True)
+    merged['end_date'] = runs['end_date'].to_numpy()[np.r_[starts[1:], True]]
+    return merged.astype({'symbol_id': 'int64', 'signal_id': 'int64', 'value': SIGNAL_DTYPE})
@@ -0,0 +1,31 @@
+"""
+Synthetic price universes for the benchmarks and tests.
+
+Random-walk OHLCV bars on real exchange sessions, so every path (indicators,
+outcomes over session horizons, the database writers) can be timed and
+checked without downloading prices.
+"""
+import numpy as np
+import pandas as pd
+
+from sessions import session_index
+
+
+def synthetic_prices(n_symbols, n_bars, seed=0):
+    """Random-walk OHLCV bars for n_symbols symbols, one row per symbol and XNYS session."""
+    rng = np.random.default_rng(seed)
+    dates = pd.DatetimeIndex(session_index('2019-01-01', pd.Timestamp('2019-01-01') + pd.DateOffset(days=n_bars * 2))[:n_bars])
+    close = np.abs(100 + np.cumsum(rng.normal(0, 1, (n_symbols, n_bars)), axis=1)) + 1
+    high = close + rng.uniform(0, 2, close.shape)
+    low = np.maximum(close - rng.uniform(0, 2, close.shape), 0.5)
+    return pd.DataFrame({
+        'symbol': np.repeat([f'S{i:04d}' for i in range(n_symbols)], n_bars),
+        'symbol_id': np.repeat(np.arange(1, n_symbols + 1), n_bars),
+        'date': np.tile(dates, n_symbols),
+        'open': ((high + low) / 2).ravel(),
+        'high': high.ravel(),
+        'low': low.ravel(),
+        'close': close.ravel(),
+        'adj_close': close.ravel(),
+        'volume': rng.integers(100_000, 10_000_000, close.shape).ravel(),
+    })
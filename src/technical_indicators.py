@@ -1,75 +1,405 @@
+from functools import partial
+
+import numpy as np
 import pandas as pd
 import ta
 
-def generate_indicators(prices_df: pd.DataFrame) -> pd.DataFrame:
+import indicator_kernels as k
+from frame_dtypes import INDICATOR_DTYPE, compact_frame
+from indicator_registry import load_indicator_config, parameter_sets, psar_key, select_indicators
+
+def generate_indicators(prices_df: pd.DataFrame, indicators: dict = None) -> pd.DataFrame:
     """
     Calculate technical indicators for all symbols and dates using ta.
+    ``indicators`` defaults to the families configured in config.yaml.
     Returns a DataFrame matching the technical_indicators table schema.
     """
-    indicators = []
+    indicators = indicators if indicators is not None else load_indicator_config()
+    params = partial(parameter_sets, indicators)
+    indicators_list = []
     for symbol, group in prices_df.groupby('symbol'):
-        group = group.sort_values('date').copy()
+        # ta's PSAR writes one branch by label, so it needs a 0-based index
+        group = group.sort_values('date').reset_index(drop=True)
         # Ensure date is string for consistency
         group['date'] = pd.to_datetime(group['date']).dt.strftime('%Y-%m-%d')
         # RSI
-        for w in [7, 14, 30, 50]:
+        for w in params('rsi'):
             group[f'rsi_{w}'] = ta.momentum.RSIIndicator(group['close'], window=w).rsi()
         # SMA
-        for w in [5, 10, 20, 50, 100, 200]:
+        for w in params('sma'):
             group[f'sma_{w}'] = ta.trend.SMAIndicator(group['close'], window=w).sma_indicator()
         # EMA
-        for w in [5, 10, 20, 50, 100, 200]:
+        for w in params('ema'):
             group[f'ema_{w}'] = ta.trend.EMAIndicator(group['close'], window=w).ema_indicator()
         # MACD
-        macd_configs = [(6, 13, 5), (12, 26, 9), (19, 39, 9)]
-        for fast, slow, sig in macd_configs:
+        for fast, slow, sig in params('macd'):
             macd = ta.trend.MACD(group['close'], window_fast=fast, window_slow=slow, window_sign=sig)
             group[f'macd_{fast}_{slow}_{sig}'] = macd.macd()
             group[f'macd_signal_{fast}_{slow}_{sig}'] = macd.macd_signal()
             group[f'macd_hist_{fast}_{slow}_{sig}'] = macd.macd_diff()
         # Bollinger Bands
-        for w in [10, 14, 20, 50]:
+        for w in params('bb'):
             bb = ta.volatility.BollingerBands(group['close'], window=w)
             group[f'bb_upper_{w}'] = bb.bollinger_hband()
             group[f'bb_middle_{w}'] = bb.bollinger_mavg()
             group[f'bb_lower_{w}'] = bb.bollinger_lband()
         # Stochastic Oscillator
-        for w in [7, 10, 14, 21, 30]:
-            stoch = ta.momentum.StochasticOscillator(group['high'], group['low'], group['close'], window=w, smooth_window=3)
-            group[f'stoch_k_{w}_3'] = stoch.stoch()
-            group[f'stoch_d_{w}_3'] = stoch.stoch_signal()
+        for w in params('stoch'):
+            smooth = indicators['stoch']['smooth_window']
+            stoch = ta.momentum.StochasticOscillator(group['high'], group['low'], group['close'], window=w, smooth_window=smooth)
+            group[f'stoch_k_{w}_{smooth}'] = stoch.stoch()
+            group[f'stoch_d_{w}_{smooth}'] = stoch.stoch_signal()
         # CCI
-        for w in [10, 14, 20, 40]:
+        for w in params('cci'):
             group[f'cci_{w}'] = ta.trend.CCIIndicator(group['high'], group['low'], group['close'], window=w).cci()
         # ATR
-        for w in [7, 14, 21, 30]:
+        for w in params('atr'):
             group[f'atr_{w}'] = ta.volatility.AverageTrueRange(group['high'], group['low'], group['close'], window=w).average_true_range()
         # OBV
-        group['obv'] = ta.volume.OnBalanceVolumeIndicator(group['close'], group['volume']).on_balance_volume()
-        for w in [10, 20, 50]:
+        if params('obv'):
+            group['obv'] = ta.volume.OnBalanceVolumeIndicator(group['close'], group['volume']).on_balance_volume()
+        for w in params('obv'):
             group[f'obv_{w}'] = group['obv'].rolling(w).mean()
         # Ichimoku (standard and alternatives)
-        ichimoku_configs = [(9, 26, 52), (7, 22, 52), (12, 33, 52)]
-        for conv, base, span_b in ichimoku_configs:
+        for conv, base, span_b in params('ichimoku'):
             ichimoku = ta.trend.IchimokuIndicator(group['high'], group['low'], window1=conv, window2=base, window3=span_b)
             group[f'ichimoku_conv_{conv}'] = ichimoku.ichimoku_conversion_line()
             group[f'ichimoku_base_{base}'] = ichimoku.ichimoku_base_line()
             group[f'ichimoku_spanb_{span_b}'] = ichimoku.ichimoku_b()
         # Donchian Channel
-        for w in [10, 20, 50]:
+        for w in params('donchian'):
             group[f'donchian_high_{w}'] = group['high'].rolling(window=w).max()
             group[f'donchian_low_{w}'] = group['low'].rolling(window=w).min()
         # ADX
-        for w in [7, 14, 21, 30]:
+        for w in params('adx'):
             group[f'adx_{w}'] = ta.trend.ADXIndicator(group['high'], group['low'], group['close'], window=w).adx()
         # Parabolic SAR (multiple parameter sets for signals)
-        group['psar_001_02'] = ta.trend.PSARIndicator(group['high'], group['low'], group['close'], step=0.01, max_step=0.2).psar()
-        group['psar_002_02'] = ta.trend.PSARIndicator(group['high'], group['low'], group['close'], step=0.02, max_step=0.2).psar()
-        group['psar_004_02'] = ta.trend.PSARIndicator(group['high'], group['low'], group['close'], step=0.04, max_step=0.2).psar()
+        for step in params('psar'):
+            max_step = indicators['psar']['max_step']
+            group[f'psar_{psar_key(step, max_step)}'] = ta.trend.PSARIndicator(
+                group['high'], group['low'], group['close'], step=step, max_step=max_step
+            ).psar()
         # Lags
-        for col in ['close', 'high', 'low', 'open', 'volume']:
-            for lag in [1, 2, 3, 5, 10, 20]:
+        for col in params('lags'):
+            for lag in indicators['lags']['lags']:
                 group[f'{col}_lag_{lag}'] = group[col].shift(lag)
-        indicators.append(group)
-    result = pd.concat(indicators)
+        indicators_list.append(group)
+    result = pd.concat(indicators_list)
     return result.reset_index(drop=True)
+
+
+PANEL_BAR_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def channel_windows(indicators: dict) -> list:
+    """
+    High/low windows of every channel-style family, computed together in one
+    rolling_extrema sweep. Ichimoku span B fills in from the first bar (ta uses
+    min_periods=0 there).
+    """
+    windows = set(parameter_sets(indicators, 'stoch')) | set(parameter_sets(indicators, 'donchian'))
+    spans = set()
+    for conv, base, span_b in parameter_sets(indicators, 'ichimoku'):
+        windows.update((conv, base))
+        spans.add((span_b, 1))
+    return sorted(windows) + sorted(spans)
+
+
+# Shared intermediates of the panel engine: name -> (dependencies, function).
+# Each is computed at most once per IndicatorGraph, however many indicator
+# families read it, and dropped once its last consumer is done.
+INTERMEDIATES = {}
+# Intermediates each indicator family of compute_panel_columns reads
+FAMILY_INPUTS = {
+    'rsi': ('price_moves',),
+    'sma': ('close_sums',),
+    'bb': ('close_sums',),
+    'stoch': ('channel_extrema',),
+    'cci': ('typical_price', 'typical_price_sums'),
+    'atr': ('true_range',),
+    'obv': ('obv_increments',),
+    'ichimoku': ('channel_extrema',),
+    'donchian': ('channel_extrema',),
+    'adx': ('directional_movement',),
+}
+
+
+def intermediate(name, *deps):
+    """Register a shared intermediate computed from the named dependencies."""
+    def register(fn):
+        INTERMEDIATES[name] = (deps, fn)
+        return fn
+    return register
+
+
+@intermediate('prev_close', 'close')
+def _prev_close(close):
+    return k.shift(close, 1)
+
+
+@intermediate('true_range', 'high', 'low', 'prev_close')
+def _true_range(high, low, prev_close):
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+@intermediate('typical_price', 'high', 'low', 'close')
+def _typical_price(high, low, close):
+    return (high + low + close) / 3.0
+
+
+@intermediate('close_sums', 'close')
+def _close_sums(close):
+    return k.PrefixSums(close, squares=True)
+
+
+@intermediate('typical_price_sums', 'typical_price')
+def _typical_price_sums(typical_price):
+    return k.PrefixSums(typical_price)
+
+
+@intermediate('price_moves', 'close', 'prev_close')
+def _price_moves(close, prev_close):
+    diff = close - prev_close
+    return np.stack([np.where(diff > 0, diff, 0.0), np.where(diff < 0, -diff, 0.0)])
+
+
+@intermediate('directional_movement', 'high', 'low', 'true_range')
+def _directional_movement(high, low, true_range):
+    return k.directional_movement(high, low, true_range)
+
+
+@intermediate('obv_increments', 'close', 'prev_close', 'volume')
+def _obv_increments(close, prev_close, volume):
+    return np.where(close < prev_close, -volume, volume)
+
+
+@intermediate('channel_extrema', 'high', 'low', 'channel_windows')
+def _channel_extrema(high, low, windows):
+    return k.rolling_extrema(high, windows, np.fmax), k.rolling_extrema(low, windows, np.fmin)
+
+
+class IndicatorGraph:
+    """
+    Lazily evaluates INTERMEDIATES over one set of bar panels, computing each
+    at most once and resolving its dependencies first. ``indicators`` (the
+    configured families by default) decides which channel windows are needed
+    and which families consume each intermediate: an intermediate is dropped
+    once the families reading it are released and the intermediates built
+    from it are computed, so only the ones still ahead stay in memory.
+    """
+
+    def __init__(self, bars: dict, indicators: dict = None):
+        indicators = indicators if indicators is not None else load_indicator_config()
+        self._values = {**bars, 'channel_windows': channel_windows(indicators)}
+        self.evaluated = []
+        self._families = {family for family in FAMILY_INPUTS if parameter_sets(indicators, family)}
+        self._consumers = {}
+        pending = [name for family in self._families for name in FAMILY_INPUTS[family]]
+        while pending:
+            name = pending.pop()
+            self._consumers[name] = self._consumers.get(name, 0) + 1
+            if self._consumers[name] == 1:
+                pending.extend(dep for dep in INTERMEDIATES[name][0] if dep in INTERMEDIATES)
+
+    def __getitem__(self, name):
+        if name not in self._values:
+            deps, fn = INTERMEDIATES[name]
+            self._values[name] = fn(*(self[dep] for dep in deps))
+            self.evaluated.append(name)
+            self._consumed(deps)
+        return self._values[name]
+
+    def release(self, family: str):
+        """Mark ``family`` done with its FAMILY_INPUTS, dropping those nothing else reads."""
+        if family in self._families:
+            self._families.discard(family)
+            self._consumed(FAMILY_INPUTS[family])
+
+    def _consumed(self, names):
+        for name in names:
+            if name in self._consumers:
+                self._consumers[name] -= 1
+                if self._consumers[name] == 0:
+                    del self._consumers[name]
+                    self._values.pop(name, None)
+
+
+def _channel(g: IndicatorGraph, window):
+    """Rolling (highest high, lowest low) of one channel window, without holding on to the others."""
+    highest, lowest = g['channel_extrema']
+    return highest[window], lowest[window]
+
+
+def compute_panel_columns(bars: dict, state: dict = None, start: int = 0, graph: IndicatorGraph = None,
+                          indicators: dict = None):
+    """
+    Compute the indicator columns of ``indicators`` (every configured family by
+    default) on (symbol, bar) panels.
+
+    ``bars`` maps each of PANEL_BAR_COLUMNS to a panel. Returns (columns, carry):
+    panels for the output columns and for the recursive quantities (EMA, Wilder
+    and PSAR state) a later incremental run resumes from. When ``state`` is
+    given (per-row arrays of those quantities at bar ``start - 1``), recursions
+    resume at ``start`` and earlier bars only serve as window lookback.
+    """
+    indicators = indicators if indicators is not None else load_indicator_config()
+    params = partial(parameter_sets, indicators)
+    g = graph if graph is not None else IndicatorGraph(bars, indicators)
+    close, high, low = g['close'], g['high'], g['low']
+    resume = state is not None
+    out, carry = {}, {}
+
+    def init(*names):
+        return np.stack([state[name] for name in names]) if resume else None
+
+    # RSI: gains and losses for every window advance in one pass
+    rsi_windows = params('rsi')
+    if rsi_windows:
+        names = [[f'rsi_up_{w}', f'rsi_down_{w}'] for w in rsi_windows]
+        rsi_init = np.stack([init(*pair) for pair in names]) if resume else None
+        averages = k.ewm(g['price_moves'], [1 / w for w in rsi_windows], min_periods=rsi_windows, start=start, init=rsi_init)
+        for w, pair, (emaup, emadn) in zip(rsi_windows, names, averages):
+            carry[pair[0]], carry[pair[1]] = emaup, emadn
+            with np.errstate(divide='ignore', invalid='ignore'):
+                out[f'rsi_{w}'] = np.where(emadn == 0, 100, 100 - (100 / (1 + emaup / emadn)))
+    g.release('rsi')
+    # SMA
+    for w in params('sma'):
+        out[f'sma_{w}'] = g['close_sums'].mean(w)
+    g.release('sma')
+    # EMA, together with the MACD legs
+    ema_specs = [(f'ema_{w}', w) for w in params('ema')]
+    for fast, slow, sig in params('macd'):
+        ema_specs += [(f'macd_fast_{fast}_{slow}_{sig}', fast), (f'macd_slow_{fast}_{slow}_{sig}', slow)]
+    if ema_specs:
+        emas = k.ewm(
+            close, [2 / (w + 1) for _, w in ema_specs], min_periods=[w for _, w in ema_specs],
+            start=start, init=init(*[name for name, _ in ema_specs]),
+        )
+        carry.update(zip([name for name, _ in ema_specs], emas))
+    for w in params('ema'):
+        out[f'ema_{w}'] = carry[f'ema_{w}']
+    # MACD
+    for fast, slow, sig in params('macd'):
+        key = f'{fast}_{slow}_{sig}'
+        macd = carry[f'macd_fast_{key}'] - carry[f'macd_slow_{key}']
+        macd_signal = carry[f'macd_signal_{key}'] = k.ewm(
+            macd, 2 / (sig + 1), min_periods=sig, start=start if resume else slow - 1,
+            init=state[f'macd_signal_{key}'] if resume else None,
+        )
+        out[f'macd_{key}'] = macd
+        out[f'macd_signal_{key}'] = macd_signal
+        out[f'macd_hist_{key}'] = macd - macd_signal
+    # Bollinger Bands
+    for w in params('bb'):
+        mavg = out[f'sma_{w}'] if f'sma_{w}' in out else g['close_sums'].mean(w)
+        mstd = g['close_sums'].std(w)
+        out[f'bb_upper_{w}'] = mavg + 2 * mstd
+        out[f'bb_middle_{w}'] = mavg
+        out[f'bb_lower_{w}'] = mavg - 2 * mstd
+    g.release('bb')
+    # Stochastic Oscillator
+    for w in params('stoch'):
+        highest, lowest = _channel(g, w)
+        smooth = indicators['stoch']['smooth_window']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            stoch_k = 100 * (close - lowest) / (highest - lowest)
+        out[f'stoch_k_{w}_{smooth}'] = stoch_k
+        out[f'stoch_d_{w}_{smooth}'] = k.rolling_mean(stoch_k, smooth)
+    g.release('stoch')
+    # CCI
+    for w in params('cci'):
+        typical_price = g['typical_price']
+        tp_mean = g['typical_price_sums'].mean(w)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[f'cci_{w}'] = (typical_price - tp_mean) / (0.015 * k.rolling_mad(typical_price, tp_mean, w))
+    g.release('cci')
+    # ATR
+    for w in params('atr'):
+        out[f'atr_{w}'] = carry[f'atr_{w}'] = k.wilder(
+            g['true_range'], w, start=start, init=state[f'atr_{w}'] if resume else None
+        )
+    g.release('atr')
+    # OBV
+    if params('obv'):
+        obv = np.cumsum(g['obv_increments'], axis=-1)
+        if resume:
+            obv = state['obv'][:, None] + (obv - obv[:, start - 1:start])
+        out['obv'] = carry['obv'] = obv
+        obv_sums = k.PrefixSums(obv)
+        for w in params('obv'):
+            out[f'obv_{w}'] = obv_sums.mean(w)
+    g.release('obv')
+    # Ichimoku (standard and alternatives)
+    for conv, base, span_b in params('ichimoku'):
+        out[f'ichimoku_conv_{conv}'] = 0.5 * sum(_channel(g, conv))
+        out[f'ichimoku_base_{base}'] = 0.5 * sum(_channel(g, base))
+        out[f'ichimoku_spanb_{span_b}'] = 0.5 * sum(_channel(g, (span_b, 1)))
+    g.release('ichimoku')
+    # Donchian Channel
+    for w in params('donchian'):
+        out[f'donchian_high_{w}'], out[f'donchian_low_{w}'] = _channel(g, w)
+    g.release('donchian')
+    # ADX
+    for w in params('adx'):
+        sums = k.wilder_sums(g['directional_movement'], w, start=start, init=init(f'adx_trs_{w}', f'adx_dip_{w}', f'adx_din_{w}'))
+        carry[f'adx_trs_{w}'], carry[f'adx_dip_{w}'], carry[f'adx_din_{w}'] = sums
+        out[f'adx_{w}'] = carry[f'adx_{w}'] = k.adx_from_sums(
+            sums, w, start=start, init=state[f'adx_{w}'] if resume else None
+        )
+    g.release('adx')
+    # Parabolic SAR (multiple parameter sets for signals), all steps in one pass
+    steps = params('psar')
+    if steps:
+        keys = [psar_key(step, indicators['psar']['max_step']) for step in steps]
+        names = [
+            [f'psar_{key}', f'psar_trend_{key}', f'psar_af_{key}', f'psar_high_{key}', f'psar_low_{key}']
+            for key in keys
+        ]
+        psar_init = tuple(np.stack([state[name] for name in group]) for group in zip(*names)) if resume else None
+        series = k.psar(high, low, close, step=steps, max_step=indicators['psar']['max_step'],
+                        start=start, init=psar_init)
+        for i, key in enumerate(keys):
+            carry.update(zip(names[i], (values[i] for values in series)))
+            out[f'psar_{key}'] = series[0][i]
+    # Lags
+    for col in params('lags'):
+        for lag in indicators['lags']['lags']:
+            out[f'{col}_lag_{lag}'] = k.shift(g[col], lag)
+    return out, carry
+
+
+def generate_indicators_panel(prices_df: pd.DataFrame, columns: list = None, compact: bool = False) -> pd.DataFrame:
+    """
+    Calculate the same columns as generate_indicators for the whole universe at
+    once. Prices are sorted a single time, laid out as a (symbol, bar) panel and
+    every indicator is computed as a batched NumPy operation across all symbols.
+    Results match the ta path to floating point tolerance.
+
+    ``columns`` restricts the output to those indicator columns; only the
+    parameter sets and shared intermediates they need are computed. With
+    ``compact`` the result uses compact dtypes (float32 indicators, datetime64
+    dates, see frame_dtypes).
+    """
+    df = prices_df.sort_values(['symbol', 'date'], kind='stable')
+    codes, positions, lengths = k.build_panel(df['symbol'])
+    bars = {
+        col: k.to_panel(df[col].to_numpy(dtype='float64'), codes, positions, lengths)
+        for col in PANEL_BAR_COLUMNS
+    }
+    indicators = select_indicators(columns) if columns is not None else None
+    out, _ = compute_panel_columns(bars, indicators=indicators)
+    if columns is not None:
+        out = {name: out[name] for name in columns}
+
+    result = df.reset_index(drop=True)
+    if compact:
+        result = compact_frame(result)
+        columns = pd.DataFrame({
+            name: k.from_panel(values, codes, positions).astype(INDICATOR_DTYPE) for name, values in out.items()
+        })
+        return pd.concat([result, columns], axis=1)
+    # Ensure date is string for consistency
+    result['date'] = pd.to_datetime(result['date']).dt.strftime('%Y-%m-%d')
+    columns = pd.DataFrame({name: k.from_panel(values, codes, positions) for name, values in out.items()})
+    return pd.concat([result, columns], axis=1)
@@ -1,8 +1,13 @@
+import numpy as np
 import pandas as pd
 
-def generate_trade_signals(indicators_df: pd.DataFrame) -> pd.DataFrame:
+from frame_dtypes import compact_frame
+from indicator_registry import load_indicator_config, parameter_sets, psar_key
+
+def generate_trade_signals(indicators_df: pd.DataFrame, compact: bool = False) -> pd.DataFrame:
     """
     Generate trade signals from technical indicators using common default thresholds.
+    With compact=True signals are int8 (see frame_dtypes).
     Returns a DataFrame matching the technical_trade_signals table schema.
     """
     signals = indicators_df[['symbol', 'date']].copy()
@@ -102,4 +107,188 @@ def generate_trade_signals(indicators_df: pd.DataFrame) -> pd.DataFrame:
         signals.loc[indicators_df['close'] > indicators_df[high_col].shift(1), sig_col] = 1
         signals.loc[indicators_df['close'] < indicators_df[low_col].shift(1), sig_col] = -1
 
-    return signals
\ No newline at end of file
+    if compact:
+        signals = compact_frame(signals)
+    return signals
+
+# Moving-average crossovers, kept where both SMA windows are configured
+SMA_CROSS_PAIRS = [(5, 20), (10, 50), (20, 100), (50, 200)]
+
+
+def signal_rules(indicators: dict = None) -> list:
+    """
+    Signal rules of generate_trade_signals for the parameter sets in the
+    indicator config, in column order: (signal column, rule, indicator
+    columns, thresholds).
+    """
+    indicators = indicators if indicators is not None else load_indicator_config()
+    windows = lambda family: parameter_sets(indicators, family)
+    smooth = indicators.get('stoch', {}).get('smooth_window')
+    max_step = indicators.get('psar', {}).get('max_step')
+    return (
+        [(f'rsi_signal_{w}', 'band', (f'rsi_{w}',), (30, 70)) for w in windows('rsi')]
+        + [(f'stoch_signal_{w}_{smooth}', 'band', (f'stoch_k_{w}_{smooth}',), (20, 80)) for w in windows('stoch')]
+        + [(f'macd_cross_signal_{f}_{s}_{g}', 'cross', (f'macd_{f}_{s}_{g}', f'macd_signal_{f}_{s}_{g}'), None)
+           for f, s, g in windows('macd')]
+        + [(f'sma_cross_signal_{short}_{long}', 'cross', (f'sma_{short}', f'sma_{long}'), None)
+           for short, long in SMA_CROSS_PAIRS if {short, long} <= set(windows('sma'))]
+        + [(f'bb_signal_{w}', 'channel', ('close', f'bb_lower_{w}', f'bb_upper_{w}'), None) for w in windows('bb')]
+        + [(f'cci_signal_{w}', 'band', (f'cci_{w}',), (-100, 100)) for w in windows('cci')]
+        + [(f'adx_signal_{w}', 'trend', (f'adx_{w}',), 20) for w in windows('adx')]
+        + [(f'psar_signal_{psar_key(step, max_step)}', 'psar', ('close', f'psar_{psar_key(step, max_step)}'), None)
+           for step in windows('psar')]
+        + [(f'donchian_signal_{w}', 'breakout', ('close', f'donchian_low_{w}', f'donchian_high_{w}'), None)
+           for w in windows('donchian')]
+    )
+
+
+SIGNAL_RULES = signal_rules()
+
+
+def _present(rules: list, columns) -> list:
+    """The rules whose indicator columns are all in ``columns``."""
+    columns = set(columns)
+    return [rule for rule in rules if columns.issuperset(rule[2])]
+
+def _previous(x: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Value of the previous row of the same symbol (NaN on each symbol's first row)."""
+    prev = np.empty_like(x)
+    prev[1:] = x[:-1]
+    prev[starts] = np.nan
+    return prev
+
+
+def generate_trade_signals_fused(indicators_df: pd.DataFrame, compact: bool = False,
+                                 thresholds: dict = None) -> pd.DataFrame:
+    """
+    Same signals as generate_trade_signals, evaluated rule by rule on NumPy
+    arrays into one preallocated int8 matrix.
+
+    Rows must be grouped by symbol in date order, as the readers return them.
+    Cross and breakout rules compare with the previous row of the same symbol,
+    so a symbol's first row never signals off the previous symbol's last row
+    (generate_trade_signals shifts across the whole frame). The rules come
+    from the indicator config (signal_rules); a rule is skipped when one of
+    its indicator columns is missing from the frame. compact=True also
+    compacts the symbol and date columns. ``thresholds`` overrides the levels
+    of a THRESHOLD_FAMILIES family, e.g. {'rsi': (25, 75), 'adx': 25}.
+    """
+    thresholds = thresholds or {}
+    # Integer ids find the boundaries faster than symbol text
+    symbols = indicators_df['symbol_id' if 'symbol_id' in indicators_df.columns else 'symbol'].to_numpy()
+    starts = np.ones(len(symbols), dtype=bool)
+    starts[1:] = symbols[1:] != symbols[:-1]
+    rules = _present(SIGNAL_RULES, indicators_df.columns)
+    arrays, previous = {}, {}
+
+    def values(col):
+        if col not in arrays:
+            arrays[col] = indicators_df[col].to_numpy(dtype='float64')
+        return arrays[col]
+
+    def prev(col):
+        if col not in previous:
+            previous[col] = _previous(values(col), starts)
+        return previous[col]
+
+    out = np.zeros((len(rules), len(symbols)), dtype=np.int8)
+    with np.errstate(invalid='ignore'):
+        for row, (name, rule, cols, threshold) in zip(out, rules):
+            threshold = thresholds.get(name.split('_')[0], threshold)
+            if rule == 'band':
+                x = values(cols[0])
+                np.subtract(x < threshold[0], x > threshold[1], out=row, dtype=np.int8)
+            elif rule == 'cross':
+                fast, slow = values(cols[0]), values(cols[1])
+                prev_fast, prev_slow = prev(cols[0]), prev(cols[1])
+                np.subtract((fast > slow) & (prev_fast <= prev_slow), (fast < slow) & (prev_fast >= prev_slow),
+                            out=row, dtype=np.int8)
+            elif rule == 'channel':
+                price, lower, upper = (values(col) for col in cols)
+                np.subtract(price < lower, price > upper, out=row, dtype=np.int8)
+            elif rule == 'trend':
+                np.greater(values(cols[0]), threshold, out=row, casting='unsafe')
+            elif rule == 'psar':
+                # Missing values never signal a buy, as in generate_trade_signals
+                close = np.nan_to_num(values(cols[0]), nan=-np.inf)
+                psar = np.nan_to_num(values(cols[1]), nan=np.inf)
+                np.subtract(close > psar, close < psar, out=row, dtype=np.int8)
+            elif rule == 'breakout':
+                close = values(cols[0])
+                np.subtract(close > prev(cols[2]), close < prev(cols[1]), out=row, dtype=np.int8)
+
+    signals = indicators_df[['symbol', 'date']].copy()
+    if compact:
+        signals = compact_frame(signals)
+    matrix = pd.DataFrame(out.T, columns=[rule[0] for rule in rules], index=signals.index)
+    return pd.concat([signals, matrix], axis=1)
+
+
+# Families whose threshold levels can be overridden and swept
+THRESHOLD_FAMILIES = ('rsi', 'stoch', 'cci', 'adx')
+
+
+def _threshold_levels(family: str, kind: str, thresholds) -> np.ndarray:
+    if family not in THRESHOLD_FAMILIES:
+        raise ValueError(f"No thresholds to sweep for {family}; expected one of {THRESHOLD_FAMILIES}")
+    levels = np.asarray(thresholds, dtype='float64')
+    if kind == 'band':
+        if levels.ndim != 2 or levels.shape[1] != 2:
+            raise ValueError(f"{family} thresholds must be (buy, sell) pairs")
+        if (levels[:, 0] > levels[:, 1]).any():
+            raise ValueError(f"{family} buy thresholds must not exceed their sell thresholds")
+    elif levels.ndim != 1:
+        raise ValueError(f"{family} thresholds must be single levels")
+    return levels
+
+
+def _threshold_counts(x: np.ndarray, levels: np.ndarray, kind: str) -> np.ndarray:
+    """Counts of -1, 0 and 1 per (level, signal), found by binary search in each sorted column."""
+    ordered = np.sort(x, axis=0)  # NaN, which never signals, sorts last
+    valid = (~np.isnan(x)).sum(axis=0)
+    counts = np.empty((len(levels), x.shape[1], 3), dtype=np.int64)
+    for col, n in enumerate(valid):
+        values = ordered[:n, col]
+        if kind == 'band':
+            buy = np.searchsorted(values, levels[:, 0], side='left')
+            sell = n - np.searchsorted(values, levels[:, 1], side='right')
+        else:
+            buy = n - np.searchsorted(values, levels, side='right')
+            sell = 0
+        counts[:, col] = np.column_stack([np.broadcast_to(sell, buy.shape), len(x) - buy - sell, buy])
+    return counts
+
+
+def sweep_signal_thresholds(indicators_df: pd.DataFrame, grid: dict, counts: bool = False) -> dict:
+    """
+    Evaluate the threshold rules of each family in ``grid`` for every level
+    in the grid at once, without building a frame per level.
+
+    ``grid`` maps a THRESHOLD_FAMILIES family to its levels: (buy, sell) pairs
+    for rsi, stoch and cci, single levels for adx. Returns family ->
+    (signal columns, array). The array is int8 of shape (levels, rows,
+    signals), equal to generate_trade_signals_fused with that level; with
+    ``counts`` it is int64 of shape (levels, signals, 3) counting -1, 0 and 1.
+    """
+    result = {}
+    for family, thresholds in grid.items():
+        configured = [rule for rule in SIGNAL_RULES if rule[0].startswith(f'{family}_signal_')]
+        rules = _present(configured, indicators_df.columns)
+        if not rules and family in THRESHOLD_FAMILIES:
+            if not configured:
+                raise ValueError(f"No {family} signals to sweep: {family} is not in the indicator config")
+            missing = sorted({col for rule in configured for col in rule[2]} - set(indicators_df.columns))
+            raise ValueError(f"No {family} signals to sweep: indicator columns {missing} are missing")
+        kind = rules[0][1] if rules else None
+        levels = _threshold_levels(family, kind, thresholds)
+        x = np.column_stack([indicators_df[cols[0]].to_numpy(dtype='float64') for _, _, cols, _ in rules])
+        if counts:
+            out = _threshold_counts(x, levels, kind)
+        elif kind == 'band':
+            with np.errstate(invalid='ignore'):
+                out = np.subtract(x < levels[:, 0, None, None], x > levels[:, 1, None, None], dtype=np.int8)
+        else:
+            with np.errstate(invalid='ignore'):
+                out = (x > levels[:, None, None]).astype(np.int8)
+        result[family] = ([rule[0] for rule in rules], out)
+    return result
@@ -9,7 +9,8 @@ import yaml
 import logging
 from datetime import datetime
 
-# Add database path
+# Add src and database to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
 sys.path.append(str(Path(__file__).parent.parent / 'database'))
 from database_manager import DatabaseManager
 
@@ -2,8 +2,13 @@
 Database setup script for stock prediction ML project
 """
 import logging
+import sys
 from pathlib import Path
 import yaml
+
+# Add src and database to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+sys.path.append(str(Path(__file__).parent.parent / 'database'))
 from database_manager import DatabaseManager
 from symbol_universe import SymbolUniverse
 
@@ -0,0 +1,69 @@
+"""
+Shared setup for the tests: the src, database and scripts directories on the
+path, as the scripts add them, a small synthetic price universe and a
+database of it filled by the staged scripts.
+"""
+import shutil
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).parent.parent
+for folder in ('src', 'database', 'scripts'):
+    sys.path.append(str(ROOT / folder))
+
+from database_manager import DatabaseManager
+from staged_pipeline import run_full
+from synthetic_data import synthetic_prices
+
+# Long enough for every configured warm-up period (EMA-200, ADX, Ichimoku)
+N_SYMBOLS, N_BARS = 6, 320
+
+
+@pytest.fixture(scope='session')
+def prices_df():
+    """Random-walk bars for N_SYMBOLS symbols over N_BARS XNYS sessions."""
+    return synthetic_prices(N_SYMBOLS, N_BARS)
+
+
+def create_database(path) -> str:
+    """Set up the schema in a new database at ``path`` and return the path."""
+    path = str(path)
+    with DatabaseManager(db_path=path) as db_manager:
+        db_manager.setup_database()
+    return path
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Path of an empty database with the schema set up."""
+    return create_database(tmp_path / 'test.db')
+
+
+def read_table(db_manager, table):
+    """Every row of a (symbol_id, date) table without its bookkeeping columns."""
+    df = pd.read_sql_query(f"SELECT * FROM {table} ORDER BY symbol_id, date", db_manager.connection)
+    return df.drop(columns=['id', 'created_at'], errors='ignore')
+
+
+@pytest.fixture(scope='session')
+def feature_db_path(tmp_path_factory, prices_df):
+    """
+    A database of ``prices_df`` with indicators, signals and outcomes written
+    by the staged scripts, built once per session; tests must not write to it.
+    """
+    path = create_database(tmp_path_factory.mktemp('features') / 'features.db')
+    with DatabaseManager(db_path=path) as db_manager:
+        db_manager.insert_stock_prices_bulk(prices_df)
+        run_full(db_manager)
+    return path
+
+
+@pytest.fixture
+def feature_db(feature_db_path, tmp_path):
+    """A writable copy of the feature database."""
+    path = str(tmp_path / 'features.db')
+    shutil.copy(feature_db_path, path)
+    return path
@@ -0,0 +1,109 @@
+"""Readers against a writer, with and without concurrent (WAL) mode."""
+import sqlite3
+import threading
+
+import pytest
+
+from database_manager import DatabaseManager
+
+CLOSE_QUERY = "SELECT close_price FROM stock_prices WHERE symbol_id = 1 ORDER BY date LIMIT 1"
+
+
+@pytest.fixture
+def prices_db(db_path, prices_df):
+    with DatabaseManager(db_path=db_path) as db_manager:
+        db_manager.insert_stock_prices_bulk(prices_df)
+    return db_path
+
+
+def moved(prices_df):
+    """The prices with every close changed, so an upsert rewrites every row."""
+    return prices_df.assign(close=prices_df['close'] + 1)
+
+
+def test_writer_commits_while_a_wal_reader_holds_its_snapshot(prices_db, prices_df):
+    reading, written = threading.Event(), threading.Event()
+    seen = {}
+
+    def read():
+        connection = db_manager.reader().connection
+        connection.execute("BEGIN")
+        seen['before'] = connection.execute(CLOSE_QUERY).fetchone()[0]
+        reading.set()
+        written.wait(timeout=30)
+        seen['during'] = connection.execute(CLOSE_QUERY).fetchone()[0]
+        connection.commit()
+        seen['after'] = db_manager.reader().get_all_stock_prices([1])['close'].iloc[0]
+
+    with DatabaseManager(db_path=prices_db, concurrent=True) as db_manager:
+        thread = threading.Thread(target=read)
+        thread.start()
+        assert reading.wait(timeout=30)
+        with db_manager.writer():
+            db_manager.insert_stock_prices_bulk(moved(prices_df))
+        written.set()
+        thread.join()
+    first_close = prices_df['close'].iloc[0]
+    assert seen['before'] == seen['during'] == first_close
+    assert seen['after'] == first_close + 1
+
+
+def test_default_mode_writer_is_locked_out_by_an_open_read(prices_db, prices_df):
+    with DatabaseManager(db_path=prices_db) as reader, DatabaseManager(db_path=prices_db) as writer:
+        reader.connection.execute("BEGIN")
+        reader.connection.execute(CLOSE_QUERY).fetchone()
+        writer.connection.execute("PRAGMA busy_timeout = 0")
+        with pytest.raises(sqlite3.OperationalError, match='locked'):
+            writer.insert_stock_prices_bulk(moved(prices_df))
+        reader.connection.commit()
+
+
+def test_readers_are_pooled_per_thread_and_read_only(prices_db):
+    with DatabaseManager(db_path=prices_db, concurrent=True) as db_manager:
+        main = db_manager.reader()
+        assert db_manager.reader() is main
+        assert main.connection is not db_manager.connection
+        other = {}
+        thread = threading.Thread(target=lambda: other.update(view=db_manager.reader()))
+        thread.start()
+        thread.join()
+        assert other['view'].connection is not main.connection
+        with pytest.raises(sqlite3.OperationalError, match='readonly'):
+            main.connection.execute("DELETE FROM stock_prices")
+        assert db_manager.connection.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+
+
+def test_direct_writes_wait_for_another_threads_writer_block(prices_db, prices_df):
+    started, done = threading.Event(), threading.Event()
+
+    def write():
+        started.set()
+        db_manager.insert_stock_prices_bulk(moved(prices_df))
+        done.set()
+
+    with DatabaseManager(db_path=prices_db, concurrent=True) as db_manager:
+        with db_manager.writer():
+            thread = threading.Thread(target=write)
+            thread.start()
+            assert started.wait(timeout=30)
+            # The other thread's insert needs the write lock this block holds
+            assert not done.wait(timeout=0.5)
+        thread.join()
+        assert done.is_set()
+
+
+def test_reader_context_leaves_the_pool_open(prices_db):
+    with DatabaseManager(db_path=prices_db, concurrent=True) as db_manager:
+        main = db_manager.reader()
+        other = {}
+        thread = threading.Thread(target=lambda: other.update(view=db_manager.reader()))
+        thread.start()
+        thread.join()
+        with main as reader:
+            assert len(reader.get_all_stock_prices([1]))
+        assert db_manager.reader() is main
+        assert main.connection.execute(CLOSE_QUERY).fetchone()
+        assert other['view'].connection.execute(CLOSE_QUERY).fetchone()
+        assert db_manager.connection.execute(CLOSE_QUERY).fetchone()
+        with pytest.raises(RuntimeError):
+            main.writer()
@@ -0,0 +1,151 @@
+"""DatabaseManager writes and reads against the paths they replace."""
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import create_database, read_table
+from database_manager import DatabaseManager
+from feature_pipeline import compute_features
+from reference_paths import (
+    CALENDAR_COLUMNS, PRICE_COLUMNS, calendar_frame, hand_merge, insert_with_iterrows, per_symbol, to_sql_batches,
+)
+
+FEATURE_TABLES = ['technical_indicators', 'technical_trade_signals', 'outcomes']
+
+
+@pytest.fixture(scope='module')
+def feature_frames(prices_df):
+    """The feature tables' rows as the insert_* methods receive them."""
+    indicators, signals, outcomes, _ = compute_features(prices_df)
+    return dict(zip(FEATURE_TABLES, (indicators, signals, outcomes)))
+
+
+def read_prices(db_manager):
+    return pd.read_sql_query("""
+        SELECT s.symbol, p.date, p.open_price, p.high_price, p.low_price, p.close_price, p.adj_close, p.volume
+        FROM stock_prices p JOIN symbols s ON s.symbol_id = p.symbol_id
+        ORDER BY s.symbol, p.date
+    """, db_manager.connection)
+
+
+# The iterrows reference passes datetime.date values to sqlite3
+@pytest.mark.filterwarnings('ignore:The default date adapter is deprecated')
+def test_price_insert_paths_agree(prices_df, tmp_path):
+    paths = [
+        ('iterrows', per_symbol(insert_with_iterrows)),
+        ('vectorised', per_symbol(lambda db, df, symbol: db.insert_stock_prices(df, symbol))),
+        ('bulk', lambda db, df: db.insert_stock_prices_bulk(df)),
+    ]
+    tables = {}
+    for name, run in paths:
+        with DatabaseManager(db_path=create_database(tmp_path / f'{name}.db')) as db_manager:
+            run(db_manager, prices_df)
+            tables[name] = read_prices(db_manager)
+    assert len(tables['iterrows']) == len(prices_df)
+    for name in ('vectorised', 'bulk'):
+        pd.testing.assert_frame_equal(tables['iterrows'], tables[name], obj=name)
+
+
+def test_bulk_upsert_matches_to_sql_and_is_idempotent(prices_df, feature_frames, tmp_path):
+    seeded = create_database(tmp_path / 'seeded.db')
+    with DatabaseManager(db_path=seeded) as db_manager:
+        db_manager.insert_stock_prices_bulk(prices_df)
+        frames = {}
+        for table, df in feature_frames.items():
+            columns = db_manager._table_columns(table)
+            frames[table] = df[[col for col in df.columns if col in columns]].assign(
+                date=pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d'))
+
+    tables = {}
+    for path in ('to_sql', 'bulk_upsert'):
+        db_path = str(tmp_path / f'{path}.db')
+        shutil.copy(seeded, db_path)
+        with DatabaseManager(db_path=db_path) as db_manager:
+            for table, df in frames.items():
+                # A first write, then a re-run over the same rows
+                for rerun in (False, True):
+                    if path == 'to_sql':
+                        to_sql_batches(db_manager, table, df, rerun)
+                    else:
+                        db_manager.bulk_upsert(table, df)
+            tables[path] = {table: read_table(db_manager, table) for table in frames}
+    for table, df in frames.items():
+        assert len(tables['bulk_upsert'][table]) == len(df)
+        pd.testing.assert_frame_equal(tables['to_sql'][table], tables['bulk_upsert'][table],
+                                      check_dtype=False, obj=table)
+
+
+def test_inserts_advance_watermarks(prices_df, db_path):
+    with DatabaseManager(db_path=db_path) as db_manager:
+        db_manager.insert_stock_prices_bulk(prices_df)
+        state = db_manager.get_pipeline_state()
+        last_dates = prices_df.groupby('symbol_id')['date'].max().dt.strftime('%Y-%m-%d')
+        assert state.set_index('symbol_id')['last_price_date'].equals(last_dates.rename('last_price_date'))
+        assert state['last_indicator_date'].isna().all()
+        dirty = db_manager.get_dirty_symbols('technical_indicators')
+        assert dirty['symbol_id'].tolist() == last_dates.index.tolist()
+
+
+
+def test_connect_upgrades_an_older_schema(feature_db):
+    # As a database set up before pipeline_state and the configured columns
+    with DatabaseManager(db_path=feature_db) as db_manager:
+        state = db_manager.get_pipeline_state()
+        db_manager.connection.execute("DROP TABLE pipeline_state")
+        db_manager.connection.execute("ALTER TABLE technical_indicators DROP COLUMN rsi_14")
+        db_manager.connection.commit()
+    with DatabaseManager(db_path=feature_db) as db_manager:
+        assert 'rsi_14' in db_manager._table_columns('technical_indicators')
+        pd.testing.assert_frame_equal(db_manager.get_pipeline_state(), state)
+
+@pytest.fixture
+def calendar_db(feature_db, prices_df):
+    with DatabaseManager(db_path=feature_db) as db_manager:
+        db_manager.insert_calendar(calendar_frame(prices_df['date']))
+    return feature_db
+
+
+def test_feature_matrix_matches_hand_merge(prices_df, calendar_db):
+    indicators, signals, outcomes = ['rsi_14', 'macd_12_26_9', 'atr_14'], ['rsi_signal_14'], ['returns_d5']
+    columns = PRICE_COLUMNS + indicators + signals + outcomes + CALENDAR_COLUMNS
+    dates = prices_df['date'].drop_duplicates().sort_values()
+    start_date, end_date = dates.iloc[100], dates.iloc[250]
+    with DatabaseManager(db_path=calendar_db) as db_manager:
+        reference = hand_merge(db_manager, [2, 4, 5], start_date, end_date, indicators, signals, outcomes)
+        matrix = db_manager.get_feature_matrix([2, 'S0003', 5], start_date, end_date, columns)
+        chunks = list(db_manager.get_feature_matrix([2, 4, 5], start_date, end_date, columns, chunk_size=100))
+    assert len(matrix) == 3 * 151
+    pd.testing.assert_frame_equal(reference[matrix.columns], matrix, check_dtype=False)
+    assert max(len(chunk) for chunk in chunks) == 100
+    pd.testing.assert_frame_equal(matrix, pd.concat(chunks, ignore_index=True))
+
+
+def test_feature_matrix_lags_match_indicator_reads(calendar_db):
+    with DatabaseManager(db_path=calendar_db) as db_manager:
+        matrix = db_manager.get_feature_matrix([1], '2019-06-03', None, ['close_lag_2'])
+        expected = db_manager.get_all_technical_indicators([1], lags=['close_lag_2'], start_date='2019-06-03')
+    np.testing.assert_array_equal(matrix['close_lag_2'].to_numpy(), expected['close_lag_2'].to_numpy())
+
+
+def test_indicator_reads_skip_stale_stored_columns(feature_db):
+    with DatabaseManager(db_path=feature_db) as db_manager:
+        # Left behind by an older layout or config: a stored lag under another name
+        db_manager.connection.execute("ALTER TABLE technical_indicators ADD COLUMN close_lag_7 REAL")
+        df = db_manager.get_all_technical_indicators([1], lags=['close_lag_2'])
+    assert 'close_lag_7' not in df.columns
+    assert {'rsi_14', 'close_lag_2'} <= set(df.columns)
+
+
+def test_cross_section_reads_the_date_index(prices_df, calendar_db):
+    day = prices_df['date'].iloc[200]
+    columns = ['close', 'volume', 'rsi_14', 'rsi_signal_14', 'dow_1']
+    with DatabaseManager(db_path=calendar_db) as db_manager:
+        snapshot = db_manager.get_cross_section(day, columns)
+        expected = db_manager.get_feature_matrix(None, day, day, columns)
+        query, params = db_manager._feature_query(None, day, day, columns)
+        plan = " ".join(row[-1] for row in db_manager.connection.execute(f"EXPLAIN QUERY PLAN {query}", params))
+    assert snapshot['symbol_id'].tolist() == sorted(prices_df['symbol_id'].unique())
+    pd.testing.assert_frame_equal(snapshot, expected)
+    assert 'idx_stock_prices_date_symbol' in plan and 'TEMP B-TREE' not in plan
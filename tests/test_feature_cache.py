@@ -0,0 +1,51 @@
+"""The memory-mapped feature cache against SQLite."""
+import pandas as pd
+
+from database_manager import DatabaseManager
+from feature_cache import CACHE_BUCKET_SYMBOLS, refresh_cache
+from technical_indicators import generate_indicators_panel
+
+COLUMNS = ['rsi_14', 'ema_200', 'adx_14']
+
+
+def sql_columns(db_manager, symbol_ids, start_date=None):
+    df = db_manager.get_all_technical_indicators(symbol_ids, lags=[], start_date=start_date)
+    return df.sort_values(['symbol_id', 'date'], ignore_index=True)[['symbol_id', 'date'] + COLUMNS]
+
+
+def test_cached_reads_match_sqlite(feature_db):
+    with DatabaseManager(db_path=feature_db) as db_manager:
+        cached = db_manager.get_cached_table('technical_indicators', COLUMNS, [2, 5])
+        pd.testing.assert_frame_equal(cached, sql_columns(db_manager, [2, 5]), check_dtype=False)
+        cached = db_manager.get_cached_table('technical_indicators', COLUMNS, [1], start_date='2020-01-02',
+                                             end_date='2020-02-28')
+        expected = sql_columns(db_manager, [1], '2020-01-02')
+        expected = expected[expected['date'] <= '2020-02-28'].reset_index(drop=True)
+        pd.testing.assert_frame_equal(cached, expected, check_dtype=False)
+
+
+def test_refresh_exports_only_written_partitions(feature_db, prices_df):
+    with DatabaseManager(db_path=feature_db) as db_manager:
+        exported = refresh_cache(db_manager, 'technical_indicators')
+        assert exported == len(prices_df)
+        assert refresh_cache(db_manager, 'technical_indicators') == 0
+
+        # A write to one symbol re-exports its partition only
+        changed = generate_indicators_panel(db_manager.get_all_stock_prices([3])).tail(5)
+        changed['rsi_14'] = 50.0
+        db_manager.insert_technical_indicators(changed)
+        bucket = prices_df['symbol_id'] // CACHE_BUCKET_SYMBOLS == 3 // CACHE_BUCKET_SYMBOLS
+        assert refresh_cache(db_manager, 'technical_indicators') == bucket.sum()
+        cached = db_manager.get_cached_table('technical_indicators', COLUMNS, [3])
+        assert (cached['rsi_14'].tail(5) == 50.0).all()
+        pd.testing.assert_frame_equal(cached, sql_columns(db_manager, [3]), check_dtype=False)
+
+
+def test_writes_to_other_tables_keep_the_partitions(feature_db):
+    with DatabaseManager(db_path=feature_db) as db_manager:
+        refresh_cache(db_manager, 'technical_indicators')
+        refresh_cache(db_manager, 'stock_prices')
+        prices = db_manager.get_all_stock_prices([3]).tail(1)
+        db_manager.bulk_upsert('stock_prices', prices.assign(volume=prices['volume'] + 1))
+        assert refresh_cache(db_manager, 'technical_indicators') == 0
+        assert refresh_cache(db_manager, 'stock_prices') > 0
@@ -0,0 +1,81 @@
+"""generate_technical_indicators --update against a full recompute (to 1e-9 relative: resumed
+rolling sums round differently from sums over the whole history)."""
+import pandas as pd
+
+import generate_technical_indicators
+from conftest import N_BARS, create_database, read_table
+from database_manager import DatabaseManager
+from indicator_registry import indicator_columns
+from indicator_state import STATE_BARS, build_states, update_indicators
+
+NEW_BARS = 5
+
+
+def read_indicators(db_manager):
+    """technical_indicators keyed by symbol, as symbol_ids depend on insert order."""
+    df = read_table(db_manager, 'technical_indicators')
+    symbols = db_manager.get_symbols().set_index('symbol_id')['symbol']
+    df.insert(0, 'symbol', df.pop('symbol_id').map(symbols))
+    return df.sort_values(['symbol', 'date']).reset_index(drop=True)
+
+
+def indicators_after_update(db_path, first, rest):
+    """Full run over ``first``, then the ``rest`` of the bars and an --update run."""
+    with DatabaseManager(db_path=db_path) as db_manager:
+        db_manager.insert_stock_prices_bulk(first)
+    generate_technical_indicators.main(db_path=db_path)
+    with DatabaseManager(db_path=db_path) as db_manager:
+        db_manager.insert_stock_prices_bulk(rest)
+    generate_technical_indicators.main(update_mode=True, db_path=db_path)
+    with DatabaseManager(db_path=db_path) as db_manager:
+        return read_indicators(db_manager)
+
+
+def indicators_recomputed(db_path, prices_df):
+    with DatabaseManager(db_path=db_path) as db_manager:
+        db_manager.insert_stock_prices_bulk(prices_df)
+    generate_technical_indicators.main(db_path=db_path)
+    with DatabaseManager(db_path=db_path) as db_manager:
+        return read_indicators(db_manager)
+
+
+def split(prices_df, first_bars):
+    """First ``first_bars[symbol_id]`` bars of each symbol (all when absent) and the rest."""
+    position = prices_df.groupby('symbol_id').cumcount()
+    limit = prices_df['symbol_id'].map(first_bars).fillna(N_BARS - NEW_BARS)
+    kept = position < limit
+    return prices_df[kept], prices_df[~kept]
+
+
+def test_update_equals_full_recompute(prices_df, db_path, tmp_path):
+    # Symbol 2 gets no new bars; symbol 3 only appears in the update
+    first, rest = split(prices_df, {2: N_BARS, 3: 0})
+    updated = indicators_after_update(db_path, first, rest)
+    expected = indicators_recomputed(create_database(tmp_path / 'full.db'), prices_df)
+    pd.testing.assert_frame_equal(updated, expected, check_exact=False, rtol=1e-9)
+
+
+def test_update_of_short_histories(prices_df, db_path, tmp_path):
+    # Fewer than STATE_BARS bars before the update: symbol 1 stays short,
+    # symbol 2 reaches STATE_BARS with its new bars
+    first_bars = {1: 60, 2: STATE_BARS - 2}
+    prices_df = prices_df[prices_df.groupby('symbol_id').cumcount() < prices_df['symbol_id'].map(
+        {1: 60 + NEW_BARS, 2: STATE_BARS - 2 + NEW_BARS}).fillna(N_BARS)]
+    first, rest = split(prices_df, first_bars)
+    assert (first.groupby('symbol_id').size()[[1, 2]] < STATE_BARS).all()
+    updated = indicators_after_update(db_path, first, rest)
+    expected = indicators_recomputed(create_database(tmp_path / 'full.db'), prices_df)
+    pd.testing.assert_frame_equal(updated, expected, check_exact=False, rtol=1e-9)
+
+
+def test_update_resumes_smoothed_columns_of_another_config(prices_df):
+    # stoch is the longest family, so %D's smoothing decides the state length
+    indicators = {'stoch': {'windows': [30], 'smooth_window': 3}, 'macd': {'configs': [[6, 13, 5]]}}
+    first, rest = split(prices_df, {})
+    _, states = build_states(first, indicators)
+    updated, _ = update_indicators(rest, states, indicators)
+    expected, _ = build_states(prices_df, indicators)
+    columns = ['symbol_id', 'date'] + indicator_columns(indicators)
+    expected = expected.loc[expected['date'].isin(updated['date']), columns].reset_index(drop=True)
+    assert updated['stoch_d_30_3'].notna().all()
+    pd.testing.assert_frame_equal(updated[columns], expected, check_exact=False, rtol=1e-9)
@@ -0,0 +1,48 @@
+"""The panel indicator engine against the per-symbol ta engine."""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+import indicator_kernels as k
+from technical_indicators import (
+    INTERMEDIATES, PANEL_BAR_COLUMNS, IndicatorGraph, compute_panel_columns, generate_indicators,
+    generate_indicators_panel,
+)
+
+KEYS = ['symbol', 'date']
+
+
+def test_panel_engine_matches_ta(prices_df):
+    with warnings.catch_warnings():
+        # The ta path adds columns one at a time
+        warnings.simplefilter('ignore', pd.errors.PerformanceWarning)
+        expected = generate_indicators(prices_df).sort_values(KEYS, ignore_index=True)
+    panel = generate_indicators_panel(prices_df).sort_values(KEYS, ignore_index=True)
+    assert set(panel.columns) == set(expected.columns)
+    for col in panel.columns:
+        if col in KEYS or col == 'symbol_id':
+            assert (panel[col] == expected[col]).all(), col
+        else:
+            np.testing.assert_allclose(panel[col].to_numpy(dtype='float64'), expected[col].to_numpy(dtype='float64'),
+                                       rtol=1e-9, atol=1e-9, err_msg=col)
+
+
+def test_column_subset_matches_full_run(prices_df):
+    columns = ['rsi_14', 'macd_12_26_9', 'adx_14', 'donchian_high_20', 'obv_20', 'close_lag_5']
+    subset = generate_indicators_panel(prices_df, columns=columns)
+    full = generate_indicators_panel(prices_df)
+    # Only the requested indicators come back, next to the price columns
+    assert set(subset.columns) - set(prices_df.columns) == set(columns)
+    pd.testing.assert_frame_equal(subset[KEYS + columns], full[KEYS + columns])
+
+
+def test_intermediates_are_dropped_after_their_last_consumer(prices_df):
+    codes, positions, lengths = k.build_panel(prices_df['symbol'])
+    bars = {col: k.to_panel(prices_df[col].to_numpy(dtype='float64'), codes, positions, lengths)
+            for col in PANEL_BAR_COLUMNS}
+    graph = IndicatorGraph(bars)
+    compute_panel_columns(bars, graph=graph)
+    # Each shared intermediate was computed once and none outlives the families reading it
+    assert len(graph.evaluated) == len(set(graph.evaluated)) > 0
+    assert not set(graph._values) & set(INTERMEDIATES)
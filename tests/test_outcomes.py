@@ -0,0 +1,62 @@
+"""Outcome labels against bar-by-bar references, and incremental refreshes against full ones."""
+import numpy as np
+import pandas as pd
+
+from conftest import create_database, read_table
+from database_manager import DatabaseManager
+from generate_outcomes import compute_outcomes
+from outcomes import LOOKAHEADS, generate_outcomes
+from reference_paths import path_labels_scan
+from sessions import session_index, session_numbers
+
+
+def test_path_labels_match_scan(prices_df):
+    outcomes_df = generate_outcomes(prices_df)
+    reference = path_labels_scan(prices_df)
+    pd.testing.assert_frame_equal(outcomes_df[reference.columns], reference)
+
+
+def test_lookahead_prices_count_sessions(prices_df):
+    # With bars missing, price_d{d} is the close d sessions later (NaN if
+    # that bar is missing), not the close d rows later
+    rng = np.random.default_rng(1)
+    gappy = prices_df[rng.random(len(prices_df)) >= 0.02].reset_index(drop=True)
+    outcomes_df = generate_outcomes(gappy)
+    sessions = session_index(gappy['date'].min(), gappy['date'].max())
+    numbers = session_numbers(outcomes_df['date'], sessions)
+    closes = gappy.assign(date=gappy['date'].dt.strftime('%Y-%m-%d'))[['symbol_id', 'date', 'close']]
+    for d in LOOKAHEADS:
+        target = np.full(len(numbers), None, dtype=object)
+        inside = numbers + d < len(sessions)
+        target[inside] = pd.DatetimeIndex(sessions[numbers[inside] + d]).strftime('%Y-%m-%d')
+        expected = outcomes_df[['symbol_id']].assign(date=target).merge(
+            closes, on=['symbol_id', 'date'], how='left')['close'].to_numpy()
+        np.testing.assert_array_equal(outcomes_df[f'price_d{d}'].to_numpy(), expected, err_msg=f"price_d{d}")
+
+
+def test_incremental_refresh_matches_full(prices_df, tmp_path):
+    cutoff = prices_df['date'].drop_duplicates().sort_values().iloc[-6]
+    tables = {}
+    for name, full in [('full', True), ('incremental', False)]:
+        with DatabaseManager(db_path=create_database(tmp_path / f'{name}.db')) as db_manager:
+            db_manager.insert_stock_prices_bulk(prices_df[prices_df['date'] <= cutoff])
+            db_manager.insert_outcomes(compute_outcomes(db_manager, full=True))
+            db_manager.insert_stock_prices_bulk(prices_df[prices_df['date'] > cutoff])
+            db_manager.insert_outcomes(compute_outcomes(db_manager, full=full))
+            tables[name] = read_table(db_manager, 'outcomes')
+    assert len(tables['full']) == len(prices_df)
+    pd.testing.assert_frame_equal(tables['full'], tables['incremental'])
+
+
+def test_incremental_refresh_of_a_one_bar_symbol(prices_df, db_path):
+    # A new symbol's first bar is a one-date frame for the session index
+    first = prices_df[prices_df['symbol'] == prices_df['symbol'].iloc[0]]
+    new_bar = first.iloc[[-1]].assign(symbol='NEWSYM')
+    with DatabaseManager(db_path=db_path) as db_manager:
+        db_manager.insert_stock_prices_bulk(first)
+        db_manager.insert_outcomes(compute_outcomes(db_manager, full=True))
+        db_manager.insert_stock_prices_bulk(new_bar)
+        dirty = db_manager.get_dirty_symbols('outcomes')['symbol_id'].tolist()
+        outcomes_df = compute_outcomes(db_manager, dirty)
+    assert len(outcomes_df) == 1
+    assert outcomes_df[[f'price_d{d}' for d in LOOKAHEADS]].isna().all(axis=None)
@@ -0,0 +1,73 @@
+"""The in-memory pipeline and the watermark-driven nightly run against the staged scripts."""
+import shutil
+
+import pandas as pd
+
+from conftest import create_database, read_table
+from database_manager import DatabaseManager
+from outcomes import TRAILING_ROWS
+from run_feature_pipeline import dirty_symbol_ids, run_block, run_blocks
+from staged_pipeline import TABLES, run_full, run_nightly
+
+
+def test_pipeline_matches_staged_scripts(prices_df, feature_db_path, db_path):
+    with DatabaseManager(db_path=db_path) as db_manager:
+        db_manager.insert_stock_prices_bulk(prices_df)
+        run_blocks(db_manager, db_manager.get_symbol_ids_with_prices(), block_symbols=4)
+        pipeline = {table: read_table(db_manager, table) for table in TABLES}
+    with DatabaseManager(db_path=feature_db_path) as db_manager:
+        for table in TABLES:
+            staged = read_table(db_manager, table)
+            pd.testing.assert_frame_equal(staged, pipeline[table][staged.columns], obj=table)
+
+
+def test_nightly_run_matches_full_recompute(prices_df, tmp_path):
+    cutoff = prices_df['date'].drop_duplicates().sort_values().iloc[-2]
+    updated = prices_df['symbol_id'] <= 3
+    seeded = create_database(tmp_path / 'seeded.db')
+    with DatabaseManager(db_path=seeded) as db_manager:
+        db_manager.insert_stock_prices_bulk(prices_df[prices_df['date'] <= cutoff])
+        run_full(db_manager)
+        db_manager.insert_stock_prices_bulk(prices_df[(prices_df['date'] > cutoff) & updated])
+        assert sorted(db_manager.get_dirty_symbols('technical_indicators')['symbol_id']) == [1, 2, 3]
+
+    tables = {}
+    for name, run in [('full', run_full), ('nightly', run_nightly)]:
+        path = str(tmp_path / f'{name}.db')
+        shutil.copy(seeded, path)
+        with DatabaseManager(db_path=path) as db_manager:
+            run(db_manager)
+            tables[name] = {table: read_table(db_manager, table) for table in TABLES}
+            tables[name]['pipeline_state'] = db_manager.get_pipeline_state()
+            assert all(db_manager.get_dirty_symbols(table).empty for table in TABLES)
+    for table in TABLES + ['pipeline_state']:
+        pd.testing.assert_frame_equal(tables['full'][table], tables['nightly'][table], obj=table)
+
+
+def test_incremental_pipeline_matches_full_run(prices_df, tmp_path):
+    dates = prices_df['date'].drop_duplicates().sort_values()
+    cutoff = dates.iloc[-3]
+    updated = prices_df['symbol_id'] <= 3
+    new_bars = prices_df[(prices_df['date'] > cutoff) & updated]
+    # A symbol listed on the last day has one bar and no state yet
+    listed = prices_df[prices_df['date'] == dates.iloc[-1]].iloc[[0]].assign(symbol='NEWSYM')
+    seeded = create_database(tmp_path / 'seeded.db')
+    with DatabaseManager(db_path=seeded) as db_manager:
+        db_manager.insert_stock_prices_bulk(prices_df[prices_df['date'] <= cutoff])
+        run_blocks(db_manager, db_manager.get_symbol_ids_with_prices(), block_symbols=4)
+        db_manager.insert_stock_prices_bulk(pd.concat([new_bars, listed]))
+
+    tables = {}
+    for name, full in [('full', True), ('incremental', False)]:
+        path = str(tmp_path / f'{name}.db')
+        shutil.copy(seeded, path)
+        with DatabaseManager(db_path=path) as db_manager:
+            symbol_ids = db_manager.get_symbol_ids_with_prices() if full else dirty_symbol_ids(db_manager)
+            written = run_block(db_manager, symbol_ids, full=full)
+            tables[name] = {table: read_table(db_manager, table) for table in TABLES}
+            assert all(db_manager.get_dirty_symbols(table).empty for table in TABLES)
+    # Only the new bars get indicators and signals; outcomes add their trailing rows
+    assert written['technical_indicators'] == written['technical_trade_signals'] == len(new_bars) + 1
+    assert written['outcomes'] < len(new_bars) + 1 + 4 * TRAILING_ROWS
+    for table in TABLES:
+        pd.testing.assert_frame_equal(tables['full'][table], tables['incremental'][table], obj=table)
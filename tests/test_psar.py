@@ -0,0 +1,45 @@
+"""The batched Parabolic SAR against ta's PSARIndicator, value for value."""
+import numpy as np
+import pytest
+import ta
+
+import indicator_kernels as k
+from indicator_registry import load_indicator_config, parameter_sets, psar_key
+from technical_indicators import generate_indicators_panel
+
+INDICATORS = load_indicator_config()
+STEPS = parameter_sets(INDICATORS, 'psar')
+MAX_STEP = INDICATORS['psar']['max_step']
+
+
+def ta_psar(prices_df, step):
+    """One PSARIndicator run per symbol, stacked into a (symbol, bar) panel."""
+    # ta indexes its inputs by label as well as position, so each group starts at 0
+    groups = [group.reset_index(drop=True) for _, group in prices_df.groupby('symbol_id')]
+    return np.stack([
+        ta.trend.PSARIndicator(g['high'], g['low'], g['close'], step=step, max_step=MAX_STEP).psar().to_numpy()
+        for g in groups
+    ])
+
+
+def test_configured_steps():
+    assert STEPS == [0.01, 0.02, 0.04]
+
+
+def test_batched_kernel_equals_ta(prices_df):
+    codes, positions, lengths = k.build_panel(prices_df['symbol'])
+    bars = {col: k.to_panel(prices_df[col].to_numpy(dtype='float64'), codes, positions, lengths)
+            for col in ('high', 'low', 'close')}
+    batched = k.psar(bars['high'], bars['low'], bars['close'], step=STEPS, max_step=MAX_STEP)[0]
+    for i, step in enumerate(STEPS):
+        np.testing.assert_array_equal(batched[i], ta_psar(prices_df, step), err_msg=f"step {step}")
+
+
+@pytest.mark.parametrize('step', STEPS)
+def test_stored_columns_equal_ta(prices_df, step):
+    column = f'psar_{psar_key(step, MAX_STEP)}'
+    indicators_df = generate_indicators_panel(prices_df, columns=[column])
+    np.testing.assert_array_equal(
+        indicators_df.sort_values(['symbol_id', 'date'])[column].to_numpy(),
+        ta_psar(prices_df, step).ravel(),
+    )
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from sessions import fetch_start, session_index, session_numbers
+
+START = datetime(2024, 1, 1)
+
+
+def test_session_numbers_skip_holidays():
+    sessions = session_index('2024-07-01', '2024-07-10')
+    numbers = session_numbers(pd.Series(['2024-07-03', '2024-07-04', '2024-07-05']), sessions)
+    np.testing.assert_array_equal(numbers, [2, -1, 3])
+
+
+def test_fetch_start_new_symbol_starts_at_configured_start():
+    # The collector passes datetimes; the result must compare with sessions
+    assert fetch_start(None, START, datetime(2024, 6, 3, 18, 30)) == pd.Timestamp('2024-01-01')
+
+
+def test_fetch_start_resumes_after_last_bar():
+    # Thursday's bar stored, Friday's session completed before Monday's run
+    assert fetch_start('2024-05-30', START, datetime(2024, 6, 3, 9)) == pd.Timestamp('2024-05-31')
+
+
+def test_fetch_start_skips_symbol_already_current():
+    # Friday's bar stored and today (Monday) is a session: the exclusive end
+    # would make the fetch range empty, so there is nothing to fetch yet
+    assert fetch_start('2024-05-31', START, datetime(2024, 6, 3, 18, 30)) is None
+    assert fetch_start(pd.Timestamp('2024-05-31'), START, datetime(2024, 6, 2, 12)) is None
+
+
+def test_fetch_start_skips_holidays():
+    # July 4th is not a session, so Wednesday's bar is current on the 5th
+    assert fetch_start('2024-07-03', START, datetime(2024, 7, 5, 12)) is None
+    assert fetch_start('2024-07-03', START, datetime(2024, 7, 6, 12)) == pd.Timestamp('2024-07-04')
+
+
+def test_session_index_of_one_day():
+    np.testing.assert_array_equal(session_index('2024-07-03', '2024-07-03'), [np.datetime64('2024-07-03')])
+    assert len(session_index('2024-07-04', '2024-07-04')) == 0
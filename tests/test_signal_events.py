@@ -0,0 +1,112 @@
+"""signal_events against the wide technical_trade_signals table."""
+import numpy as np
+import pandas as pd
+
+from database_manager import DatabaseManager
+
+
+def read_events(db_manager):
+    return pd.read_sql_query("SELECT * FROM signal_events ORDER BY symbol_id, signal_id, start",
+                             db_manager.connection)
+
+
+def assert_dense_equals_wide(db_manager, wide):
+    dense = db_manager.get_signal_events_dense()
+    signal_cols = [col for col in wide.columns if col not in ('id', 'created_at')]
+    pd.testing.assert_frame_equal(wide[signal_cols], dense[signal_cols])
+
+
+def test_events_round_trip_and_query(feature_db):
+    with DatabaseManager(db_path=feature_db) as db_manager:
+        wide = db_manager.get_all_technical_trade_signals()
+        db_manager.insert_signal_events(wide)
+        assert_dense_equals_wide(db_manager, wide)
+
+        buys = db_manager.get_signal_events(['rsi_signal_14'], value=1, start_date='2019-06-01',
+                                            end_date='2019-12-31')
+        expected = wide[(wide['rsi_signal_14'] == 1) & wide['date'].between('2019-06-01', '2019-12-31')]
+        assert len(expected)
+        assert buys[['symbol_id', 'date']].values.tolist() == expected[['symbol_id', 'date']].values.tolist()
+
+
+def test_events_are_runs_smaller_than_the_wide_table(feature_db):
+    with DatabaseManager(db_path=feature_db) as db_manager:
+        wide = db_manager.get_all_technical_trade_signals()
+        db_manager.insert_signal_events(wide)
+        db_manager.connection.execute("VACUUM")
+        non_zero = int((wide.drop(columns=['id', 'symbol_id', 'date', 'created_at']) != 0).to_numpy().sum())
+        runs = db_manager.connection.execute("SELECT COUNT(*) FROM signal_events").fetchone()[0]
+        assert runs < non_zero / 2
+        size = dict(db_manager.connection.execute(
+            "SELECT name, SUM(pgsize) FROM dbstat WHERE name IN (?, ?) GROUP BY name",
+            ['signal_events', 'technical_trade_signals']))
+        assert size['signal_events'] < size['technical_trade_signals'] / 2
+
+
+def test_dense_signals_keep_the_wide_layout(feature_db):
+    with DatabaseManager(db_path=feature_db) as db_manager:
+        wide = db_manager.get_all_technical_trade_signals()
+        # A signal flipping every bar has as many runs as bars
+        flips = np.where(np.arange(len(wide)) % 2 == 0, 1, -1).astype('int64')
+        wide = wide.assign(flip_signal=flips)
+        db_manager.insert_signal_events(wide)
+        assert db_manager.get_signal_layouts()['flip_signal'] == 'wide'
+        assert db_manager.get_signal_layouts()['rsi_signal_14'] == 'runs'
+        assert_dense_equals_wide(db_manager, wide)
+
+        sells = db_manager.get_signal_events(['flip_signal', 'rsi_signal_14'], value=-1, symbol_ids=[1])
+        expected = wide[wide['symbol_id'] == 1].melt(['symbol_id', 'date'], ['flip_signal', 'rsi_signal_14'],
+                                                     var_name='signal')
+        expected = expected[expected['value'] == -1].sort_values(['date', 'signal'], ignore_index=True)
+        sells = sells.sort_values(['date', 'signal'], ignore_index=True)
+        assert sells[['date', 'signal']].values.tolist() == expected[['date', 'signal']].values.tolist()
+
+
+def test_signals_without_a_wide_column_are_reported(feature_db, caplog):
+    with DatabaseManager(db_path=feature_db) as db_manager:
+        wide = db_manager.get_all_technical_trade_signals()
+        db_manager.insert_technical_trade_signals(wide.assign(unknown_signal=0))
+    assert any(record.levelname == 'WARNING' and 'unknown_signal' in record.getMessage()
+               for record in caplog.records)
+
+
+def test_incremental_inserts_join_runs(feature_db):
+    with DatabaseManager(db_path=feature_db) as db_manager:
+        wide = db_manager.get_all_technical_trade_signals()
+        db_manager.insert_signal_events(wide)
+        expected = read_events(db_manager)
+        db_manager.connection.execute("DELETE FROM signal_events")
+
+        # Nightly-style appends, then a rewrite of a stretch in the middle of two symbols
+        dates = np.sort(wide['date'].unique())
+        n = len(dates)
+        for first, last in [(0, n // 2), (n // 2 + 1, n - 3), (n - 2, n - 1)]:
+            db_manager.insert_signal_events(wide[wide['date'].between(dates[first], dates[last])])
+        middle = wide['symbol_id'].isin([2, 3]) & wide['date'].between(dates[100], dates[140])
+        db_manager.insert_signal_events(wide[middle])
+
+        pd.testing.assert_frame_equal(read_events(db_manager), expected)
+        assert_dense_equals_wide(db_manager, wide)
+
+
+def test_one_bar_events_are_migrated(feature_db):
+    with DatabaseManager(db_path=feature_db) as db_manager:
+        wide = db_manager.get_all_technical_trade_signals()
+        names = [col for col in wide.columns if col not in ('id', 'symbol_id', 'date', 'created_at')]
+        signal_ids = db_manager.get_signal_ids(names)
+        db_manager.connection.executescript("""
+            DROP TABLE signal_events;
+            CREATE TABLE signal_events (
+                signal_id INTEGER NOT NULL, value INTEGER NOT NULL, date DATE NOT NULL,
+                symbol_id INTEGER NOT NULL, PRIMARY KEY (signal_id, value, date, symbol_id)
+            ) WITHOUT ROWID;
+        """)
+        matrix = wide[names].to_numpy()
+        rows, cols = np.nonzero(matrix)
+        db_manager.connection.executemany(
+            "INSERT INTO signal_events VALUES (?, ?, ?, ?)",
+            zip([signal_ids[names[col]] for col in cols], matrix[rows, cols].tolist(),
+                wide['date'].dt.strftime('%Y-%m-%d').to_numpy()[rows].tolist(),
+                wide['symbol_id'].to_numpy()[rows].tolist()))
+        db_manager.setup_database()
+        assert_dense_equals_wide(db_manager, wide)
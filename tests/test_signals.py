@@ -0,0 +1,118 @@
+"""The fused signal engine, the threshold sweep and the signal evaluation against their pandas references."""
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import create_database
+from database_manager import DatabaseManager
+from evaluate_signals import refresh_evaluation
+from outcomes import TRAILING_ROWS, generate_outcomes
+from reference_paths import THRESHOLD_GRID, evaluate_with_merge, regenerate
+from run_feature_pipeline import dirty_symbol_ids, run_block
+from signal_evaluation import evaluate_signals
+from technical_indicators import generate_indicators_panel
+from indicator_registry import load_indicator_config
+from technical_trade_signals import (generate_trade_signals, generate_trade_signals_fused, signal_rules,
+                                     sweep_signal_thresholds)
+
+
+@pytest.fixture(scope='module')
+def indicators_df(prices_df):
+    return generate_indicators_panel(prices_df)
+
+
+def test_fused_engine_matches_pandas_within_symbols(indicators_df):
+    reference = generate_trade_signals(indicators_df)
+    fused = generate_trade_signals_fused(indicators_df)
+    signal_cols = [col for col in reference.columns if col not in ('symbol', 'date')]
+    assert (fused[signal_cols].dtypes == np.int8).all()
+    differs = reference[signal_cols].to_numpy() != fused[signal_cols].to_numpy()
+    # generate_trade_signals compares a symbol's first row with the previous symbol's last
+    symbols = indicators_df['symbol'].to_numpy()
+    first_rows = np.r_[True, symbols[1:] != symbols[:-1]]
+    assert not differs[~first_rows].any()
+
+
+def test_rules_follow_indicator_config():
+    indicators = {**load_indicator_config(), 'rsi': {'windows': [9]}, 'sma': {'windows': [5, 20, 50]},
+                  'stoch': {'windows': [14], 'smooth_window': 5}, 'psar': {'steps': [0.03], 'max_step': 0.3}}
+    names = [rule[0] for rule in signal_rules(indicators)]
+    assert [name for name in names if name.startswith(('rsi', 'stoch', 'sma', 'psar'))] == [
+        'rsi_signal_9', 'stoch_signal_14_5', 'sma_cross_signal_5_20', 'psar_signal_003_03']
+    del indicators['macd']
+    assert not any(rule[0].startswith('macd') for rule in signal_rules(indicators))
+
+
+def test_fused_engine_skips_rules_without_inputs(indicators_df):
+    full = generate_trade_signals_fused(indicators_df)
+    partial = generate_trade_signals_fused(indicators_df.drop(columns=['rsi_14', 'sma_200', 'bb_upper_20']))
+    dropped = ['rsi_signal_14', 'sma_cross_signal_50_200', 'bb_signal_20']
+    assert list(partial.columns) == [col for col in full.columns if col not in dropped]
+    pd.testing.assert_frame_equal(partial, full.drop(columns=dropped))
+
+
+def test_sweep_matches_regeneration(indicators_df):
+    reference = regenerate(indicators_df, THRESHOLD_GRID)
+    swept = sweep_signal_thresholds(indicators_df, THRESHOLD_GRID)
+    counted = sweep_signal_thresholds(indicators_df, THRESHOLD_GRID, counts=True)
+    for family, (names, out) in swept.items():
+        for level, frame in enumerate(reference[family]):
+            np.testing.assert_array_equal(out[level], frame[names].to_numpy(),
+                                          err_msg=f"{family} level {THRESHOLD_GRID[family][level]}")
+        expected = np.stack([(out == value).sum(axis=1) for value in (-1, 0, 1)], axis=-1)
+        np.testing.assert_array_equal(counted[family][1], expected)
+
+
+def test_sweep_names_a_family_without_indicator_columns(indicators_df):
+    stoch = [col for col in indicators_df.columns if col.startswith('stoch_k_')]
+    with pytest.raises(ValueError, match=f"No stoch signals to sweep.*{stoch[0]}"):
+        sweep_signal_thresholds(indicators_df.drop(columns=stoch), {'rsi': [(30, 70)], 'stoch': [(20, 80)]})
+
+
+def test_evaluation_matches_merge(prices_df, indicators_df):
+    signals_df = generate_trade_signals_fused(indicators_df).drop(columns=['symbol'])
+    signals_df.insert(0, 'symbol_id', indicators_df['symbol_id'].to_numpy())
+    signals_df['date'] = pd.to_datetime(signals_df['date'])
+    outcomes_df = generate_outcomes(prices_df)
+    outcomes_df['date'] = pd.to_datetime(outcomes_df['date'])
+
+    keys = ['signal', 'value', 'lookahead']
+    reference = evaluate_with_merge(signals_df, outcomes_df).sort_values(keys, ignore_index=True)
+    evaluated = evaluate_signals(signals_df, outcomes_df)[0]
+    evaluated = evaluated.merge(reference[keys], on=keys).sort_values(keys, ignore_index=True)
+    pd.testing.assert_frame_equal(reference, evaluated, check_dtype=False)
+
+
+def test_incremental_evaluation_matches_full_refresh(prices_df, tmp_path):
+    # Appended bars give forward returns to the last rows before the cutoff
+    dates = prices_df['date'].drop_duplicates().sort_values()
+    cutoff = dates.iloc[-TRAILING_ROWS]
+    seeded = create_database(tmp_path / 'seeded.db')
+    with DatabaseManager(db_path=seeded) as db_manager:
+        db_manager.insert_stock_prices_bulk(prices_df[prices_df['date'] <= cutoff])
+        run_block(db_manager, db_manager.get_symbol_ids_with_prices())
+        refresh_evaluation(db_manager, full=True)
+        db_manager.insert_stock_prices_bulk(prices_df[(prices_df['date'] > cutoff) & (prices_df['symbol_id'] <= 4)])
+        run_block(db_manager, dirty_symbol_ids(db_manager), full=False)
+
+    keys = ['signal', 'value', 'lookahead']
+    summaries = {}
+    for name, full in [('full', True), ('incremental', False)]:
+        path = str(tmp_path / f'{name}.db')
+        shutil.copy(seeded, path)
+        with DatabaseManager(db_path=path) as db_manager:
+            refresh_evaluation(db_manager, full=full)
+            summaries[name] = db_manager.get_signal_evaluation().sort_values(keys, ignore_index=True)
+            if not full:
+                # Nothing new: a second refresh leaves the summary as it is
+                refresh_evaluation(db_manager)
+                again = db_manager.get_signal_evaluation().sort_values(keys, ignore_index=True)
+                pd.testing.assert_frame_equal(summaries[name], again)
+    full, incremental = summaries['full'], summaries['incremental']
+    assert full[keys].equals(incremental[keys])
+    assert full['count'].sum() > 0
+    pd.testing.assert_series_equal(full['count'], incremental['count'])
+    pd.testing.assert_series_equal(full['hits'], incremental['hits'])
+    np.testing.assert_allclose(full['return_sum'], incremental['return_sum'], rtol=1e-9, atol=1e-9)